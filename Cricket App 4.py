@@ -1,9 +1,35 @@
+import os
+
 import streamlit as st
-import sqlite3
 import pandas as pd
-from datetime import datetime
-from contextlib import contextmanager
-from copy import deepcopy
+from collections import deque
+from datetime import datetime, timezone
+
+from cricket_db import (
+    ALL_SCOPE,
+    MATCH_STATUSES,
+    MatchConflict,
+    archive_count_query,
+    archive_page_query,
+    bump_versions,
+    clear_tournament,
+    complete_match,
+    get_db_connection,
+    init_db,
+    match_scope,
+    read_versions,
+    rebuild_aggregates,
+    reset_match_state,
+    reset_team_player_stats,
+    run_query,
+    squad_scope,
+    transaction,
+    update_match,
+)
+from bulk_import import BulkImportError, import_upload
+from live_snapshots import INDEX_FILE, SNAPSHOT_DIR, load_snapshot, publish_all, publish_match
+from scoring_engine import Delivery, ScoringEngine, UndoHistory, score_delivery, undo_delivery
+from tournament_generator import GeneratorError, generate as generate_tournament
 
 PRIMARY_COLOR = "#2563eb"       
 SECONDARY_COLOR = "#111827"      
@@ -301,137 +327,21 @@ st.markdown(
 # ==========================================
 # 2. DATABASE MANAGEMENT (OPTIMIZED)
 # ==========================================
-DB_PATH = 'tournament.db'
-
-@contextmanager
-def get_db_connection():
-    """Context manager for database connections"""
-    conn = sqlite3.connect(DB_PATH)
-    try:
-        yield conn
-    finally:
-        conn.close()
-
-def init_db():
-    """Initialize all database tables with migration support"""
+# Pooled connections, schema and write helpers live in cricket_db.py.
+# Old versions are never requested again, so entries only need to age out.
+@st.cache_data(ttl=600, max_entries=500, show_spinner=False)
+def _cached_read(query, params, versions):
+    """Run a read once per combination of scope versions"""
     with get_db_connection() as conn:
-        c = conn.cursor()
-        
-        # Teams Table
-        c.execute('''CREATE TABLE IF NOT EXISTS teams (
-            id INTEGER PRIMARY KEY AUTOINCREMENT, 
-            name TEXT UNIQUE, 
-            short_name TEXT
-        )''')
-        
-        # Players Table - Create or migrate
-        c.execute('''CREATE TABLE IF NOT EXISTS players (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            player_name TEXT,
-            team_name TEXT,
-            UNIQUE(player_name, team_name)
-        )''')
-        
-        # Check if new columns exist, if not add them
-        c.execute("PRAGMA table_info(players)")
-        columns = [col[1] for col in c.fetchall()]
-        
-        if 'runs' not in columns:
-            c.execute("ALTER TABLE players ADD COLUMN runs INTEGER DEFAULT 0")
-        if 'balls' not in columns:
-            c.execute("ALTER TABLE players ADD COLUMN balls INTEGER DEFAULT 0")
-        if 'fours' not in columns:
-            c.execute("ALTER TABLE players ADD COLUMN fours INTEGER DEFAULT 0")
-        if 'sixes' not in columns:
-            c.execute("ALTER TABLE players ADD COLUMN sixes INTEGER DEFAULT 0")
-        if 'out_status' not in columns:
-            c.execute("ALTER TABLE players ADD COLUMN out_status TEXT DEFAULT 'Not Out'")
-        
-        # Matches Table
-        c.execute('''CREATE TABLE IF NOT EXISTS matches (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            team_a TEXT,
-            team_b TEXT,
-            status TEXT DEFAULT 'Scheduled',
-            team_a_runs INTEGER DEFAULT 0,
-            team_a_wickets INTEGER DEFAULT 0,
-            team_a_overs REAL DEFAULT 0.0,
-            team_b_runs INTEGER DEFAULT 0,
-            team_b_wickets INTEGER DEFAULT 0,
-            team_b_overs REAL DEFAULT 0.0,
-            batting_team TEXT,
-            target INTEGER DEFAULT 0,
-            winner TEXT,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )''')
-
-        c.execute("PRAGMA table_info(matches)")
-        match_columns = [col[1] for col in c.fetchall()]
-        if 'first_innings_team' not in match_columns:
-            c.execute("ALTER TABLE matches ADD COLUMN first_innings_team TEXT")
-        if 'first_innings_runs' not in match_columns:
-            c.execute("ALTER TABLE matches ADD COLUMN first_innings_runs INTEGER DEFAULT 0")
-        if 'created_at' not in match_columns:
-            c.execute("ALTER TABLE matches ADD COLUMN created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP")
-        if 'current_bowler_name' not in match_columns:
-            c.execute("ALTER TABLE matches ADD COLUMN current_bowler_name TEXT")
-        if 'current_bowler_runs' not in match_columns:
-            c.execute("ALTER TABLE matches ADD COLUMN current_bowler_runs INTEGER DEFAULT 0")
-        if 'current_bowler_wickets' not in match_columns:
-            c.execute("ALTER TABLE matches ADD COLUMN current_bowler_wickets INTEGER DEFAULT 0")
-        
-        conn.commit()
-
-def run_query(query, params=()):
-    """Execute a query without returning results"""
-    with get_db_connection() as conn:
-        c = conn.cursor()
-        c.execute(query, params)
-        conn.commit()
-
-
-def reset_team_player_stats(team_name):
-    """Reset player scorecard stats for a team."""
-    run_query(
-        """
-        UPDATE players
-        SET runs = 0, balls = 0, fours = 0, sixes = 0, out_status = 'Not Out'
-        WHERE team_name = ?
-        """,
-        (team_name,),
-    )
+        df = pd.read_sql(query, conn, params=params)
+    return df
 
 
-def reset_match_state(match_id, batting_team):
-    """Clear match scoreboard and first-innings metadata."""
-    run_query(
-        """
-        UPDATE matches
-        SET team_a_runs = 0,
-            team_a_wickets = 0,
-            team_a_overs = 0.0,
-            team_b_runs = 0,
-            team_b_wickets = 0,
-            team_b_overs = 0.0,
-            batting_team = ?,
-            target = 0,
-            winner = NULL,
-            first_innings_team = NULL,
-            first_innings_runs = 0,
-            current_bowler_name = NULL,
-            current_bowler_runs = 0,
-            current_bowler_wickets = 0
-        WHERE id = ?
-        """,
-        (batting_team, match_id),
-    )
-
-@st.cache_data(ttl=2)
-def get_data(query, params=()):
-    """Fetch data with caching"""
+def get_data(query, params=(), scopes=()):
+    """Fetch data with caching, invalidated only by writes to `scopes`"""
     with get_db_connection() as conn:
-        df = pd.read_sql(query, conn, params=params)
-    return df
+        versions = read_versions(conn, scopes)
+    return _cached_read(query, tuple(params), versions)
 # ADD THIS NEW FUNCTION (no caching for live data)
 def get_live_data(query, params=()):
     """Fetch live data WITHOUT caching - always fresh"""
@@ -440,35 +350,59 @@ def get_live_data(query, params=()):
     return df
 
 
-def get_match_number_map():
-    """Map actual match IDs to sequential match numbers starting at 1."""
-    order_df = get_data(
-        "SELECT id FROM matches ORDER BY COALESCE(created_at, CURRENT_TIMESTAMP), id"
-    )
-    return {
-        int(row.id): idx + 1
-        for idx, row in enumerate(order_df.itertuples())
-    }
+EXTRAS_LABELS = {"wides": "w", "no_balls": "nb", "byes": "b", "leg_byes": "lb"}
 
 
-def compute_team_extras(team_name, team_runs):
-    """Calculate extras for a team (total runs minus batter contributions)."""
-    if not team_name:
-        return 0
-    totals_df = get_live_data(
-        "SELECT SUM(runs) AS total_runs FROM players WHERE team_name = ?",
-        (team_name,),
-    )
-    if totals_df.empty:
-        return safe_numeric_conversion(team_runs)
-    player_runs = totals_df.iloc[0].get("total_runs")
-    team_total = safe_numeric_conversion(team_runs)
-    batter_total = safe_numeric_conversion(player_runs)
-    return max(0, team_total - batter_total)
+def extras_breakdown(match, prefix):
+    """A side's extras off its match row: (total, "w 3, nb 1, b 0, lb 2")."""
+    counts = {label: safe_numeric_conversion(match.get(f"{prefix}_{column}")) for column, label in EXTRAS_LABELS.items()}
+    return sum(counts.values()), ", ".join(f"{label} {count}" for label, count in counts.items())
 
 # Initialize DB on load
 init_db()
 
+
+def publish_snapshots(match_id=None):
+    """Refresh the public JSON snapshots after a committed write (one match, or everything).
+
+    A failed publish never fails the write; viewers just see the previous snapshot.
+    """
+    try:
+        if match_id is None:
+            publish_all()
+        else:
+            publish_match(match_id)
+    except OSError as exc:
+        st.warning(f"Live-score snapshots were not updated: {exc}")
+
+
+@st.cache_resource(show_spinner=False)
+def ensure_snapshots():
+    """Publish once per server process if no index has been published yet."""
+    if not os.path.exists(os.path.join(SNAPSHOT_DIR, INDEX_FILE)):
+        publish_snapshots()
+    return True
+
+
+@st.cache_data(max_entries=200, show_spinner=False)
+def _cached_snapshot(name, mtime_ns):
+    return load_snapshot(name)
+
+
+def get_snapshot(name):
+    """A published snapshot, re-read only when its file has been replaced; no database access."""
+    try:
+        mtime_ns = os.stat(os.path.join(SNAPSHOT_DIR, name)).st_mtime_ns
+    except FileNotFoundError:
+        return None
+    return _cached_snapshot(name, mtime_ns)
+
+
+ensure_snapshots()
+
+# Scoring rules live in scoring_engine.py; the scorer page is a UI over them
+engine = ScoringEngine()
+
 # ==========================================
 # 3. HELPER FUNCTIONS (OPTIMIZED)
 # ==========================================
@@ -480,115 +414,163 @@ def safe_numeric_conversion(value, default=0, dtype=int):
         return dtype(default)
 
 
-def format_overs(raw_overs):
-    """Format overs stored as float-like values into conventional notation."""
-    try:
-        overs = float(raw_overs)
-    except (TypeError, ValueError):
+def format_overs(balls):
+    """Format a legal-ball count into conventional overs notation (92 -> "15.2")."""
+    balls = safe_numeric_conversion(balls)
+    if balls <= 0:
         return "0.0"
+    return f"{balls // 6}.{balls % 6}"
 
-    over_int = int(overs)
-    balls = int(round((overs - over_int) * 10))
-    balls = max(0, min(5, balls))
-    return f"{over_int}.{balls}"
 
-
-def calculate_run_rate(runs, overs):
-    """Compute run rate while avoiding division by zero."""
+def calculate_run_rate(runs, balls):
+    """Compute run rate from runs and legal balls while avoiding division by zero."""
     try:
         runs_val = int(runs)
-        overs_val = float(overs)
+        balls_val = int(balls)
     except (TypeError, ValueError):
         return "—"
 
-    over_int = int(overs_val)
-    balls = int(round((overs_val - over_int) * 10))
-    total_balls = over_int * 6 + balls
-    if total_balls <= 0:
+    if balls_val <= 0:
         return "—"
-    run_rate = runs_val / (total_balls / 6)
+    run_rate = runs_val * 6 / balls_val
     return f"{run_rate:.2f}"
 
 
-def get_scalar(query, params=(), default=0):
+def format_overs_column(balls):
+    """Vectorized format_overs for a whole pandas column of legal-ball counts."""
+    balls = pd.to_numeric(balls, errors="coerce").fillna(0).astype(int).clip(lower=0)
+    return (balls // 6).astype(str) + "." + (balls % 6).astype(str)
+
+
+def run_rate_column(runs, balls):
+    """Vectorized calculate_run_rate for pandas columns of runs and legal balls."""
+    runs = pd.to_numeric(runs, errors="coerce").fillna(0)
+    balls = pd.to_numeric(balls, errors="coerce").fillna(0)
+    rates = (runs * 6 / balls.where(balls > 0)).map(lambda val: f"{val:.2f}", na_action="ignore")
+    return rates.fillna("—")
+
+
+def get_scalar(query, params=(), default=0, scopes=()):
     """Fetch a single scalar value from the database using cached reads."""
-    df = get_data(query, params)
+    df = get_data(query, params, scopes)
     if df.empty:
         return default
     value = df.iloc[0, 0]
     return value if value is not None else default
 
-def calculate_new_overs(current_overs, is_extra):
-    """Calculate updated overs count"""
-    if is_extra:
-        return current_overs
-    
-    over_int = int(current_overs)
-    balls = round((current_overs - over_int) * 10)
-    balls += 1
-    
-    return float(over_int + 1) if balls == 6 else over_int + (balls / 10.0)
 
-def add_score(match_id, runs, is_wicket, is_extra, batting_team):
-    """Add score to match with optimized logic"""
-    # Fetch fresh match data
-    match_data = get_data("SELECT * FROM matches WHERE id = ?", (match_id,)).iloc[0]
-    
-    # Determine prefix
-    prefix = "team_a" if batting_team == match_data['team_a'] else "team_b"
-    
-    # Safe conversions
-    current_runs = safe_numeric_conversion(match_data[f'{prefix}_runs'])
-    current_wickets = safe_numeric_conversion(match_data[f'{prefix}_wickets'])
-    current_overs = safe_numeric_conversion(match_data[f'{prefix}_overs'], dtype=float)
-    
-    # Calculate updates
-    new_runs = current_runs + runs
-    new_wickets = current_wickets + (1 if is_wicket else 0)
-    new_overs = calculate_new_overs(current_overs, is_extra)
-    
-    # Update database
-    query = f"""
-        UPDATE matches 
-        SET {prefix}_runs = ?, {prefix}_wickets = ?, {prefix}_overs = ? 
-        WHERE id = ?
-    """
-    run_query(query, (new_runs, new_wickets, new_overs, match_id))
-
-def update_player_stats(player_name, team_name, runs, is_wicket, is_extra):
-    """Update individual player statistics"""
-    # Fetch current stats
-    player_data = get_data(
-        "SELECT * FROM players WHERE player_name = ? AND team_name = ?",
-        (player_name, team_name)
+def get_bowling_card(match_id, innings):
+    """Bowling card for one innings, best figures first, straight off idx_bowling_figures_card."""
+    card = get_data(
+        """
+        SELECT bowler, balls, runs, wickets
+        FROM bowling_figures
+        WHERE match_id = ? AND innings = ?
+        ORDER BY wickets DESC, runs, balls
+        """,
+        (int(match_id), int(innings)),
+        scopes=(match_scope(match_id),),
     )
-    
-    if player_data.empty:
-        return
-    
-    player = player_data.iloc[0]
-    
-    # Calculate updates
-    new_runs = safe_numeric_conversion(player['runs']) + runs
-    new_balls = safe_numeric_conversion(player['balls']) + (0 if is_extra else 1)
-    new_fours = safe_numeric_conversion(player['fours']) + (1 if runs == 4 else 0)
-    new_sixes = safe_numeric_conversion(player['sixes']) + (1 if runs == 6 else 0)
-    new_status = "Out" if is_wicket else player['out_status']
-    
-    # Update
-    run_query("""
-        UPDATE players 
-        SET runs = ?, balls = ?, fours = ?, sixes = ?, out_status = ?
-        WHERE player_name = ? AND team_name = ?
-    """, (new_runs, new_balls, new_fours, new_sixes, new_status, player_name, team_name))
+    return pd.DataFrame({
+        "Bowler": card["bowler"],
+        "Overs": format_overs_column(card["balls"]),
+        "Runs": card["runs"],
+        "Wkts": card["wickets"],
+        "Econ": [
+            f"{runs / (balls / 6):.2f}" if balls else "0.00"
+            for runs, balls in zip(card["runs"], card["balls"])
+        ],
+    })
+
+
+COMMENTARY_BUFFER = 30   # latest lines a feed holds in memory
+COMMENTARY_PAGE = 30     # lines per older page
+COMMENTARY_FIELDS = ("innings", "over_number", "ball_number", "commentary")
+
+
+def get_commentary(match_id, before=None, limit=COMMENTARY_PAGE):
+    """A match's commentary, newest first, as dicts; `before` is an (innings, id) keyset cursor.
+
+    Walks idx_deliveries_match backwards, so an older page costs the same as the latest.
+    """
+    if before is None:
+        query = """
+            SELECT id, innings, over_number, ball_number, commentary, created_at
+            FROM deliveries
+            WHERE match_id = ?
+            ORDER BY innings DESC, id DESC
+            LIMIT ?
+        """
+        params = (int(match_id), int(limit))
+    else:
+        query = """
+            SELECT id, innings, over_number, ball_number, commentary, created_at
+            FROM deliveries
+            WHERE match_id = ? AND (innings, id) < (?, ?)
+            ORDER BY innings DESC, id DESC
+            LIMIT ?
+        """
+        params = (int(match_id), int(before[0]), int(before[1]), int(limit))
+    return get_data(query, params, scopes=(match_scope(match_id),)).to_dict("records")
+
+
+def commentary_buffer(match_id):
+    """A ring buffer of the match's latest commentary, oldest first."""
+    return deque(reversed(get_commentary(match_id, limit=COMMENTARY_BUFFER)), maxlen=COMMENTARY_BUFFER)
+
+
+def render_commentary(key, match_id, latest):
+    """Commentary feed: `latest` (newest first) and then older pages, one at a time, on demand."""
+    pager = st.session_state.setdefault(f"{key}_commentary", {"match_id": None, "cursors": [None]})
+    if pager["match_id"] != match_id:
+        pager.update(match_id=match_id, cursors=[None])
+    if pager["cursors"][-1] is None:
+        # The buffer's length says nothing about what lies before it (undo shortens it), so look for one line
+        page = latest
+        has_older = bool(latest) and bool(
+            get_commentary(match_id, before=(latest[-1]["innings"], latest[-1]["id"]), limit=1)
+        )
+    else:
+        page = get_commentary(match_id, before=pager["cursors"][-1], limit=COMMENTARY_PAGE + 1)
+        has_older = len(page) > COMMENTARY_PAGE
+        page = page[:COMMENTARY_PAGE]
+
+    if page:
+        st.dataframe(
+            pd.DataFrame({
+                "Inns": [entry["innings"] for entry in page],
+                "Ball": [f"{entry['over_number']}.{entry['ball_number']}" for entry in page],
+                "Commentary": [entry["commentary"] or "" for entry in page],
+                "Time": [str(entry["created_at"] or "")[11:19] for entry in page],
+            }),
+            use_container_width=True,
+            hide_index=True,
+            height=min(len(page) * 35 + 38, 280),
+        )
+    elif pager["cursors"][-1] is None:
+        st.caption("Commentary appears here ball by ball.")
+    else:
+        st.caption("No older commentary.")
+
+    newer_col, older_col = st.columns(2)
+    with newer_col:
+        if st.button("← Latest", key=f"{key}_commentary_newer", disabled=len(pager["cursors"]) == 1,
+                     use_container_width=True):
+            pager["cursors"] = [None]
+            st.rerun()
+    with older_col:
+        if st.button("Older ↓", key=f"{key}_commentary_older", disabled=not has_older or not page,
+                     use_container_width=True):
+            pager["cursors"].append((page[-1]["innings"], page[-1]["id"]))
+            st.rerun()
 
 
 def render_live_match_card(match, match_number):
     """Present a live match with rich visuals"""
-    team_a_rr = calculate_run_rate(match["team_a_runs"], match["team_a_overs"])
-    team_b_rr = calculate_run_rate(match["team_b_runs"], match["team_b_overs"])
-    team_a_extras = compute_team_extras(match["team_a"], match["team_a_runs"])
-    team_b_extras = compute_team_extras(match["team_b"], match["team_b_runs"])
+    team_a_rr = calculate_run_rate(match["team_a_runs"], match["team_a_balls"])
+    team_b_rr = calculate_run_rate(match["team_b_runs"], match["team_b_balls"])
+    team_a_extras, team_a_extras_split = extras_breakdown(match, "team_a")
+    team_b_extras, team_b_extras_split = extras_breakdown(match, "team_b")
     target_val = safe_numeric_conversion(match.get("target"), default=0)
     batting_side = match.get("batting_team")
     innings_hint = "First innings in progress"
@@ -624,14 +606,14 @@ def render_live_match_card(match, match_number):
                 <div class="score-card__team">
                     <span class="score-card__team-name">{match['team_a']}</span>
                     <span class="score-card__score">{match['team_a_runs']}/{match['team_a_wickets']}</span>
-                    <span class="score-card__meta">Overs: {format_overs(match['team_a_overs'])} • RR {team_a_rr}</span>
-                    <span class="score-card__meta">Extras: {team_a_extras}</span>
+                    <span class="score-card__meta">Overs: {format_overs(match['team_a_balls'])} • RR {team_a_rr}</span>
+                    <span class="score-card__meta">Extras: {team_a_extras} ({team_a_extras_split})</span>
                 </div>
                 <div class="score-card__team">
                     <span class="score-card__team-name">{match['team_b']}</span>
                     <span class="score-card__score">{match['team_b_runs']}/{match['team_b_wickets']}</span>
-                    <span class="score-card__meta">Overs: {format_overs(match['team_b_overs'])} • RR {team_b_rr}</span>
-                    <span class="score-card__meta">Extras: {team_b_extras}</span>
+                    <span class="score-card__meta">Overs: {format_overs(match['team_b_balls'])} • RR {team_b_rr}</span>
+                    <span class="score-card__meta">Extras: {team_b_extras} ({team_b_extras_split})</span>
                 </div>
             </div>
             <div class="score-card__meta">
@@ -674,6 +656,76 @@ def render_live_match_card(match, match_number):
         else:
             st.caption("Waiting for the first partnership to start.")
 
+    bowling_card = get_bowling_card(match["id"], 2 if target_val > 0 else 1)
+    if not bowling_card.empty:
+        st.markdown("**🎯 Bowling**")
+        st.dataframe(bowling_card.head(4), use_container_width=True, hide_index=True)
+
+    st.markdown("**🎙️ Commentary**")
+    render_commentary("dashboard", int(match["id"]), get_commentary(match["id"], limit=COMMENTARY_BUFFER))
+
+
+ARCHIVE_COLUMNS = """
+    id, match_number, status, team_a, team_a_runs, team_a_wickets, team_a_balls,
+    team_b, team_b_runs, team_b_wickets, team_b_balls, target, winner, created_at
+"""
+ARCHIVE_PAGE_SIZE = 20
+
+
+def results_archive(key, status=None, page_size=ARCHIVE_PAGE_SIZE):
+    """Filters, one page of matches and a pager, shared by Recent Results and Match History.
+
+    Pages are keyset reads on (created_at, id), so older pages cost the same
+    as the first. Passing `status` fixes the status filter instead of
+    offering it. Returns the page (ARCHIVE_COLUMNS) as a DataFrame.
+    """
+    team_df = get_data("SELECT name FROM teams", scopes=("teams",))
+    filter_cols = st.columns(4 if status is None else 3)
+    with filter_cols[0]:
+        team = st.selectbox("Team", ["All teams"] + sorted(team_df["name"].tolist()), key=f"{key}_team", persist_state="session")
+    if status is None:
+        with filter_cols[-3]:
+            status_choice = st.selectbox("Status", ["All"] + list(MATCH_STATUSES), key=f"{key}_status", persist_state="session")
+        status = None if status_choice == "All" else status_choice
+    with filter_cols[-2]:
+        date_from = st.date_input("From", value=None, key=f"{key}_from", persist_state="session")
+    with filter_cols[-1]:
+        date_to = st.date_input("To", value=None, key=f"{key}_to", persist_state="session")
+    filters = {
+        "team": None if team == "All teams" else team,
+        "status": status,
+        "date_from": date_from.isoformat() if date_from else None,
+        "date_to": date_to.isoformat() if date_to else None,
+    }
+
+    # One cursor per page visited, so "Newer" steps back without an OFFSET
+    pager = st.session_state.setdefault(f"{key}_pager", {"filters": None, "cursors": [None]})
+    if pager["filters"] != filters:
+        pager.update(filters=filters, cursors=[None])
+    query, params = archive_page_query(ARCHIVE_COLUMNS, page_size + 1, after=pager["cursors"][-1], **filters)
+    # Live scores move every ball, so pages that can hold live matches also follow the live scope
+    page = get_data(query, params, scopes=("schedule",) if status in ("Completed", "Scheduled") else ("schedule", "live"))
+    has_older = len(page) > page_size
+    page = page.iloc[:page_size]
+    count_query, count_params = archive_count_query(**filters)
+    total = int(get_scalar(count_query, count_params, scopes=("schedule",)))
+
+    first_row = (len(pager["cursors"]) - 1) * page_size + 1
+    newer_col, info_col, older_col = st.columns([1, 3, 1])
+    with newer_col:
+        if st.button("← Newer", key=f"{key}_newer", disabled=len(pager["cursors"]) == 1, use_container_width=True):
+            pager["cursors"].pop()
+            st.rerun()
+    with info_col:
+        if total:
+            st.caption(f"Matches {first_row:,}–{first_row + len(page) - 1:,} of {total:,}")
+    with older_col:
+        if st.button("Older →", key=f"{key}_older", disabled=not has_older, use_container_width=True):
+            last = page.iloc[-1]
+            pager["cursors"].append((last["created_at"], int(last["id"])))
+            st.rerun()
+    return page.reset_index(drop=True)
+
 # ==========================================
 # 4. PAGE: PUBLIC DASHBOARD
 # ==========================================
@@ -685,99 +737,308 @@ def render_dashboard():
     st.markdown('<div class="top-metrics">', unsafe_allow_html=True)
     m1, m2, m3, m4 = st.columns(4)
     with m1:
-        live_count = int(get_scalar("SELECT COUNT(*) FROM matches WHERE status = 'Live'"))
+        live_count = int(get_scalar("SELECT COUNT(*) FROM matches WHERE status = 'Live'", scopes=("live", "schedule")))
         st.metric("Live Matches", live_count)
     with m2:
-        team_count = int(get_scalar("SELECT COUNT(*) FROM teams"))
+        team_count = int(get_scalar("SELECT COUNT(*) FROM teams", scopes=("teams",)))
         st.metric("Teams Registered", team_count)
     with m3:
-        player_count = int(get_scalar("SELECT COUNT(*) FROM players"))
+        player_count = int(get_scalar("SELECT COUNT(*) FROM players", scopes=("players",)))
         st.metric("Players Active", player_count)
     with m4:
-        completed_count = int(get_scalar("SELECT COUNT(*) FROM matches WHERE status = 'Completed'"))
+        completed_count = int(get_scalar("SELECT COUNT(*) FROM matches WHERE status = 'Completed'", scopes=("schedule",)))
         st.metric("Matches Completed", completed_count)
     st.markdown('</div>', unsafe_allow_html=True)
 
     _, refresh_col = st.columns([3, 1])
     with refresh_col:
         if st.button("🔄 Refresh", use_container_width=True):
-            st.cache_data.clear()
             st.rerun()
 
-    match_numbers = get_match_number_map()
-
-    live_tab, results_tab, schedule_tab = st.tabs([
+    # Tabs that track their state rerun on a switch, so only the open one queries and renders.
+    # Widgets in the other tabs are not drawn, so their values persist for the session instead.
+    live_tab, results_tab, schedule_tab, points_tab, leaders_tab = st.tabs([
         "Live Matches",
         "Recent Results",
         "Upcoming Schedule",
-    ])
+        "Points Table",
+        "Top Batters",
+    ], key="dashboard_section", on_change="rerun")
+
+    with live_tab:
+        if live_tab.open:
+            live_matches = get_live_data("SELECT * FROM matches WHERE status = 'Live'")
+            if live_matches.empty:
+                st.info("No matches are currently live.")
+            else:
+                live_matches = live_matches.sort_values(by=["id"])
+                live_options = {
+                    f"Match #{row['match_number']} — {row['team_a']} vs {row['team_b']}": int(row["id"])
+                    for _, row in live_matches.iterrows()
+                }
+                live_label = st.selectbox(
+                    "Select live match",
+                    list(live_options.keys()),
+                    key="dashboard_live_select",
+                    persist_state="session",
+                )
+                selected_live_id = live_options[live_label]
+                live_row = live_matches[live_matches["id"] == selected_live_id].iloc[0]
+                render_live_match_card(live_row, live_row["match_number"])
+
+    with results_tab:
+        if results_tab.open:
+            completed = results_archive("results", status="Completed", page_size=10)
+            if completed.empty:
+                st.caption("Play a few matches to populate recent results.")
+            else:
+                result_options = {
+                    f"Match #{row['match_number']} — {row['team_a']} vs {row['team_b']}": int(row["id"])
+                    for _, row in completed.iterrows()
+                }
+                result_label = st.selectbox(
+                    "Select completed match",
+                    list(result_options.keys()),
+                    key="dashboard_result_select",
+                    persist_state="session",
+                )
+                selected_result_id = result_options[result_label]
+                result_row = completed[completed["id"] == selected_result_id].iloc[0]
+                match_no = result_row["match_number"]
+                st.markdown(
+                    f"""
+                    <div class="score-card" style="box-shadow: 0 14px 24px rgba(16,185,129,0.12); border-left: 6px solid rgba(16,185,129,0.8);">
+                        <div class="score-card__title">Match #{match_no} — {result_row['team_a']} vs {result_row['team_b']}</div>
+                        <div class="score-card__meta">
+                            {result_row['team_a_runs']}/{result_row['team_a_wickets']} ({format_overs(result_row['team_a_balls'])} ov) •
+                            {result_row['team_b_runs']}/{result_row['team_b_wickets']} ({format_overs(result_row['team_b_balls'])} ov)
+                        </div>
+                        <div class="score-card__meta">Winner: <strong>{result_row['winner'] or '—'}</strong></div>
+                    </div>
+                    """,
+                    unsafe_allow_html=True,
+                )
+                innings_card = get_data(
+                    """
+                    SELECT team_name AS Team, player_name AS Player, runs AS Runs, balls AS Balls,
+                           fours AS "4s", sixes AS "6s", out_status AS Status
+                    FROM player_innings
+                    WHERE match_id = ? AND (balls > 0 OR out_status != 'Not Out')
+                    ORDER BY team_name, runs DESC
+                    """,
+                    (selected_result_id,),
+                    scopes=(match_scope(selected_result_id),),
+                )
+                if not innings_card.empty:
+                    st.dataframe(innings_card, use_container_width=True, hide_index=True)
+
+    with schedule_tab:
+        if schedule_tab.open:
+            scheduled = get_data("SELECT team_a, team_b, status FROM matches WHERE status = 'Scheduled'", scopes=("schedule",))
+            if scheduled.empty:
+                st.info("No upcoming matches scheduled.")
+            else:
+                schedule_view = scheduled.rename(columns={"team_a": "Team A", "team_b": "Team B", "status": "Status"})
+                table_height = min(len(schedule_view) * 34 + 60, 260)
+                st.dataframe(
+                    schedule_view,
+                    use_container_width=True,
+                    hide_index=True,
+                    height=table_height,
+                )
+
+    with points_tab:
+        if points_tab.open:
+            standings = get_data(
+                """
+                SELECT team_name AS Team, played AS P, won AS W, lost AS L, drawn AS D,
+                       points AS Pts, printf('%+.3f', nrr) AS NRR
+                FROM standings
+                ORDER BY points DESC, nrr DESC, team_name
+                """,
+                scopes=("standings",),
+            )
+            if standings.empty:
+                st.caption("The points table fills in as matches are completed.")
+            else:
+                st.dataframe(standings, use_container_width=True, hide_index=True)
+                st.caption("Win 2 points, tie 1. NRR is runs per over scored minus conceded, over legal balls.")
+
+    with leaders_tab:
+        if leaders_tab.open:
+            leaders = get_data(
+                """
+                SELECT player_name AS Player, team_name AS Team, matches AS M, innings AS Inns,
+                       runs AS Runs, balls AS Balls, fours AS "4s", sixes AS "6s",
+                       ROUND(runs * 1.0 / NULLIF(outs, 0), 2) AS Avg,
+                       ROUND(runs * 100.0 / NULLIF(balls, 0), 1) AS SR
+                FROM player_career
+                ORDER BY runs DESC, balls
+                LIMIT 10
+                """,
+                scopes=("career",),
+            )
+            if leaders.empty:
+                st.caption("Career totals appear once matches are completed.")
+            else:
+                st.dataframe(leaders, use_container_width=True, hide_index=True)
+
+
+def _snapshot_side(side):
+    extras = side.get("extras", {})
+    split = ", ".join(f"{label} {extras.get(column, 0)}" for column, label in EXTRAS_LABELS.items())
+    return f"""
+        <div class="score-card__team">
+            <span class="score-card__team-name">{side['team']}</span>
+            <span class="score-card__score">{side['runs']}/{side['wickets']}</span>
+            <span class="score-card__meta">Overs: {side['overs']} • RR {side['run_rate'] or '—'}</span>
+            <span class="score-card__meta">Extras: {sum(extras.values())} ({split})</span>
+        </div>
+    """
+
+
+def render_live_scores():
+    """Public scoreboard served entirely from the published JSON snapshots, never the database."""
+    st.title("📡 Live Scores")
+    index = get_snapshot(INDEX_FILE)
+    if index is None:
+        st.info("No scores have been published yet.")
+        return
+    st.caption(f"Published {index['published_at']} UTC.")
+
+    metrics = index["metrics"]
+    m1, m2, m3, m4 = st.columns(4)
+    m1.metric("Live Matches", metrics["live"])
+    m2.metric("Teams Registered", metrics["teams"])
+    m3.metric("Players Active", metrics["players"])
+    m4.metric("Matches Completed", metrics["completed"])
+
+    _, refresh_col = st.columns([3, 1])
+    with refresh_col:
+        if st.button("🔄 Refresh", use_container_width=True, key="live_scores_refresh"):
+            st.rerun()
+
+    live_tab, results_tab, schedule_tab = st.tabs(["Live Matches", "Recent Results", "Upcoming Schedule"])
 
     with live_tab:
-        live_matches = get_live_data("SELECT * FROM matches WHERE status = 'Live'")
-        if live_matches.empty:
+        if not index["live"]:
             st.info("No matches are currently live.")
         else:
-            live_matches = live_matches.sort_values(by=["id"])
             live_options = {
-                f"Match #{match_numbers.get(int(row['id']), row['id'])} — {row['team_a']} vs {row['team_b']}": int(row["id"])
-                for _, row in live_matches.iterrows()
+                f"Match #{match['match_number']} — {match['team_a']['team']} vs {match['team_b']['team']}": match["file"]
+                for match in index["live"]
             }
-            live_label = st.selectbox(
-                "Select live match",
-                list(live_options.keys()),
-                key="dashboard_live_select"
-            )
-            selected_live_id = live_options[live_label]
-            live_row = live_matches[live_matches["id"] == selected_live_id].iloc[0]
-            match_no = match_numbers.get(int(live_row["id"]), live_row["id"])
-            render_live_match_card(live_row, match_no)
+            live_label = st.selectbox("Select live match", list(live_options.keys()), key="live_scores_select")
+            match = get_snapshot(live_options[live_label])
+            if match is None:
+                st.caption("This match has not been published yet.")
+            else:
+                target = match["target"]
+                innings_hint = "First innings in progress"
+                if target and match["batting_team"]:
+                    side = match["team_a"] if match["batting_team"] == match["team_a"]["team"] else match["team_b"]
+                    innings_hint = (
+                        f"Target: {target} (1st inns {match['first_innings_runs']} by "
+                        f"{match['first_innings_team'] or 'First Innings'}) • Need {max(0, target - side['runs'])}"
+                    )
+                bowler = match["bowler"]
+                bowler_line = (
+                    f"{bowler['name']} — {bowler['runs']} runs • {bowler['wickets']} wkts" if bowler else "Awaiting selection"
+                )
+                st.markdown(
+                    f"""
+                    <div class="score-card">
+                        <div class="score-card__header">
+                            <div>
+                                <div class="score-card__title">{match['team_a']['team']} vs {match['team_b']['team']}</div>
+                                <div class="score-card__meta">Match #{match['match_number']} • {match['status']}</div>
+                            </div>
+                            <span class="live-pill">LIVE</span>
+                        </div>
+                        <div class="score-card__teams">
+                            {_snapshot_side(match['team_a'])}
+                            {_snapshot_side(match['team_b'])}
+                        </div>
+                        <div class="score-card__meta">
+                            Batting now: <strong>{match['batting_team'] or '—'}</strong> • {innings_hint}
+                        </div>
+                        <div class="score-card__meta">
+                            Current Bowler: <strong>{bowler_line}</strong>
+                        </div>
+                    </div>
+                    """,
+                    unsafe_allow_html=True,
+                )
+                if match["batters"]:
+                    st.markdown("**🧍 Current Batters**")
+                    for column, batter in zip(st.columns(len(match["batters"])), match["batters"]):
+                        with column:
+                            st.markdown(
+                                f"""
+                                <div class="batsman-pill">
+                                    <strong>{batter['player_name']}</strong>
+                                    <span>{batter['runs']} ({batter['balls']}) • 4s {batter['fours']} • 6s {batter['sixes']}</span>
+                                </div>
+                                """,
+                                unsafe_allow_html=True,
+                            )
+                else:
+                    st.caption("Waiting for the first partnership to start.")
+                if match["bowling"]:
+                    st.markdown("**🎯 Bowling**")
+                    st.dataframe(
+                        pd.DataFrame([
+                            {
+                                "Bowler": figures["bowler"],
+                                "Overs": figures["overs"],
+                                "Runs": figures["runs"],
+                                "Wkts": figures["wickets"],
+                                "Econ": f"{figures['runs'] / (figures['balls'] / 6):.2f}" if figures["balls"] else "0.00",
+                            }
+                            for figures in match["bowling"][:4]
+                        ]),
+                        use_container_width=True,
+                        hide_index=True,
+                    )
+                if match["commentary"]:
+                    st.markdown("**🎙️ Commentary**")
+                    st.dataframe(
+                        pd.DataFrame(
+                            [(line["innings"], line["ball"], line["text"], line["at"]) for line in match["commentary"]],
+                            columns=["Inns", "Ball", "Commentary", "Time"],
+                        ),
+                        use_container_width=True,
+                        hide_index=True,
+                    )
 
     with results_tab:
-        completed = get_data(
-            "SELECT * FROM matches WHERE status = 'Completed' ORDER BY COALESCE(created_at, CURRENT_TIMESTAMP) DESC, id DESC LIMIT 5"
-        )
-        if completed.empty:
+        if not index["results"]:
             st.caption("Play a few matches to populate recent results.")
-        else:
-            completed = completed.reset_index(drop=True)
-            result_options = {
-                f"Match #{match_numbers.get(int(row['id']), row['id'])} — {row['team_a']} vs {row['team_b']}": int(row["id"])
-                for _, row in completed.iterrows()
-            }
-            result_label = st.selectbox(
-                "Select completed match",
-                list(result_options.keys()),
-                key="dashboard_result_select"
-            )
-            selected_result_id = result_options[result_label]
-            result_row = completed[completed["id"] == selected_result_id].iloc[0]
-            match_no = match_numbers.get(int(result_row["id"]), result_row["id"])
+        for result in index["results"]:
             st.markdown(
                 f"""
                 <div class="score-card" style="box-shadow: 0 14px 24px rgba(16,185,129,0.12); border-left: 6px solid rgba(16,185,129,0.8);">
-                    <div class="score-card__title">Match #{match_no} — {result_row['team_a']} vs {result_row['team_b']}</div>
+                    <div class="score-card__title">Match #{result['match_number']} — {result['team_a']['team']} vs {result['team_b']['team']}</div>
                     <div class="score-card__meta">
-                        {result_row['team_a_runs']}/{result_row['team_a_wickets']} ({format_overs(result_row['team_a_overs'])} ov) •
-                        {result_row['team_b_runs']}/{result_row['team_b_wickets']} ({format_overs(result_row['team_b_overs'])} ov)
+                        {result['team_a']['runs']}/{result['team_a']['wickets']} ({result['team_a']['overs']} ov) •
+                        {result['team_b']['runs']}/{result['team_b']['wickets']} ({result['team_b']['overs']} ov)
                     </div>
-                    <div class="score-card__meta">Winner: <strong>{result_row['winner'] or '—'}</strong></div>
+                    <div class="score-card__meta">Winner: <strong>{result['winner'] or '—'}</strong></div>
                 </div>
                 """,
                 unsafe_allow_html=True,
             )
 
     with schedule_tab:
-        scheduled = get_data("SELECT team_a, team_b, status FROM matches WHERE status = 'Scheduled'")
-        if scheduled.empty:
+        if not index["upcoming"]:
             st.info("No upcoming matches scheduled.")
         else:
-            schedule_view = scheduled.rename(columns={"team_a": "Team A", "team_b": "Team B", "status": "Status"})
-            table_height = min(len(schedule_view) * 34 + 60, 260)
             st.dataframe(
-                schedule_view,
+                pd.DataFrame(index["upcoming"]).rename(
+                    columns={"match_number": "Match #", "team_a": "Team A", "team_b": "Team B"}
+                ).drop(columns=["id"]),
                 use_container_width=True,
                 hide_index=True,
-                height=table_height,
             )
 
 
@@ -792,9 +1053,11 @@ def render_scorer():
     if "active_match_id" not in st.session_state:
         st.session_state.active_match_id = None
     if "log" not in st.session_state:
-        st.session_state.log = []
+        st.session_state.log = deque(maxlen=COMMENTARY_BUFFER)
     if "history" not in st.session_state:
-        st.session_state.history = []
+        st.session_state.history = UndoHistory()
+    if "match_versions" not in st.session_state:
+        st.session_state.match_versions = {}  # match_id -> matches.version this session's live fields were built on
     if "match_strikers" not in st.session_state:
         st.session_state.match_strikers = {}  # keyed by match_id -> {"striker": name, "non_striker": name, "striker_team": team}
     if "match_bowlers" not in st.session_state:
@@ -803,8 +1066,6 @@ def render_scorer():
         st.session_state.pending_bowler = {}
     if "match_innings_complete" not in st.session_state:
         st.session_state.match_innings_complete = {}
-    if "match_bowling_figures" not in st.session_state:
-        st.session_state.match_bowling_figures = {}
     if "run_out_dialog" not in st.session_state:
         st.session_state.run_out_dialog = {}
     if "no_ball_dialog" not in st.session_state:
@@ -814,40 +1075,41 @@ def render_scorer():
     if "wicket_nbo_dialog" not in st.session_state:
         st.session_state.wicket_nbo_dialog = {}
 
-    now_ts = datetime.now().timestamp()
-    if st.session_state.notifications:
-        for note in st.session_state.notifications:
-            note_entry = {
-                "message": note.get("message", ""),
-                "icon": note.get("icon", "ℹ️"),
-                "expiry": now_ts + note.get("duration", 10),
-                "level": note.get("level", "info"),
-            }
-            st.session_state.active_notifications.append(note_entry)
-        st.session_state.notifications = []
+    def show_notifications():
+        now_ts = datetime.now().timestamp()
+        if st.session_state.notifications:
+            for note in st.session_state.notifications:
+                note_entry = {
+                    "message": note.get("message", ""),
+                    "icon": note.get("icon", "ℹ️"),
+                    "expiry": now_ts + note.get("duration", 10),
+                    "level": note.get("level", "info"),
+                }
+                st.session_state.active_notifications.append(note_entry)
+            st.session_state.notifications = []
 
-    st.session_state.active_notifications = [
-        note for note in st.session_state.active_notifications
-        if note.get("expiry", 0) > now_ts
-    ]
-
-    if st.session_state.active_notifications:
-        cards_html = []
-        for note in st.session_state.active_notifications:
-            icon = note.get("icon", "ℹ️")
-            message_html = note.get("message", "").replace("\n", "<br>")
-            level = note.get("level", "info")
-            extra_class = "success" if level == "success" else "alert" if level == "alert" else ""
-            cards_html.append(
-                f"<div class='notification-card {extra_class}'>"
-                f"<span class='notification-icon'>{icon}</span>"
-                f"<div>{message_html}</div>"
-                "</div>"
+        st.session_state.active_notifications = [
+            note for note in st.session_state.active_notifications
+            if note.get("expiry", 0) > now_ts
+        ]
+
+        if st.session_state.active_notifications:
+            cards_html = []
+            for note in st.session_state.active_notifications:
+                icon = note.get("icon", "ℹ️")
+                message_html = note.get("message", "").replace("\n", "<br>")
+                level = note.get("level", "info")
+                extra_class = "success" if level == "success" else "alert" if level == "alert" else ""
+                cards_html.append(
+                    f"<div class='notification-card {extra_class}'>"
+                    f"<span class='notification-icon'>{icon}</span>"
+                    f"<div>{message_html}</div>"
+                    "</div>"
+                )
+            st.markdown(
+                "<div class='notification-banner'>" + "".join(cards_html) + "</div>",
+                unsafe_allow_html=True,
             )
-        st.markdown(
-            "<div class='notification-banner'>" + "".join(cards_html) + "</div>",
-            unsafe_allow_html=True,
-        )
 
     # -----------------------------
     # Helpers: safe conversions
@@ -858,12 +1120,6 @@ def render_scorer():
         except Exception:
             return 0
 
-    def safe_float(x):
-        try:
-            return float(x)
-        except Exception:
-            return 0.0
-
     def queue_notification(message, icon="ℹ️", level="info", duration=10):
         st.session_state.notifications.append({
             "message": message,
@@ -895,466 +1151,324 @@ def render_scorer():
             st.session_state.pop(suffix, None)
 
     # -----------------------------
-    # DB helpers for player & match updates
+    # DB helpers for match updates
     # -----------------------------
-    def update_player_stats(player_name, team_name, runs_scored, is_wicket, is_extra, credit_batsman=True, dismissal_code=None):
-        """Increment player stats in DB.
-        credit_batsman=False => do not add runs to batsman (used for neutral run credits).
-        is_extra=True => does not increment ball count (wide/no-ball)."""
-        if not player_name:
-            return
-
-        # Determine increments
-        ball_inc = 0 if is_extra else 1
-        four_inc = 1 if credit_batsman and runs_scored == 4 else 0
-        six_inc = 1 if credit_batsman and runs_scored == 6 else 0
-        runs_inc = runs_scored if credit_batsman else 0
-
-        params = []
-        set_clauses = []
-        if runs_inc:
-            set_clauses.append("runs = runs + ?"); params.append(runs_inc)
-        if ball_inc:
-            set_clauses.append("balls = balls + ?"); params.append(ball_inc)
-        if four_inc:
-            set_clauses.append("fours = fours + ?"); params.append(four_inc)
-        if six_inc:
-            set_clauses.append("sixes = sixes + ?"); params.append(six_inc)
-
-        if set_clauses:
-            query = f"UPDATE players SET {', '.join(set_clauses)} WHERE player_name = ? AND team_name = ?"
-            params.extend([player_name, team_name])
-            run_query(query, tuple(params))
-
-        if is_wicket:
-            status_text = "Out"
-            if dismissal_code:
-                status_text = f"Out ({dismissal_code})"
-            run_query(
-                "UPDATE players SET out_status = ? WHERE player_name = ? AND team_name = ?",
-                (status_text, player_name, team_name),
-            )
-
     def get_match_prefix(team_name, match_row):
         return "team_a" if team_name == match_row["team_a"] else "team_b"
 
-    def update_bowling_figures(match_id, fielding_team, bowler_name, runs_scored, is_wicket, is_extra, credit_batsman):
-        """Track bowling stats per match for current innings."""
-        if not bowler_name:
-            return
-        figures = st.session_state.match_bowling_figures.setdefault(match_id, {})
-        entry = figures.setdefault(
-            bowler_name,
-            {"team": fielding_team, "runs": 0, "balls": 0, "wickets": 0},
-        )
-        runs_conceded = runs_scored
-        if not credit_batsman and not is_extra:
-            runs_conceded = 0
-        entry["runs"] += runs_conceded
-        if not is_extra:
-            entry["balls"] += 1
-        if is_wicket:
-            entry["wickets"] += 1
-
-        current_bowler = st.session_state.match_bowlers.get(match_id)
-        if current_bowler == bowler_name:
-            run_query(
-                "UPDATE matches SET current_bowler_runs = ?, current_bowler_wickets = ? WHERE id = ?",
-                (entry["runs"], entry["wickets"], match_id),
-            )
-
-    DISMISSAL_META = {
-        "Bowled": ("Bowled", "B"),
-        "Catch Out": ("Catch Out", "C"),
-        "Run Out": ("Run Out", "R"),
-        "No Ball Run Out": ("No Ball Run Out", "NBO"),
-    }
-
-    def resolve_dismissal_meta(dismissal_type, is_wicket):
-        if dismissal_type in DISMISSAL_META:
-            return DISMISSAL_META[dismissal_type]
-        if dismissal_type:
-            return dismissal_type, None
-        if is_wicket:
-            return "Wicket", None
-        return None, None
+    def live_match_row(match_id):
+        """The match row as committed now, with its batting prefix and fielding side."""
+        match_row = get_live_data("SELECT * FROM matches WHERE id = ?", (match_id,)).iloc[0]
+        batting_team = match_row["batting_team"]
+        fielding_team = match_row["team_b"] if batting_team == match_row["team_a"] else match_row["team_a"]
+        return match_row, get_match_prefix(batting_team, match_row), fielding_team
 
     # -----------------------------
-    # Snapshot / Undo
+    # Scoring engine <-> session state
     # -----------------------------
-    def snapshot_state(match_id, batting_team, action_text):
-        """Save snapshot for undo (match + two players)"""
-        match_row = get_live_data("SELECT * FROM matches WHERE id = ?", (match_id,)).iloc[0]
-        prefix = get_match_prefix(batting_team, match_row)
-        snap = {
-            "match_id": match_id,
-            "action": action_text,
-            "log": list(st.session_state.log),
-            "match_runs": safe_int(match_row[f"{prefix}_runs"]),
-            "match_wickets": safe_int(match_row[f"{prefix}_wickets"]),
-            "match_overs": safe_float(match_row[f"{prefix}_overs"]),
-            "striker": st.session_state.match_strikers.get(match_id, {}).get("striker"),
-            "non_striker": st.session_state.match_strikers.get(match_id, {}).get("non_striker"),
-            "batting_team": batting_team,
-            "current_bowler": st.session_state.match_bowlers.get(match_id),
-            "pending_bowler": st.session_state.pending_bowler.get(match_id, False),
-            "innings_complete": st.session_state.match_innings_complete.get(match_id, False),
-        }
-        snap["bowling_figures"] = deepcopy(st.session_state.match_bowling_figures.get(match_id, {}))
-        for p in ("striker", "non_striker"):
-            pname = snap.get(p)
-            if pname:
-                df = get_live_data(
-                    "SELECT runs, balls, fours, sixes, out_status FROM players WHERE player_name = ? AND team_name = ?",
-                    (pname, batting_team)
-                )
-                snap[f"{p}_stats"] = df.iloc[0].to_dict() if not df.empty else None
-            else:
-                snap[f"{p}_stats"] = None
-        st.session_state.history.append(snap)
+    def session_live_fields(match_id):
+        """This session's live fields for the engine's MatchState."""
+        roles = st.session_state.match_strikers.get(match_id, {})
+        return dict(
+            striker=roles.get("striker"),
+            non_striker=roles.get("non_striker"),
+            bowler=st.session_state.match_bowlers.get(match_id),
+            pending_bowler=st.session_state.pending_bowler.get(match_id, False),
+            innings_complete=st.session_state.match_innings_complete.get(match_id, False),
+        )
 
-    def restore_snapshot():
-        if not st.session_state.history:
-            st.warning("Nothing to undo")
-            return
-        last = st.session_state.history.pop()
-        match_id = last["match_id"]
-        batting_team_snap = last.get("batting_team")
-        match_row = get_live_data("SELECT * FROM matches WHERE id = ?", (match_id,)).iloc[0]
-        prefix = get_match_prefix(batting_team_snap, match_row) if batting_team_snap else "team_a"
-        run_query(f"UPDATE matches SET {prefix}_runs=?, {prefix}_wickets=?, {prefix}_overs=? WHERE id=?",
-                  (last["match_runs"], last["match_wickets"], last["match_overs"], match_id))
-
-        # restore players with team_name constraint
-        for p in ("striker", "non_striker"):
-            pname = last.get(p)
-            pst = last.get(f"{p}_stats")
-            if pname and pst:
-                run_query("""
-                    UPDATE players SET runs=?, balls=?, fours=?, sixes=?, out_status=? 
-                    WHERE player_name=? AND team_name=?
-                """, (safe_int(pst.get("runs", 0)), safe_int(pst.get("balls", 0)),
-                      safe_int(pst.get("fours", 0)), safe_int(pst.get("sixes", 0)),
-                      pst.get("out_status", "Not Out"), pname, batting_team_snap))
-        st.session_state.log = last["log"]
-        # restore striker/non-striker in session if snapshot had them
-        if match_id not in st.session_state.match_strikers:
-            st.session_state.match_strikers[match_id] = {"striker": None, "non_striker": None, "striker_team": last.get("batting_team")}
-        st.session_state.match_strikers[match_id]["striker"] = last.get("striker")
-        st.session_state.match_strikers[match_id]["non_striker"] = last.get("non_striker")
-
-        if "match_bowling_figures" not in st.session_state:
-            st.session_state.match_bowling_figures = {}
-        st.session_state.match_bowling_figures[match_id] = last.get("bowling_figures", {})
-
-        if "match_bowlers" not in st.session_state:
-            st.session_state.match_bowlers = {}
-        st.session_state.match_bowlers[match_id] = last.get("current_bowler")
-
-        if "pending_bowler" not in st.session_state:
-            st.session_state.pending_bowler = {}
-        st.session_state.pending_bowler[match_id] = bool(last.get("pending_bowler", False))
-
-        if "match_innings_complete" not in st.session_state:
-            st.session_state.match_innings_complete = {}
-        st.session_state.match_innings_complete[match_id] = bool(last.get("innings_complete", False))
-
-        # Clear any open modals related to this match when undoing
+    def store_match_state(state, new_innings=False):
+        """Copy the engine's live fields back into session state."""
+        match_id = state.match_id
+        if new_innings:
+            st.session_state.match_strikers.pop(match_id, None)
+        elif match_id in st.session_state.match_strikers:
+            st.session_state.match_strikers[match_id]["striker"] = state.striker
+            st.session_state.match_strikers[match_id]["non_striker"] = state.non_striker
+        st.session_state.match_bowlers[match_id] = state.bowler
+        st.session_state.pending_bowler[match_id] = state.pending_bowler
+        st.session_state.match_innings_complete[match_id] = state.innings_complete
+
+    def store_live_fields(match_id, live, batting_team):
+        """Put the live fields from before an undone ball back into session state."""
+        roles = st.session_state.match_strikers.setdefault(
+            match_id, {"striker": None, "non_striker": None, "striker_team": batting_team}
+        )
+        roles.update(striker=live["striker"], non_striker=live["non_striker"], striker_team=batting_team)
+        st.session_state.match_bowlers[match_id] = live["bowler"]
+        st.session_state.pending_bowler[match_id] = live["pending_bowler"]
+        st.session_state.match_innings_complete[match_id] = live["innings_complete"]
+
+    def clear_dialogs(match_id):
         st.session_state.run_out_dialog.pop(match_id, None)
         st.session_state.no_ball_dialog.pop(match_id, None)
         st.session_state.wicket_dialog.pop(match_id, None)
         st.session_state.wicket_nbo_dialog.pop(match_id, None)
 
-        st.success(f"Undone: {last['action']}")
+    def resync_match(match_id, version):
+        """Another console wrote the match: drop everything this session built on the old version."""
+        st.session_state.match_versions[match_id] = version
+        st.session_state.history = UndoHistory()
+        st.session_state.match_strikers.pop(match_id, None)
+        st.session_state.pending_bowler.pop(match_id, None)
+        st.session_state.match_innings_complete.pop(match_id, None)
+        st.session_state.log = commentary_buffer(match_id)
+        clear_dialogs(match_id)
+        queue_notification(
+            "This match was updated from another console. Batters, bowler and commentary were reloaded "
+            "and undo history cleared; check the crease before the next ball.",
+            icon="🔁",
+            level="alert",
+        )
 
     # -----------------------------
-    # Core: apply delivery (updates match + player)
+    # Undo / redo
     # -----------------------------
-    def apply_delivery(match_id, batting_team, striker_name, non_striker_name, runs_scored, is_wicket, is_extra, credit_batsman=True, dismissed_player=None, dismissal_type=None, batsman_runs=None):
-        """Handles ball-by-ball update including overs, strike rotation and player updates."""
-        display_label, dismissal_code = resolve_dismissal_meta(dismissal_type, is_wicket)
-
-        parts = [f"{striker_name or 'Team'} → {runs_scored}"]
-        if is_wicket:
-            parts.append("W")
-        if is_extra:
-            parts.append("(extra)")
-        if display_label:
-            parts.append(f"[{display_label}]")
-        action_text = " ".join(parts)
-
-        dismissed_name = dismissed_player or (striker_name if is_wicket else None)
-        striker_dismissed = bool(is_wicket and striker_name and dismissed_name == striker_name)
-        snapshot_state(match_id, batting_team, action_text)
-
-        st.session_state.setdefault("match_bowlers", {})
-        st.session_state.setdefault("pending_bowler", {})
-
-        credited_runs = 0
-        if batsman_runs is not None:
-            credited_runs = max(0, batsman_runs)
-        elif credit_batsman and not is_extra:
-            credited_runs = runs_scored
-
-        if striker_name and credit_batsman:
-            should_record = not is_extra or credited_runs > 0 or (is_wicket and striker_dismissed)
-            if should_record:
-                update_player_stats(
-                    striker_name,
-                    batting_team,
-                    credited_runs,
-                    is_wicket and striker_dismissed,
-                    is_extra,
-                    credit_batsman=True,
-                    dismissal_code=dismissal_code if striker_dismissed else None,
-                )
-        elif striker_name and not credit_batsman and not is_extra:
-            # ball counts but striker receives no additional runs
-            update_player_stats(striker_name, batting_team, 0, False, False, credit_batsman=False)
-            run_query("UPDATE players SET balls = balls + 1 WHERE player_name = ? AND team_name = ?", (striker_name, batting_team))
-        # extras (wide/no-ball): do not credit batsman or balls (handled above)
-
-        # Update match scoreboard
-        row = get_data("SELECT * FROM matches WHERE id = ?", (match_id,)).iloc[0]
-        prefix = get_match_prefix(batting_team, row)
-        current_runs = safe_int(row[f"{prefix}_runs"])
-        current_wickets = safe_int(row[f"{prefix}_wickets"])
-        current_overs = safe_float(row[f"{prefix}_overs"])
-        target_score = safe_int(row.get("target", 0))
-        first_innings_team = row.get("first_innings_team")
-        fielding_team = row["team_b"] if batting_team == row["team_a"] else row["team_a"]
-
-        new_runs = current_runs + runs_scored
-        new_wickets = current_wickets + (1 if is_wicket else 0)
-
-        new_overs = current_overs
-        over_completed = False
-        balls_after = None
-        # ball counting for legal deliveries (not wides/no-balls)
-        if not is_extra:
-            over_int = int(current_overs)
-            balls_before = int(round((current_overs - over_int) * 10))
-            balls_after = balls_before + 1
-            if balls_after == 6:
-                new_overs = float(over_int + 1)
-                over_completed = True
-            else:
-                new_overs = over_int + (balls_after / 10.0)
+    def undo_last():
+        history = st.session_state.history
+        if not history.undo:
+            queue_notification("Nothing to undo", icon="↩️", level="alert")
+            return
+        delta = history.undo.pop()
+        match_id = delta.match_id
+        try:
+            transition, live = undo_delivery(engine, delta, st.session_state.match_versions.get(match_id))
+        except MatchConflict as conflict:
+            resync_match(match_id, conflict.actual)
+            return
+        st.session_state.match_versions[match_id] = transition.version
+        history.redo.append(delta)
+        # Reload rather than pop, so the line that dropped off the front when this ball was added comes back
+        st.session_state.log = commentary_buffer(match_id)
+        store_live_fields(match_id, live, delta.batting_team)
+        clear_dialogs(match_id)
+        publish_snapshots(match_id)
+        queue_notification(f"Undone: {delta.action_text}", icon="↩️", level="success")
+
+    def redo_last():
+        """Score the last undone ball again; returns its transition, or None if nothing was scored."""
+        history = st.session_state.history
+        if not history.redo:
+            queue_notification("Nothing to redo", icon="↪️", level="alert")
+            return None
+        delta = history.redo.pop()
+        transition = apply_delivery(delta.match_id, delta.delivery, redo=True)
+        if transition is not None:
+            clear_dialogs(delta.match_id)
+            queue_notification(f"Redone: {delta.action_text}", icon="↪️", level="success")
+        return transition
 
-        run_query(f"UPDATE matches SET {prefix}_runs=?, {prefix}_wickets=?, {prefix}_overs=? WHERE id=?",
-                  (new_runs, new_wickets, new_overs, match_id))
+    # -----------------------------
+    # Core: apply delivery (updates match + player)
+    # -----------------------------
+    def apply_delivery(match_id, delivery, redo=False):
+        """Run one ball through the scoring engine and persist it in a single transaction.
 
-        current_bowler = st.session_state.match_bowlers.get(match_id)
-        update_bowling_figures(
-            match_id,
-            fielding_team,
-            current_bowler,
-            runs_scored,
-            is_wicket,
-            is_extra,
-            credit_batsman,
+        Returns the engine's transition, or None, recording nothing, when
+        another console wrote the match first.
+        """
+        try:
+            state, transition = score_delivery(
+                engine, match_id, delivery, st.session_state.match_versions.get(match_id),
+                **session_live_fields(match_id),
+            )
+        except MatchConflict as conflict:
+            resync_match(match_id, conflict.actual)
+            return None
+        st.session_state.match_versions[match_id] = transition.version
+        if redo:
+            st.session_state.history.undo.append(transition.undo)
+        else:
+            st.session_state.history.record(transition.undo)
+        store_match_state(state, transition.new_innings)
+        for message, icon, level in transition.notifications:
+            queue_notification(message, icon=icon, level=level)
+
+        # append commentary; the ring buffer drops the oldest line, which stays in the log
+        entry = {field: transition.delivery[field] for field in COMMENTARY_FIELDS}
+        entry.update(
+            id=transition.undo.delivery_id,
+            created_at=datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S"),
         )
+        st.session_state.log.append(entry)
+        publish_snapshots(match_id)
+        return transition
 
-        # strike rotation: on odd runs for legal deliveries OR at end of over
-        rotate = False
-        if not is_extra:
-            if credit_batsman and (runs_scored % 2 == 1):
-                rotate = True
-            if balls_after == 6:
-                rotate = True  # end of over rotation
-
-        # apply rotation if needed
-        if rotate and match_id in st.session_state.match_strikers:
-            s = st.session_state.match_strikers[match_id]["striker"]
-            ns = st.session_state.match_strikers[match_id]["non_striker"]
-            st.session_state.match_strikers[match_id]["striker"], st.session_state.match_strikers[match_id]["non_striker"] = ns, s
-
-        match_completed = False
-        innings_completed = False
-
-        # handle wicket: mark out and bring next batsman (only if wicket on legal delivery)
-        if is_wicket:
-            label = display_label or "Wicket"
-            if dismissed_name:
-                latest_stats = get_live_data(
-                    "SELECT runs, balls FROM players WHERE player_name = ? AND team_name = ?",
-                    (dismissed_name, batting_team)
-                )
-                if not latest_stats.empty:
-                    runs_final = safe_int(latest_stats.iloc[0]["runs"])
-                    balls_final = safe_int(latest_stats.iloc[0]["balls"])
-                    strike_rate = (runs_final / balls_final * 100) if balls_final else 0
-                    queue_notification(
-                        f"<strong>{label}!</strong> {dismissed_name} departs for {runs_final} ({balls_final}) • SR {strike_rate:.1f}",
-                        icon="⚠️",
-                        level="alert",
-                    )
-                else:
-                    queue_notification(
-                        f"<strong>{label}!</strong> {dismissed_name} is out.",
-                        icon="⚠️",
-                        level="alert",
-                    )
-                status_text = "Out"
-                if dismissal_code:
-                    status_text = f"Out ({dismissal_code})"
-                run_query(
-                    "UPDATE players SET out_status = ? WHERE player_name = ? AND team_name = ?",
-                    (status_text, dismissed_name, batting_team),
-                )
-
-            striker_roles = st.session_state.match_strikers.get(match_id)
-            dismissed_role = None
-            if striker_roles:
-                if dismissed_name == striker_roles.get("striker"):
-                    dismissed_role = "striker"
-                    striker_roles["striker"] = None
-                elif dismissed_name == striker_roles.get("non_striker"):
-                    dismissed_role = "non_striker"
-                    striker_roles["non_striker"] = None
-
-            bench_df = get_live_data(
-                "SELECT player_name FROM players WHERE team_name = ? AND out_status NOT LIKE 'Out%'",
-                (batting_team,),
-            )
-            bench = bench_df["player_name"].tolist() if not bench_df.empty else []
-
-            if striker_roles:
-                role_for_replacement = dismissed_role or "striker"
-                if role_for_replacement == "non_striker":
-                    current_striker = striker_roles.get("striker")
-                    candidates = [p for p in bench if p != current_striker]
-                    if candidates:
-                        striker_roles["non_striker"] = candidates[0]
-                    else:
-                        striker_roles["non_striker"] = None
-                else:
-                    current_non = striker_roles.get("non_striker")
-                    candidates = [p for p in bench if p != current_non]
-                    if candidates:
-                        striker_roles["striker"] = candidates[0]
-                    else:
-                        striker_roles["striker"] = None
+    # -----------------------------
+    # Console actions (widget callbacks)
+    # -----------------------------
+    # The console is one fragment holding what a ball changes: notices,
+    # scoreboard, cards and the ball buttons. A ball button's callback writes
+    # and returns, so the click reruns the console once and nothing above or
+    # below it. The bowler picker, the dialogs and Match Actions are fragments
+    # of their own, so picking from them reruns only them until they write.
+    # Every Streamlit run ends in a full garbage collection, so a ball is kept
+    # to a single run rather than a rerun per panel.
+    def rerun_after_write(match_id, transition=None, console=False):
+        """Rerun what a callback's write changed; returns when the clicked fragment's own rerun is enough.
+
+        The whole page reruns when the crease was dropped (a resync or a new
+        innings, whose openers are picked above the console) or the match
+        finished and leaves the match picker; `console` reruns the console
+        from one of the fragments nested in it.
+        """
+        if match_id not in st.session_state.match_strikers or (transition is not None and transition.match_completed):
+            st.rerun()
+        if console:
+            st.rerun("scorer_console")
 
-        if target_score and new_runs >= target_score:
+    def score_ball(match_id, delivery, console=False):
+        if st.session_state.match_innings_complete.get(match_id, False):
             queue_notification(
-                f"<strong>{batting_team}</strong> chase down the target of {target_score}!",
-                icon="🏆",
-                level="success",
-            )
-            run_query("UPDATE matches SET status='Completed', winner=? WHERE id=?", (batting_team, match_id))
-            st.session_state.pending_bowler[match_id] = False
-            st.session_state.match_bowlers[match_id] = None
-            run_query(
-                "UPDATE matches SET current_bowler_name = NULL, current_bowler_runs = 0, current_bowler_wickets = 0 WHERE id = ?",
-                (match_id,),
-            )
-            match_completed = True
-
-        if over_completed and not match_completed:
-            formatted_over = format_overs(new_overs)
-            st.session_state.match_bowlers[match_id] = None
-            st.session_state.pending_bowler[match_id] = True
-            run_query(
-                "UPDATE matches SET current_bowler_name = NULL, current_bowler_runs = 0, current_bowler_wickets = 0 WHERE id = ?",
-                (match_id,),
+                "Innings already completed. Swap sides or end the match before logging more deliveries.",
+                icon="🚫",
+                level="alert",
             )
+        elif st.session_state.pending_bowler.get(match_id, False) or not st.session_state.match_bowlers.get(match_id):
             queue_notification(
-                f"Over complete! {batting_team} {new_runs}/{new_wickets} after {formatted_over} overs. Assign a new bowler.",
-                icon="✅",
-                level="info",
+                "Select a bowler before recording deliveries.",
+                icon="⛔",
+                level="alert",
             )
+        else:
+            rerun_after_write(match_id, apply_delivery(match_id, delivery), console)
+            return
+        rerun_after_write(match_id, console=console)
+
+    def score_no_ball(match_id, bat_runs, credit_flag):
+        clear_no_ball_state(match_id)
+        score_ball(match_id, Delivery(
+            1 + bat_runs,
+            False,
+            True,
+            credit_flag,
+            dismissal_type="No Ball",
+            batsman_runs=bat_runs if credit_flag else 0,
+        ), console=True)
+
+    def score_custom_no_ball(match_id):
+        # Read the inputs from session state: they may have changed in this same interaction
+        custom_runs = int(st.session_state.get(f"no_ball_custom_runs_{match_id}", 0))
+        credit_flag = st.session_state.get(f"no_ball_credit_mode_{match_id}", "Batsman") == "Batsman"
+        score_no_ball(match_id, custom_runs, credit_flag)
+
+    def reset_custom_no_ball(match_id):
+        st.session_state[f"no_ball_custom_runs_{match_id}"] = 0
+        st.session_state[f"no_ball_credit_mode_{match_id}"] = "Batsman"
+
+    def score_wicket(match_id, dismissal_type):
+        clear_wicket_state(match_id)
+        score_ball(match_id, Delivery(0, True, False, True, dismissal_type=dismissal_type), console=True)
+
+    def score_no_ball_run_out(match_id, player_name):
+        nbo_runs_val = int(st.session_state.get(f"wicket_nbo_runs_{match_id}", 0))
+        clear_wicket_state(match_id)
+        score_ball(match_id, Delivery(
+            1 + nbo_runs_val,
+            True,
+            True,
+            True,
+            dismissed_player=player_name,
+            dismissal_type="No Ball Run Out",
+            batsman_runs=nbo_runs_val,
+        ), console=True)
+
+    def score_run_out(match_id, player_name):
+        st.session_state.run_out_dialog.pop(match_id, None)
+        score_ball(match_id, Delivery(0, True, False, True, dismissed_player=player_name, dismissal_type="Run Out"),
+                   console=True)
 
-        if not match_completed:
-            remaining_batters = get_live_data(
-                "SELECT player_name FROM players WHERE team_name = ? AND out_status NOT LIKE 'Out%'",
-                (batting_team,)
-            )
-            if len(remaining_batters) <= 1:
-                stranded_name = None
-                if not remaining_batters.empty:
-                    stranded_name = remaining_batters.iloc[0]["player_name"]
-
-                if target_score <= 0:
-                    innings_completed = True
-                    first_total = new_runs
-                    chasing_team = row["team_b"] if batting_team == row["team_a"] else row["team_a"]
-                    target_runs = first_total + 1 if first_total >= 0 else 0
-                    run_query(
-                        """
-                        UPDATE matches
-                        SET batting_team = ?,
-                            target = ?,
-                            first_innings_team = ?,
-                            first_innings_runs = ?,
-                            status = 'Live'
-                        WHERE id = ?
-                        """,
-                        (chasing_team, target_runs, batting_team, first_total, match_id),
-                    )
-                    st.session_state.match_strikers.pop(match_id, None)
-                    st.session_state.match_bowlers[match_id] = None
-                    st.session_state.pending_bowler[match_id] = True
-                    run_query(
-                        "UPDATE matches SET current_bowler_name = NULL, current_bowler_runs = 0, current_bowler_wickets = 0 WHERE id = ?",
-                        (match_id,),
-                    )
-                    st.session_state.match_innings_complete[match_id] = False
-                    st.session_state.match_bowling_figures[match_id] = {}
-                    queue_notification(
-                        f"End of innings! {batting_team} are all out for {first_total}. {chasing_team} need {target_runs} to win.",
-                        icon="🎯",
-                        level="info",
-                    )
-                    st.session_state.log.append(action_text)
-                    st.cache_data.clear()
-                    return
+    def open_dialog(dialog, match_id):
+        st.session_state[dialog][match_id] = True
 
-                innings_completed = True
-                st.session_state.match_innings_complete[match_id] = True
-                st.session_state.pending_bowler[match_id] = False
-                st.session_state.match_bowlers[match_id] = None
-                run_query(
-                    "UPDATE matches SET current_bowler_name = NULL, current_bowler_runs = 0, current_bowler_wickets = 0 WHERE id = ?",
-                    (match_id,),
-                )
-                if match_id in st.session_state.match_strikers:
-                    st.session_state.match_strikers[match_id]["striker"] = None
-                    st.session_state.match_strikers[match_id]["non_striker"] = stranded_name
-                queue_notification(
-                    f"<strong>{batting_team}</strong> innings complete — no batting partner remaining.",
-                    icon="🛑",
-                    level="info",
-                )
-                if target_score and new_runs < target_score:
-                    defending_team = first_innings_team or (row["team_a"] if batting_team == row["team_b"] else row["team_a"])
-                    run_query("UPDATE matches SET status='Completed', winner=? WHERE id=?", (defending_team, match_id))
-                    queue_notification(
-                        f"<strong>{defending_team}</strong> win — {batting_team} are bowled out.",
-                        icon="🏆",
-                        level="success",
-                    )
-                    match_completed = True
+    def close_dialog(dialog, match_id):
+        st.session_state[dialog].pop(match_id, None)
 
-        # append commentary
-        st.session_state.log.append(action_text)
-        # ✅ ADD THIS LINE - Clear cache before rerun
-        st.cache_data.clear()
+    def open_run_out_dialog(match_id):
+        clear_wicket_state(match_id)
+        st.session_state.run_out_dialog[match_id] = True
 
-        if match_completed or innings_completed:
-            return
+    def close_no_ball_run_out(match_id):
+        st.session_state.wicket_nbo_dialog.pop(match_id, None)
+        st.session_state.pop(f"wicket_nbo_runs_{match_id}", None)
+
+    def undo_ball(match_id):
+        undo_last()
+        rerun_after_write(match_id)
+
+    def redo_ball(match_id):
+        rerun_after_write(match_id, redo_last())
+
+    def confirm_bowler(match_id, fielding_team):
+        bowler_choice = st.session_state[f"bowler_select_{match_id}"]
+        try:
+            st.session_state.match_versions[match_id] = update_match(
+                match_id,
+                "UPDATE matches SET current_bowler_name = ?, current_bowler_runs = 0, current_bowler_wickets = 0 WHERE id = ?",
+                (bowler_choice, match_id),
+                expected_version=st.session_state.match_versions.get(match_id),
+                scopes=(match_scope(match_id), "live"),
+            )
+        except MatchConflict as conflict:
+            resync_match(match_id, conflict.actual)
+            st.rerun()
+        publish_snapshots(match_id)
+        st.session_state.match_bowlers[match_id] = bowler_choice
+        st.session_state.pending_bowler[match_id] = False
+        queue_notification(
+            f"<strong>{bowler_choice}</strong> to bowl the next over for {fielding_team}.",
+            icon="🎯",
+            level="success",
+        )
+        rerun_after_write(match_id, console=True)
+
+    def change_bowler(match_id):
+        try:
+            st.session_state.match_versions[match_id] = update_match(
+                match_id,
+                "UPDATE matches SET current_bowler_name = NULL, current_bowler_runs = 0, current_bowler_wickets = 0 WHERE id = ?",
+                (match_id,),
+                expected_version=st.session_state.match_versions.get(match_id),
+                scopes=(match_scope(match_id), "live"),
+            )
+        except MatchConflict as conflict:
+            resync_match(match_id, conflict.actual)
+            st.rerun()
+        publish_snapshots(match_id)
+        st.session_state.pending_bowler[match_id] = True
+        st.session_state.match_bowlers[match_id] = None
+        queue_notification(
+            "Bowling change requested. Select the new bowler before continuing.",
+            icon="🔄",
+            level="info",
+        )
+        rerun_after_write(match_id, console=True)
+
+    def set_striker(match_id):
+        st.session_state.match_strikers[match_id]["striker"] = st.session_state[f"assign_striker_{match_id}"]
+        rerun_after_write(match_id, console=True)
+
+    def set_non_striker(match_id):
+        new_non = st.session_state[f"assign_non_striker_{match_id}"]
+        current_striker_now = st.session_state.match_strikers[match_id]["striker"]
+        current_non_now = st.session_state.match_strikers[match_id]["non_striker"]
+        if new_non == current_striker_now and current_non_now:
+            st.session_state.match_strikers[match_id]["striker"] = current_non_now
+            st.session_state.match_strikers[match_id]["non_striker"] = current_striker_now
+        else:
+            st.session_state.match_strikers[match_id]["non_striker"] = new_non
+        rerun_after_write(match_id, console=True)
 
     # -----------------------------
     # Fetch live matches & select match (top part)
     # -----------------------------
-    matches = get_data("SELECT * FROM matches WHERE status = 'Live'")
+    matches = get_data("SELECT * FROM matches WHERE status = 'Live'", scopes=("schedule",))
     if matches.empty:
         st.warning("No LIVE matches found. Ask Admin to start a match.")
         return
 
-    match_numbers = get_match_number_map()
     match_options = {
-        f"Match #{match_numbers.get(int(r['id']), r['id'])}: {r['team_a']} vs {r['team_b']}": r['id']
+        f"Match #{r['match_number']}: {r['team_a']} vs {r['team_b']}": r['id']
         for _, r in matches.iterrows()
     }
     selected_label = st.selectbox("Select Match", list(match_options.keys()))
@@ -1362,24 +1476,26 @@ def render_scorer():
 
     if st.session_state.active_match_id != match_id:
         st.session_state.active_match_id = match_id
-        st.session_state.log = []
-        st.session_state.history = []
+        st.session_state.log = commentary_buffer(match_id)
+        st.session_state.history = UndoHistory()
+        st.session_state.match_versions = {}
         st.session_state.notifications = []
         st.session_state.active_notifications = []
         st.session_state.match_strikers = {}
         st.session_state.match_bowlers = {}
         st.session_state.pending_bowler = {}
         st.session_state.match_innings_complete = {}
-        st.session_state.match_bowling_figures = {}
         st.session_state.run_out_dialog = {}
         st.session_state.no_ball_dialog = {}
         st.session_state.wicket_dialog = {}
         st.session_state.wicket_nbo_dialog = {}
 
-    match_row = get_live_data("SELECT * FROM matches WHERE id = ?", (match_id,)).iloc[0]
+    match_row, prefix, fielding_team = live_match_row(match_id)
+    row_version = int(match_row["version"])
+    if st.session_state.match_versions.setdefault(match_id, row_version) != row_version:
+        resync_match(match_id, row_version)
+        st.rerun()
     batting_team = match_row["batting_team"]
-    prefix = get_match_prefix(batting_team, match_row)
-    fielding_team = match_row["team_b"] if batting_team == match_row["team_a"] else match_row["team_a"]
 
     stored_bowler = match_row.get("current_bowler_name")
     st.session_state.match_bowlers[match_id] = stored_bowler
@@ -1387,8 +1503,6 @@ def render_scorer():
         st.session_state.match_innings_complete[match_id] = False
     if match_id not in st.session_state.pending_bowler or not st.session_state.match_innings_complete[match_id]:
         st.session_state.pending_bowler[match_id] = stored_bowler is None
-    if match_id not in st.session_state.match_bowling_figures:
-        st.session_state.match_bowling_figures[match_id] = {}
 
     # -----------------------------
     # Ensure striker/non-striker set in session (initialize from players if not present)
@@ -1408,20 +1522,66 @@ def render_scorer():
             striker = None
             non_striker = None
         st.session_state.match_strikers[match_id] = {"striker": striker, "non_striker": non_striker, "striker_team": batting_team}
-    striker = st.session_state.match_strikers[match_id]["striker"]
-    non_striker = st.session_state.match_strikers[match_id]["non_striker"]
+
+    # Global styling for the ball buttons; it outlives the fragment reruns below
+    st.markdown(
+        """
+        <style>
+        .ball-control div.stButton>button {
+            background: linear-gradient(135deg, #2563eb 0%, #1e40af 100%) !important;
+            color: #ffffff !important;
+            border: 1px solid rgba(255, 255, 255, 0.35) !important;
+            border-radius: 18px !important;
+            font-weight: 600 !important;
+            font-size: 0.98rem !important;
+            letter-spacing: 0.03em !important;
+            padding: 0.8rem 0.4rem !important;
+            min-height: 58px !important;
+            box-shadow: 0 16px 32px rgba(37, 99, 235, 0.3) !important;
+            transition: transform 0.18s ease-in-out, box-shadow 0.18s ease-in-out, filter 0.18s ease-in-out !important;
+            text-transform: uppercase !important;
+            position: relative;
+            overflow: hidden;
+        }
+        .ball-control div.stButton>button:hover {
+            filter: brightness(1.1);
+            box-shadow: 0 26px 40px rgba(37, 99, 235, 0.42);
+            transform: translateY(-4px);
+        }
+        .ball-control div.stButton>button::after {
+            content: "";
+            position: absolute;
+            inset: 0;
+            background: linear-gradient(135deg, rgba(255,255,255,0.18), rgba(255,255,255,0));
+            opacity: 0.3;
+            transition: opacity 0.18s ease-in-out;
+        }
+        .ball-control div.stButton>button:hover::after {
+            opacity: 0.55;
+        }
+        .ball-control div.stButton>button:focus-visible {
+            outline: none !important;
+            box-shadow: 0 0 0 3px rgba(255, 255, 255, 0.9), 0 0 0 7px rgba(37, 99, 235, 0.55) !important;
+        }
+        .ball-control div.stButton {
+            margin-bottom: 0.55rem;
+        }
+        .ball-control {
+            padding: 0.4rem 0.2rem 0.5rem;
+        }
+        .ball-control .stColumn {
+            display: flex;
+            justify-content: center;
+        }
+        </style>
+        """,
+        unsafe_allow_html=True,
+    )
 
     # -----------------------------
     # SCOREBOARD + CONTROLS LAYOUT
     # -----------------------------
-    pending_bowler = st.session_state.pending_bowler.get(match_id, False)
-    allow_scoring = (
-        not pending_bowler
-        and bool(st.session_state.match_bowlers.get(match_id))
-        and not st.session_state.match_innings_complete.get(match_id, False)
-    )
-
-    def batter_snapshot(player_name):
+    def batter_snapshot(player_name, batting_team):
         if not player_name:
             return "—", "Awaiting partner"
         snapshot_df = get_live_data(
@@ -1440,23 +1600,18 @@ def render_scorer():
             f"{runs_val} ({balls_val}) · 4s:{fours_val} · 6s:{sixes_val}",
         )
 
-    batting_card = pd.DataFrame()
-    if batting_team:
-        batting_card = get_live_data(
-            "SELECT player_name, runs, balls, fours, sixes, out_status FROM players WHERE team_name = ?",
-            (batting_team,)
-        )
-
-    summary_col, control_col = st.columns([1.25, 1])
+    def scoreboard(match_id, match_row, prefix):
+        batting_team = match_row["batting_team"]
+        striker = st.session_state.match_strikers[match_id]["striker"]
+        non_striker = st.session_state.match_strikers[match_id]["non_striker"]
 
-    with summary_col:
         runs_val = safe_int(match_row[f"{prefix}_runs"])
         wickets_val = safe_int(match_row[f"{prefix}_wickets"])
-        overs_display = format_overs(match_row[f"{prefix}_overs"])
-        run_rate_display = calculate_run_rate(match_row[f"{prefix}_runs"], match_row[f"{prefix}_overs"])
+        overs_display = format_overs(match_row[f"{prefix}_balls"])
+        run_rate_display = calculate_run_rate(match_row[f"{prefix}_runs"], match_row[f"{prefix}_balls"])
         bowler_display = st.session_state.match_bowlers.get(match_id) or "Awaiting selection"
-        striker_name, striker_line = batter_snapshot(striker)
-        non_name, non_line = batter_snapshot(non_striker)
+        striker_name, striker_line = batter_snapshot(striker, batting_team)
+        non_name, non_line = batter_snapshot(non_striker, batting_team)
 
         def add_active_marker(label, active_name):
             if not active_name or not label or label == "—":
@@ -1466,8 +1621,7 @@ def render_scorer():
         striker_display = add_active_marker(striker_name, striker)
         non_display = add_active_marker(non_name, non_striker)
 
-        sum_batter_runs = safe_int(batting_card["runs"].sum()) if not batting_card.empty else 0
-        extras_val = max(0, runs_val - sum_batter_runs)
+        extras_val, extras_split_text = extras_breakdown(match_row, prefix)
 
         summary_html = f"""
         <div class="summary-card compact-section">
@@ -1489,7 +1643,7 @@ def render_scorer():
                 <span style="font-size:0.85rem; font-weight:600; color: var(--secondary);">Extras</span>
                 <span style="font-size:0.95rem; font-weight:700; color: var(--primary);">{extras_val}</span>
             </div>
-            <div style="margin-top:0.35rem; font-size:0.75rem; color: var(--muted); text-align:right;">Includes wides and no-balls</div>
+            <div style="margin-top:0.35rem; font-size:0.75rem; color: var(--muted); text-align:right;">{extras_split_text}</div>
             <div style="margin-top:0.75rem; display:flex; justify-content:space-between; font-size:0.85rem; color: var(--muted);">
                 <span>Bowler: {bowler_display}</span>
                 <span>Run Rate: {run_rate_display}</span>
@@ -1519,7 +1673,19 @@ def render_scorer():
             )
             st.markdown(target_html, unsafe_allow_html=True)
 
-        bowling_figures = st.session_state.match_bowling_figures.get(match_id, {})
+    def cards(match_id, match_row, fielding_team):
+        batting_team = match_row["batting_team"]
+        striker = st.session_state.match_strikers[match_id]["striker"]
+        non_striker = st.session_state.match_strikers[match_id]["non_striker"]
+
+        batting_card = pd.DataFrame()
+        if batting_team:
+            batting_card = get_live_data(
+                "SELECT player_name, runs, balls, fours, sixes, out_status FROM players WHERE team_name = ?",
+                (batting_team,)
+            )
+
+        bowling_card = get_bowling_card(match_id, 2 if safe_int(match_row.get("target", 0)) else 1)
         bat_col, bowl_col = st.columns(2)
 
         with bat_col:
@@ -1562,52 +1728,37 @@ def render_scorer():
 
         with bowl_col:
             st.markdown(f"**Bowling Card — {fielding_team}**")
-            if not bowling_figures:
+            if bowling_card.empty:
                 st.info("No bowling figures recorded yet.")
             else:
-                bowl_rows = []
-                for bowler_name, stats in bowling_figures.items():
-                    balls_bowled = safe_int(stats.get("balls", 0))
-                    overs_text = f"{balls_bowled // 6}.{balls_bowled % 6}"
-                    runs_conceded = safe_int(stats.get("runs", 0))
-                    wickets_taken = safe_int(stats.get("wickets", 0))
-                    economy = (runs_conceded / (balls_bowled / 6)) if balls_bowled else 0.0
-                    bowl_rows.append({
-                        "Bowler": bowler_name,
-                        "Overs": overs_text,
-                        "Runs": runs_conceded,
-                        "Wkts": wickets_taken,
-                        "Econ": economy,
-                        "_balls": balls_bowled,
-                    })
-                bowl_df = pd.DataFrame(bowl_rows)
-                bowl_df = bowl_df.sort_values(
-                    by=["Wkts", "Runs", "_balls"],
-                    ascending=[False, True, True],
-                ).reset_index(drop=True)
-                bowl_df["Econ"] = bowl_df["Econ"].map(
-                    lambda val: f"{float(val):.2f}" if val is not None and not pd.isna(val) else "0.00"
-                )
-                bowl_df = bowl_df.drop(columns=["_balls"])
-                bowl_table_height = min(len(bowl_df) * 32 + 52, 280)
+                bowl_table_height = min(len(bowling_card) * 32 + 52, 280)
                 st.dataframe(
-                    bowl_df,
+                    bowling_card,
                     use_container_width=True,
                     hide_index=True,
                     height=bowl_table_height,
                 )
 
-    with control_col:
-        st.markdown("### Match Controls")
-        current_over_val = safe_float(match_row[f"{prefix}_overs"])
+        st.markdown("**🎙️ Commentary**")
+        render_commentary("scorer", match_id, list(reversed(st.session_state.log)))
+
+    @st.fragment
+    def scorer_bowler(match_id):
+        match_row, prefix, fielding_team = live_match_row(match_id)
+        pending_bowler = st.session_state.pending_bowler.get(match_id, False)
+        current_balls_val = safe_int(match_row[f"{prefix}_balls"])
         current_bowler = st.session_state.match_bowlers.get(match_id)
 
         if pending_bowler:
             prompt_text = "Over complete. Please choose the next bowler."
-            if current_over_val == 0.0:
+            if current_balls_val == 0:
                 prompt_text = "Select the opening bowler to start the innings."
             st.warning(prompt_text)
-            bowlers_df = get_data("SELECT player_name FROM players WHERE team_name = ?", (fielding_team,))
+            bowlers_df = get_data(
+                "SELECT player_name FROM players WHERE team_name = ?",
+                (fielding_team,),
+                (squad_scope(fielding_team),),
+            )
             bowlers = bowlers_df["player_name"].tolist() if not bowlers_df.empty else []
             if not bowlers:
                 st.info(f"No player list available for {fielding_team}. Add players in the Admin panel.")
@@ -1615,205 +1766,136 @@ def render_scorer():
                 default_index = 0
                 if current_bowler and current_bowler in bowlers:
                     default_index = bowlers.index(current_bowler)
-                bowler_choice = st.selectbox(
+                st.selectbox(
                     "Select Bowler",
                     bowlers,
                     index=min(default_index, len(bowlers) - 1),
                     key=f"bowler_select_{match_id}"
                 )
-                if st.button("Confirm Bowler", key=f"confirm_bowler_{match_id}", help="Lock in this bowler for the over"):
-                    st.session_state.match_bowlers[match_id] = bowler_choice
-                    st.session_state.pending_bowler[match_id] = False
-                    run_query(
-                        "UPDATE matches SET current_bowler_name = ?, current_bowler_runs = 0, current_bowler_wickets = 0 WHERE id = ?",
-                        (bowler_choice, match_id),
-                    )
-                    queue_notification(
-                        f"<strong>{bowler_choice}</strong> to bowl the next over for {fielding_team}.",
-                        icon="🎯",
-                        level="success",
-                    )
-                    st.rerun()
+                st.button(
+                    "Confirm Bowler",
+                    key=f"confirm_bowler_{match_id}",
+                    help="Lock in this bowler for the over",
+                    on_click=confirm_bowler,
+                    args=(match_id, fielding_team),
+                )
         else:
             if current_bowler:
                 st.info(f"Current bowler: {current_bowler}")
-                if st.button("Change Bowler", key=f"change_bowler_{match_id}", help="Switch to a different bowler"):
-                    st.session_state.pending_bowler[match_id] = True
-                    st.session_state.match_bowlers[match_id] = None
-                    run_query(
-                        "UPDATE matches SET current_bowler_name = NULL, current_bowler_runs = 0, current_bowler_wickets = 0 WHERE id = ?",
-                        (match_id,),
-                    )
-                    queue_notification(
-                        "Bowling change requested. Select the new bowler before continuing.",
-                        icon="🔄",
-                        level="info",
-                    )
-                    st.rerun()
+                st.button(
+                    "Change Bowler",
+                    key=f"change_bowler_{match_id}",
+                    help="Switch to a different bowler",
+                    on_click=change_bowler,
+                    args=(match_id,),
+                )
             else:
                 st.warning("Assign a bowler to begin scoring.")
 
-        st.markdown("#### Ball-by-ball Controls")
-        st.markdown(
-            """
-            <style>
-            .ball-control div.stButton>button {
-                background: linear-gradient(135deg, #2563eb 0%, #1e40af 100%) !important;
-                color: #ffffff !important;
-                border: 1px solid rgba(255, 255, 255, 0.35) !important;
-                border-radius: 18px !important;
-                font-weight: 600 !important;
-                font-size: 0.98rem !important;
-                letter-spacing: 0.03em !important;
-                padding: 0.8rem 0.4rem !important;
-                min-height: 58px !important;
-                box-shadow: 0 16px 32px rgba(37, 99, 235, 0.3) !important;
-                transition: transform 0.18s ease-in-out, box-shadow 0.18s ease-in-out, filter 0.18s ease-in-out !important;
-                text-transform: uppercase !important;
-                position: relative;
-                overflow: hidden;
-            }
-            .ball-control div.stButton>button:hover {
-                filter: brightness(1.1);
-                box-shadow: 0 26px 40px rgba(37, 99, 235, 0.42);
-                transform: translateY(-4px);
-            }
-            .ball-control div.stButton>button::after {
-                content: "";
-                position: absolute;
-                inset: 0;
-                background: linear-gradient(135deg, rgba(255,255,255,0.18), rgba(255,255,255,0));
-                opacity: 0.3;
-                transition: opacity 0.18s ease-in-out;
-            }
-            .ball-control div.stButton>button:hover::after {
-                opacity: 0.55;
-            }
-            .ball-control div.stButton>button:focus-visible {
-                outline: none !important;
-                box-shadow: 0 0 0 3px rgba(255, 255, 255, 0.9), 0 0 0 7px rgba(37, 99, 235, 0.55) !important;
-            }
-            .ball-control div.stButton {
-                margin-bottom: 0.55rem;
-            }
-            .ball-control {
-                padding: 0.4rem 0.2rem 0.5rem;
-            }
-            .ball-control .stColumn {
-                display: flex;
-                justify-content: center;
-            }
-            </style>
-            """,
-            unsafe_allow_html=True,
+    def ball_controls(match_id):
+        allow_scoring = (
+            not st.session_state.pending_bowler.get(match_id, False)
+            and bool(st.session_state.match_bowlers.get(match_id))
+            and not st.session_state.match_innings_complete.get(match_id, False)
         )
 
-        def do_delivery(runs=0, wicket=False, extra=False, credit_batsman=True, dismissed_player=None, dismissal_type=None, batsman_runs=None):
-            if st.session_state.match_innings_complete.get(match_id, False):
-                queue_notification(
-                    "Innings already completed. Swap sides or end the match before logging more deliveries.",
-                    icon="🚫",
-                    level="alert",
-                )
-                st.warning("This innings has finished. No further deliveries can be recorded.")
-                return
-            if st.session_state.pending_bowler.get(match_id, False) or not st.session_state.match_bowlers.get(match_id):
-                queue_notification(
-                    "Select a bowler before recording deliveries.",
-                    icon="⛔",
-                    level="alert",
-                )
-                st.warning("Assign a bowler to enable scoring controls.")
-                return
-            apply_delivery(
-                match_id,
-                batting_team,
-                st.session_state.match_strikers[match_id]["striker"],
-                st.session_state.match_strikers[match_id]["non_striker"],
-                runs,
-                wicket,
-                extra,
-                credit_batsman,
-                dismissed_player=dismissed_player,
-                dismissal_type=dismissal_type,
-                batsman_runs=batsman_runs,
-            )
-            st.rerun()
-
-        def open_no_ball_dialog():
-            st.session_state.no_ball_dialog[match_id] = True
-
-        def open_wicket_dialog():
-            st.session_state.wicket_dialog[match_id] = True
-
-        def undo_last_delivery():
-            restore_snapshot()
-            st.rerun()
+        st.markdown("#### Ball-by-ball Controls")
 
         button_rows = [
             [
                 {
                     "label": "Dot Ball •",
-                    "callback": lambda: do_delivery(0, False, False, True),
+                    "on_click": score_ball,
+                    "args": (match_id, Delivery(0, False, False, True)),
                     "help": "Dot ball – no runs scored",
                     "respect_lock": True,
                 },
                 {
                     "label": "1 Run",
-                    "callback": lambda: do_delivery(1, False, False, True),
+                    "on_click": score_ball,
+                    "args": (match_id, Delivery(1, False, False, True)),
                     "help": "Add 1 run to striker",
                     "respect_lock": True,
                 },
                 {
                     "label": "2 Runs",
-                    "callback": lambda: do_delivery(2, False, False, True),
+                    "on_click": score_ball,
+                    "args": (match_id, Delivery(2, False, False, True)),
                     "help": "Add 2 runs to striker",
                     "respect_lock": True,
                 },
                 {
                     "label": "3 Runs",
-                    "callback": lambda: do_delivery(3, False, False, True),
+                    "on_click": score_ball,
+                    "args": (match_id, Delivery(3, False, False, True)),
                     "help": "Add 3 runs to striker",
                     "respect_lock": True,
                 },
                 {
                     "label": "Four 4️⃣",
-                    "callback": lambda: do_delivery(4, False, False, True),
+                    "on_click": score_ball,
+                    "args": (match_id, Delivery(4, False, False, True)),
                     "help": "Record a boundary four",
                     "respect_lock": True,
                 },
+                {
+                    "label": "Bye +1",
+                    "on_click": score_ball,
+                    "args": (match_id, Delivery(1, False, False, False)),
+                    "help": "1 bye – a legal ball, run not credited to the striker",
+                    "respect_lock": True,
+                },
+                {
+                    "label": "Leg Bye +1",
+                    "on_click": score_ball,
+                    "args": (match_id, Delivery(1, False, False, False, leg_bye=True)),
+                    "help": "1 leg bye – a legal ball off the body, run not credited to the striker",
+                    "respect_lock": True,
+                },
             ],
             [
                 {
                     "label": "Six 6️⃣",
-                    "callback": lambda: do_delivery(6, False, False, True),
+                    "on_click": score_ball,
+                    "args": (match_id, Delivery(6, False, False, True)),
                     "help": "Record a six",
                     "respect_lock": True,
                 },
                 {
                     "label": "Wide +1",
-                    "callback": lambda: do_delivery(1, False, True, False),
+                    "on_click": score_ball,
+                    "args": (match_id, Delivery(1, False, True, False)),
                     "help": "Add a wide – 1 extra run",
                     "respect_lock": True,
                 },
                 {
                     "label": "No Ball ⚡",
-                    "callback": open_no_ball_dialog,
+                    "on_click": open_dialog,
+                    "args": ("no_ball_dialog", match_id),
                     "help": "Open quick no-ball options",
                     "respect_lock": True,
                 },
                 {
                     "label": "Wicket ❌",
-                    "callback": open_wicket_dialog,
+                    "on_click": open_dialog,
+                    "args": ("wicket_dialog", match_id),
                     "help": "Log a wicket dismissal",
                     "respect_lock": True,
                 },
                 {
                     "label": "Undo ↩️",
-                    "callback": undo_last_delivery,
+                    "on_click": undo_ball,
+                    "args": (match_id,),
                     "help": "Restore the previous delivery",
                     "respect_lock": False,
                 },
+                {
+                    "label": "Redo ↪️",
+                    "on_click": redo_ball,
+                    "args": (match_id,),
+                    "help": "Score the last undone delivery again",
+                    "respect_lock": True,
+                },
             ],
         ]
 
@@ -1822,10 +1904,13 @@ def render_scorer():
             columns = st.columns(len(row))
             for col, spec in zip(columns, row):
                 disabled = (not allow_scoring) if spec.get("respect_lock", True) else False
-                if col.button(spec["label"], disabled=disabled, help=spec["help"]):
-                    spec["callback"]()
+                col.button(spec["label"], disabled=disabled, help=spec["help"], on_click=spec["on_click"], args=spec["args"])
         st.markdown('</div>', unsafe_allow_html=True)
 
+    @st.fragment
+    def scorer_dialogs(match_id):
+        batting_team = live_match_row(match_id)[0]["batting_team"]
+
         if st.session_state.no_ball_dialog.get(match_id):
             no_ball_container = st.container()
             with no_ball_container:
@@ -1843,31 +1928,25 @@ def render_scorer():
                 quick_cols = st.columns(3)
                 for idx, (label, bat_runs, credit_flag, key_suffix) in enumerate(quick_options):
                     target_col = quick_cols[idx % len(quick_cols)]
-                    if target_col.button(label, key=f"nb_quick_{key_suffix}_{match_id}", help=label):
-                        clear_no_ball_state(match_id)
-                        total_runs = 1 + bat_runs
-                        do_delivery(
-                            total_runs,
-                            False,
-                            True,
-                            credit_flag,
-                            dismissal_type="No Ball",
-                            batsman_runs=bat_runs if credit_flag else 0,
-                        )
+                    target_col.button(
+                        label,
+                        key=f"nb_quick_{key_suffix}_{match_id}",
+                        help=label,
+                        on_click=score_no_ball,
+                        args=(match_id, bat_runs, credit_flag),
+                    )
 
                 st.markdown("---")
                 st.markdown("**Custom combination**")
                 custom_cols = st.columns(2)
-                custom_runs = int(
-                    custom_cols[0].number_input(
-                        "Runs completed",
-                        min_value=0,
-                        max_value=10,
-                        step=1,
-                        key=f"no_ball_custom_runs_{match_id}",
-                    )
+                custom_cols[0].number_input(
+                    "Runs completed",
+                    min_value=0,
+                    max_value=10,
+                    step=1,
+                    key=f"no_ball_custom_runs_{match_id}",
                 )
-                credit_choice = custom_cols[1].radio(
+                custom_cols[1].radio(
                     "Credit to",
                     ["Extras", "Batsman"],
                     index=1,
@@ -1877,27 +1956,14 @@ def render_scorer():
 
                 custom_cols_action = st.columns([1, 1, 1])
                 with custom_cols_action[0]:
-                    if st.button("Apply", key=f"apply_no_ball_custom_{match_id}", help="Use the custom no-ball values"):
-                        credit_flag = credit_choice == "Batsman"
-                        clear_no_ball_state(match_id)
-                        total_runs = 1 + custom_runs
-                        do_delivery(
-                            total_runs,
-                            False,
-                            True,
-                            credit_flag,
-                            dismissal_type="No Ball",
-                            batsman_runs=custom_runs if credit_flag else 0,
-                        )
+                    st.button("Apply", key=f"apply_no_ball_custom_{match_id}", help="Use the custom no-ball values",
+                              on_click=score_custom_no_ball, args=(match_id,))
                 with custom_cols_action[1]:
-                    if st.button("Reset", key=f"reset_no_ball_custom_{match_id}", help="Reset custom no-ball inputs"):
-                        st.session_state[f"no_ball_custom_runs_{match_id}"] = 0
-                        st.session_state[f"no_ball_credit_mode_{match_id}"] = "Batsman"
-                        st.rerun()
+                    st.button("Reset", key=f"reset_no_ball_custom_{match_id}", help="Reset custom no-ball inputs",
+                              on_click=reset_custom_no_ball, args=(match_id,))
                 with custom_cols_action[2]:
-                    if st.button("Close", key=f"close_no_ball_{match_id}", help="Dismiss the no-ball panel"):
-                        clear_no_ball_state(match_id)
-                        st.rerun()
+                    st.button("Close", key=f"close_no_ball_{match_id}", help="Dismiss the no-ball panel",
+                              on_click=clear_no_ball_state, args=(match_id,))
 
         if st.session_state.wicket_dialog.get(match_id):
             wicket_container = st.container()
@@ -1911,104 +1977,82 @@ def render_scorer():
                 active_batter_available = bool(striker_name_now or non_striker_name_now)
 
                 wicket_cols = st.columns(4)
-                if wicket_cols[0].button(
+                wicket_cols[0].button(
                     "Bowled (B)",
                     key=f"wicket_bowled_{match_id}",
                     disabled=not striker_name_now,
                     help="Bowled dismissal for the striker",
-                ):
-                    if striker_name_now:
-                        clear_wicket_state(match_id)
-                        do_delivery(0, True, False, True, dismissal_type="Bowled")
+                    on_click=score_wicket,
+                    args=(match_id, "Bowled"),
+                )
 
-                if wicket_cols[1].button(
+                wicket_cols[1].button(
                     "Catch out (C)",
                     key=f"wicket_catch_{match_id}",
                     disabled=not striker_name_now,
                     help="Caught dismissal for the striker",
-                ):
-                    if striker_name_now:
-                        clear_wicket_state(match_id)
-                        do_delivery(0, True, False, True, dismissal_type="Catch Out")
+                    on_click=score_wicket,
+                    args=(match_id, "Catch Out"),
+                )
 
-                if wicket_cols[2].button(
+                wicket_cols[2].button(
                     "Run out (R)",
                     key=f"wicket_run_out_{match_id}",
                     disabled=not active_batter_available,
                     help="Open run-out selection",
-                ):
-                    clear_wicket_state(match_id)
-                    st.session_state.run_out_dialog[match_id] = True
+                    on_click=open_run_out_dialog,
+                    args=(match_id,),
+                )
 
-                if wicket_cols[3].button(
+                wicket_cols[3].button(
                     "No ball out (NBO)",
                     key=f"wicket_nbo_{match_id}",
                     disabled=not striker_name_now,
                     help="No-ball run-out workflow",
-                ):
-                    st.session_state.wicket_nbo_dialog[match_id] = True
+                    on_click=open_dialog,
+                    args=("wicket_nbo_dialog", match_id),
+                )
 
                 if not striker_name_now:
                     st.info("Assign the on-strike batter before logging bowled or caught dismissals.")
 
                 close_cols = st.columns([1, 3])
-                if close_cols[0].button("Close", key=f"close_wicket_{match_id}", help="Hide wicket options"):
-                    clear_wicket_state(match_id)
-                    st.rerun()
+                close_cols[0].button("Close", key=f"close_wicket_{match_id}", help="Hide wicket options",
+                                     on_click=clear_wicket_state, args=(match_id,))
 
                 if st.session_state.wicket_nbo_dialog.get(match_id):
                     st.markdown("---")
                     st.markdown("**No ball run out**")
                     st.caption("Enter completed runs (excluding the no ball) then choose the dismissed batter.")
-                    nbo_runs_val = int(
-                        st.number_input(
-                            "Runs completed",
-                            min_value=0,
-                            max_value=10,
-                            step=1,
-                            key=f"wicket_nbo_runs_{match_id}",
-                        )
+                    st.number_input(
+                        "Runs completed",
+                        min_value=0,
+                        max_value=10,
+                        step=1,
+                        key=f"wicket_nbo_runs_{match_id}",
                     )
                     nbo_cols = st.columns(3)
                     has_option = False
                     if striker_name_now:
                         has_option = True
-                        if nbo_cols[0].button(
+                        nbo_cols[0].button(
                             f"{striker_name_now} (striker)",
                             key=f"wicket_nbo_striker_{match_id}",
                             help="Dismiss the striker",
-                        ):
-                            clear_wicket_state(match_id)
-                            do_delivery(
-                                1 + nbo_runs_val,
-                                True,
-                                True,
-                                True,
-                                dismissed_player=striker_name_now,
-                                dismissal_type="No Ball Run Out",
-                                batsman_runs=nbo_runs_val,
-                            )
+                            on_click=score_no_ball_run_out,
+                            args=(match_id, striker_name_now),
+                        )
                     if non_striker_name_now:
                         has_option = True
-                        if nbo_cols[1].button(
+                        nbo_cols[1].button(
                             f"{non_striker_name_now} (non-striker)",
                             key=f"wicket_nbo_non_{match_id}",
                             help="Dismiss the non-striker",
-                        ):
-                            clear_wicket_state(match_id)
-                            do_delivery(
-                                1 + nbo_runs_val,
-                                True,
-                                True,
-                                True,
-                                dismissed_player=non_striker_name_now,
-                                dismissal_type="No Ball Run Out",
-                                batsman_runs=nbo_runs_val,
-                            )
-                    if nbo_cols[2].button("Cancel", key=f"cancel_nbo_panel_{match_id}", help="Close the NBO panel"):
-                        st.session_state.wicket_nbo_dialog.pop(match_id, None)
-                        st.session_state.pop(f"wicket_nbo_runs_{match_id}", None)
-                        st.rerun()
+                            on_click=score_no_ball_run_out,
+                            args=(match_id, non_striker_name_now),
+                        )
+                    nbo_cols[2].button("Cancel", key=f"cancel_nbo_panel_{match_id}", help="Close the NBO panel",
+                                       on_click=close_no_ball_run_out, args=(match_id,))
                     if not has_option:
                         st.warning("No active batters available to dismiss.")
 
@@ -2030,24 +2074,14 @@ def render_scorer():
                 if options:
                     run_out_cols = st.columns(len(options))
                     for idx, (label, player_name, suffix) in enumerate(options):
-                        if run_out_cols[idx].button(label, key=f"run_out_pick_{suffix}_{match_id}", help=f"Dismiss {player_name}"):
-                            st.session_state.run_out_dialog.pop(match_id, None)
-                            do_delivery(
-                                0,
-                                True,
-                                False,
-                                True,
-                                dismissed_player=player_name,
-                                dismissal_type="Run Out",
-                            )
-                    if st.button("Cancel", key=f"cancel_run_out_{match_id}", help="Close run-out options"):
-                        st.session_state.run_out_dialog.pop(match_id, None)
-                        st.rerun()
+                        run_out_cols[idx].button(label, key=f"run_out_pick_{suffix}_{match_id}", help=f"Dismiss {player_name}",
+                                                 on_click=score_run_out, args=(match_id, player_name))
+                    st.button("Cancel", key=f"cancel_run_out_{match_id}", help="Close run-out options",
+                              on_click=close_dialog, args=("run_out_dialog", match_id))
                 else:
                     st.info("No active batters available to dismiss.")
-                    if st.button("Close", key=f"close_run_out_{match_id}", help="Dismiss the run-out dialog"):
-                        st.session_state.run_out_dialog.pop(match_id, None)
-                        st.rerun()
+                    st.button("Close", key=f"close_run_out_{match_id}", help="Dismiss the run-out dialog",
+                              on_click=close_dialog, args=("run_out_dialog", match_id))
 
         with st.expander("Manage Batters", expanded=st.session_state.match_strikers[match_id]["striker"] is None):
             if st.session_state.match_strikers[match_id]["striker"] is None:
@@ -2062,36 +2096,50 @@ def render_scorer():
             if bench_all:
                 current_striker = st.session_state.match_strikers[match_id]["striker"]
                 striker_index = bench_all.index(current_striker) if current_striker in bench_all else 0
-                new_striker = st.selectbox(
+                st.selectbox(
                     "Assign Striker",
                     bench_all,
                     index=striker_index,
                     key=f"assign_striker_{match_id}"
                 )
-                if st.button("Set Striker", key=f"set_striker_direct_{match_id}"):
-                    st.session_state.match_strikers[match_id]["striker"] = new_striker
-                    st.rerun()
+                st.button("Set Striker", key=f"set_striker_direct_{match_id}", on_click=set_striker, args=(match_id,))
 
                 current_non = st.session_state.match_strikers[match_id]["non_striker"]
                 ns_index = bench_all.index(current_non) if current_non in bench_all else 0
-                new_non = st.selectbox(
+                st.selectbox(
                     "Assign Non-Striker",
                     bench_all,
                     index=ns_index,
                     key=f"assign_non_striker_{match_id}"
                 )
-                if st.button("Set Non-Striker", key=f"set_non_striker_direct_{match_id}"):
-                    current_striker_now = st.session_state.match_strikers[match_id]["striker"]
-                    current_non_now = st.session_state.match_strikers[match_id]["non_striker"]
-                    if new_non == current_striker_now and current_non_now:
-                        st.session_state.match_strikers[match_id]["striker"] = current_non_now
-                        st.session_state.match_strikers[match_id]["non_striker"] = current_striker_now
-                    else:
-                        st.session_state.match_strikers[match_id]["non_striker"] = new_non
-                    st.rerun()
+                st.button("Set Non-Striker", key=f"set_non_striker_direct_{match_id}", on_click=set_non_striker,
+                          args=(match_id,))
             else:
                 st.info("No available batters to assign.")
 
+    @st.fragment(key="scorer_console")
+    def scorer_console(match_id):
+        # Fragments rerun with the match_id of the last full run, so each reads the match row itself
+        show_notifications()
+        match_row, prefix, fielding_team = live_match_row(match_id)
+        summary_col, control_col = st.columns([1.25, 1])
+
+        with summary_col:
+            scoreboard(match_id, match_row, prefix)
+            cards(match_id, match_row, fielding_team)
+
+        with control_col:
+            st.markdown("### Match Controls")
+            scorer_bowler(match_id)
+            ball_controls(match_id)
+            scorer_dialogs(match_id)
+
+    @st.fragment(key="scorer_actions")
+    def scorer_actions(match_id):
+        # Balls do not rerun this fragment, so decide from the row as it is when it does run
+        match_row, prefix, _ = live_match_row(match_id)
+        batting_team = match_row["batting_team"]
+
         st.markdown("### Match Actions")
         action_cols = st.columns([1.5, 1])
 
@@ -2111,24 +2159,29 @@ def render_scorer():
                 safe_int(match_row["team_b_runs"]) > 0,
                 safe_int(match_row["team_a_wickets"]) > 0,
                 safe_int(match_row["team_b_wickets"]) > 0,
-                safe_float(match_row["team_a_overs"]) > 0.0,
-                safe_float(match_row["team_b_overs"]) > 0.0,
+                safe_int(match_row["team_a_balls"]) > 0,
+                safe_int(match_row["team_b_balls"]) > 0,
             ])
 
             if st.button("Set Bat First", key=f"set_bat_first_btn_{match_id}", disabled=innings_started):
-                if selected_bat_first != batting_team:
-                    reset_match_state(match_id, selected_bat_first)
+                if selected_bat_first != batting_team and not innings_started:
+                    try:
+                        st.session_state.match_versions[match_id] = reset_match_state(
+                            match_id, selected_bat_first, st.session_state.match_versions.get(match_id)
+                        )
+                    except MatchConflict as conflict:
+                        resync_match(match_id, conflict.actual)
+                        st.rerun()
+                    publish_snapshots(match_id)
                     st.session_state.match_strikers.pop(match_id, None)
                     st.session_state.match_bowlers[match_id] = None
                     st.session_state.pending_bowler[match_id] = True
                     st.session_state.match_innings_complete[match_id] = False
-                    st.session_state.match_bowling_figures.pop(match_id, None)
                     queue_notification(
                         f"{selected_bat_first} will bat first.",
                         icon="🟢",
                         level="info",
                     )
-                    st.cache_data.clear()
                     st.rerun()
 
             if innings_started:
@@ -2148,256 +2201,333 @@ def render_scorer():
                     a = safe_int(match_row["team_a_runs"])
                     b = safe_int(match_row["team_b_runs"])
                     winner = match_row["team_a"] if a > b else match_row["team_b"] if b > a else "Draw"
-                run_query("UPDATE matches SET status='Completed', winner=? WHERE id=?", (winner, match_id))
-                queue_notification(
-                    f"Match completed. <strong>{winner}</strong> declared winner.",
-                    icon="🏁",
-                    level="success",
-                )
+                # The winner was worked out from this render's scores, so refuse if they have moved since
+                try:
+                    closed = complete_match(match_id, winner, st.session_state.match_versions.get(match_id))
+                except MatchConflict as conflict:
+                    resync_match(match_id, conflict.actual)
+                    st.rerun()
+                st.session_state.match_versions.pop(match_id, None)
                 st.session_state.pending_bowler[match_id] = False
                 st.session_state.match_bowlers[match_id] = None
-                run_query(
-                    "UPDATE matches SET current_bowler_name = NULL, current_bowler_runs = 0, current_bowler_wickets = 0 WHERE id = ?",
-                    (match_id,),
-                )
                 st.session_state.match_innings_complete[match_id] = False
-                st.session_state.match_bowling_figures.pop(match_id, None)
-                st.cache_data.clear()
-                st.balloons()
+                if closed:
+                    queue_notification(
+                        f"Match completed. <strong>{winner}</strong> declared winner.",
+                        icon="🏁",
+                        level="success",
+                    )
+                    publish_snapshots(match_id)
+                    st.balloons()
+                else:
+                    queue_notification("This match was already completed from another console.", icon="🏁", level="alert")
                 st.rerun()
 
+    scorer_console(match_id)
+    scorer_actions(match_id)
+
 # ==========================================
 # 6. PAGE: ADMIN PANEL (OPTIMIZED)
 # ==========================================
 def render_admin():
     st.title("🛠️ Admin Control Panel")
     
-    tab1, tab2, tab3, tab4, tab5 = st.tabs(["Teams", "Matches", "Players", "Database", "History"])
+    # Only the open tab runs its queries; switching tabs reruns the page
+    tab1, tab2, tab3, tab4, tab5 = st.tabs(
+        ["Teams", "Matches", "Players", "Database", "History"], key="admin_section", on_change="rerun"
+    )
     
     # TAB 1: MANAGE TEAMS
     with tab1:
-        st.subheader("Add New Team")
-        col1, col2, col3 = st.columns([3, 2, 1])
+        if tab1.open:
+            st.subheader("Add New Team")
+            col1, col2, col3 = st.columns([3, 2, 1])
         
-        with col1:
-            new_team = st.text_input("Team Name", key="new_team")
-        with col2:
-            short_name = st.text_input("Short Code", key="short_name")
-        with col3:
-            if st.button("➕ Create", use_container_width=True):
-                if new_team and short_name:
-                    try:
-                        run_query(
-                            "INSERT INTO teams (name, short_name) VALUES (?, ?)",
-                            (new_team, short_name)
-                        )
-                        st.success(f"Team {new_team} added!")
-                        st.cache_data.clear()
-                        st.rerun()
-                    except Exception as e:
-                        st.error(f"Error: {e}")
-                else:
-                    st.error("Fill all fields!")
+            with col1:
+                new_team = st.text_input("Team Name", key="new_team")
+            with col2:
+                short_name = st.text_input("Short Code", key="short_name")
+            with col3:
+                if st.button("➕ Create", use_container_width=True):
+                    if new_team and short_name:
+                        try:
+                            run_query(
+                                "INSERT INTO teams (name, short_name) VALUES (?, ?)",
+                                (new_team, short_name),
+                                scopes=("teams",),
+                            )
+                            publish_snapshots()
+                            st.success(f"Team {new_team} added!")
+                            st.rerun()
+                        except Exception as e:
+                            st.error(f"Error: {e}")
+                    else:
+                        st.error("Fill all fields!")
         
-        st.subheader("Existing Teams")
-        teams_df = get_data("SELECT id, name, short_name FROM teams")
-        if not teams_df.empty:
-            st.dataframe(teams_df, use_container_width=True, hide_index=True)
-        else:
-            st.info("No teams created yet.")
+            st.subheader("Existing Teams")
+            teams_df = get_data("SELECT id, name, short_name FROM teams", scopes=("teams",))
+            if not teams_df.empty:
+                st.dataframe(teams_df, use_container_width=True, hide_index=True)
+            else:
+                st.info("No teams created yet.")
 
     # TAB 2: MANAGE MATCHES
     with tab2:
-        st.subheader("Create New Match")
-        teams = get_data("SELECT name FROM teams")
+        if tab2.open:
+            st.subheader("Create New Match")
+            teams = get_data("SELECT name FROM teams", scopes=("teams",))
         
-        if not teams.empty:
-            team_list = teams['name'].tolist()
+            if not teams.empty:
+                team_list = teams['name'].tolist()
             
-            col1, col2, col3 = st.columns([2, 2, 1])
-            with col1:
-                t1 = st.selectbox("Team A", team_list, key="t1")
-            with col2:
-                t2 = st.selectbox("Team B", team_list, index=min(1, len(team_list)-1), key="t2")
-            with col3:
-                if st.button("📅 Schedule", use_container_width=True):
-                    if t1 == t2:
-                        st.error("Teams must be different!")
-                    else:
-                        run_query("""
-                            INSERT INTO matches (team_a, team_b, status, batting_team) 
-                            VALUES (?, ?, 'Scheduled', ?)
-                        """, (t1, t2, t1))
-                        reset_team_player_stats(t1)
-                        reset_team_player_stats(t2)
-                        st.success("Match Scheduled!")
-                        st.cache_data.clear()
-                        st.rerun()
+                col1, col2, col3 = st.columns([2, 2, 1])
+                with col1:
+                    t1 = st.selectbox("Team A", team_list, key="t1")
+                with col2:
+                    t2 = st.selectbox("Team B", team_list, index=min(1, len(team_list)-1), key="t2")
+                with col3:
+                    if st.button("📅 Schedule", use_container_width=True):
+                        if t1 == t2:
+                            st.error("Teams must be different!")
+                        else:
+                            run_query("""
+                                INSERT INTO matches (team_a, team_b, status, batting_team) 
+                                VALUES (?, ?, 'Scheduled', ?)
+                            """, (t1, t2, t1), scopes=("schedule",))
+                            reset_team_player_stats(t1)
+                            reset_team_player_stats(t2)
+                            publish_snapshots()
+                            st.success("Match Scheduled!")
+                            st.rerun()
             
-            st.divider()
-            st.subheader("Manage Active Matches")
-            matches = get_data("SELECT * FROM matches WHERE status != 'Completed' ORDER BY id DESC")
-            match_numbers = get_match_number_map()
+                st.divider()
+                st.subheader("Manage Active Matches")
+                matches = get_data("SELECT * FROM matches WHERE status != 'Completed' ORDER BY id DESC", scopes=("schedule",))
             
-            if not matches.empty:
-                for _, match in matches.iterrows():
-                    col1, col2 = st.columns([4, 1])
-                    with col1:
-                        status_emoji = "🔴" if match['status'] == 'Live' else "⏳"
-                        match_no = match_numbers.get(int(match['id']), match['id'])
-                        st.write(f"{status_emoji} **Match {match_no}**: {match['team_a']} vs {match['team_b']}")
-                    with col2:
-                        if match['status'] == 'Scheduled':
-                            if st.button(f"▶️ Go Live", key=f"live_{match['id']}", use_container_width=True):
-                                reset_team_player_stats(match['team_a'])
-                                reset_team_player_stats(match['team_b'])
-                                reset_match_state(match['id'], match['team_a'])
-                                run_query("UPDATE matches SET status = 'Live' WHERE id = ?", (match['id'],))
-                                if 'match_strikers' in st.session_state:
-                                    st.session_state.match_strikers.pop(match['id'], None)
-                                if 'match_bowlers' in st.session_state:
-                                    st.session_state.match_bowlers.pop(match['id'], None)
-                                if 'pending_bowler' in st.session_state:
-                                    st.session_state.pending_bowler.pop(match['id'], None)
-                                if 'match_innings_complete' in st.session_state:
-                                    st.session_state.match_innings_complete.pop(match['id'], None)
-                                if 'match_bowling_figures' in st.session_state:
-                                    st.session_state.match_bowling_figures.pop(match['id'], None)
-                                st.success("Match is now LIVE!")
-                                st.cache_data.clear()
-                                st.rerun()
+                if not matches.empty:
+                    for _, match in matches.iterrows():
+                        col1, col2 = st.columns([4, 1])
+                        with col1:
+                            status_emoji = "🔴" if match['status'] == 'Live' else "⏳"
+                            st.write(f"{status_emoji} **Match {match['match_number']}**: {match['team_a']} vs {match['team_b']}")
+                        with col2:
+                            if match['status'] == 'Scheduled':
+                                if st.button(f"▶️ Go Live", key=f"live_{match['id']}", use_container_width=True):
+                                    # One guarded write, refused if the match changed since this list was read
+                                    try:
+                                        reset_match_state(
+                                            match['id'], match['team_a'], int(match['version']), status='Live'
+                                        )
+                                    except MatchConflict:
+                                        st.error(f"Match {match['match_number']} was changed elsewhere; reload and try again.")
+                                        st.stop()
+                                    reset_team_player_stats(match['team_a'])
+                                    reset_team_player_stats(match['team_b'])
+                                    if 'match_strikers' in st.session_state:
+                                        st.session_state.match_strikers.pop(match['id'], None)
+                                    if 'match_bowlers' in st.session_state:
+                                        st.session_state.match_bowlers.pop(match['id'], None)
+                                    if 'pending_bowler' in st.session_state:
+                                        st.session_state.pending_bowler.pop(match['id'], None)
+                                    if 'match_innings_complete' in st.session_state:
+                                        st.session_state.match_innings_complete.pop(match['id'], None)
+                                    if 'match_versions' in st.session_state:
+                                        st.session_state.match_versions.pop(match['id'], None)
+                                    publish_snapshots(match['id'])
+                                    st.success("Match is now LIVE!")
+                                    st.rerun()
+                else:
+                    st.info("No active matches.")
             else:
-                st.info("No active matches.")
-        else:
-            st.warning("Create teams first.")
+                st.warning("Create teams first.")
 
     # TAB 3: MANAGE PLAYERS
     with tab3:
-        st.subheader("Add Player to Team")
-        team_df = get_data("SELECT name FROM teams")
+        if tab3.open:
+            st.subheader("Add Player to Team")
+            team_df = get_data("SELECT name FROM teams", scopes=("teams",))
         
-        if not team_df.empty:
-            col1, col2, col3 = st.columns([2, 2, 1])
-            with col1:
-                selected_team = st.selectbox("Select Team", team_df['name'].tolist(), key="player_team")
-            with col2:
-                player_name = st.text_input("Player Name", key="player_name")
-            with col3:
-                if st.button("➕ Add", use_container_width=True):
-                    if player_name:
-                        try:
-                            run_query(
-                                "INSERT INTO players (player_name, team_name) VALUES (?, ?)",
-                                (player_name, selected_team)
-                            )
-                            st.success(f"{player_name} added to {selected_team}")
-                            st.cache_data.clear()
-                            st.rerun()
-                        except Exception as e:
-                            st.error(f"Error: {e}")
-                    else:
-                        st.error("Enter player name!")
+            if not team_df.empty:
+                col1, col2, col3 = st.columns([2, 2, 1])
+                with col1:
+                    selected_team = st.selectbox("Select Team", team_df['name'].tolist(), key="player_team")
+                with col2:
+                    player_name = st.text_input("Player Name", key="player_name")
+                with col3:
+                    if st.button("➕ Add", use_container_width=True):
+                        if player_name:
+                            try:
+                                run_query(
+                                    "INSERT INTO players (player_name, team_name) VALUES (?, ?)",
+                                    (player_name, selected_team),
+                                    scopes=("players", squad_scope(selected_team)),
+                                )
+                                publish_snapshots()
+                                st.success(f"{player_name} added to {selected_team}")
+                                st.rerun()
+                            except Exception as e:
+                                st.error(f"Error: {e}")
+                        else:
+                            st.error("Enter player name!")
             
-            st.divider()
-            st.subheader("Players by Team")
-            for team in team_df['name']:
-                with st.expander(f"🏏 {team}"):
-                    players = get_data(
-                        "SELECT player_name, runs, balls, fours, sixes, out_status FROM players WHERE team_name = ?",
-                        (team,)
-                    )
-                    if players.empty:
-                        st.write("No players added yet.")
-                    else:
-                        st.dataframe(players, use_container_width=True, hide_index=True)
-        else:
-            st.warning("Create teams first.")
+                st.divider()
+                st.subheader("Players by Team")
+                for team in team_df['name']:
+                    # One squad query for the expander that is open, not one per team
+                    squad = st.expander(f"🏏 {team}", key=f"admin_squad_{team}", on_change="rerun")
+                    if not squad.open:
+                        continue
+                    with squad:
+                        players = get_data(
+                            "SELECT player_name, runs, balls, fours, sixes, out_status FROM players WHERE team_name = ?",
+                            (team,),
+                            (squad_scope(team),),
+                        )
+                        if players.empty:
+                            st.write("No players added yet.")
+                        else:
+                            st.dataframe(players, use_container_width=True, hide_index=True)
+            else:
+                st.warning("Create teams first.")
 
     # TAB 4: DATABASE TOOLS
     with tab4:
-        st.subheader("Database Management")
+        if tab4.open:
+            st.subheader("Database Management")
         
-        col1, col2 = st.columns(2)
-        with col1:
-            if st.button("🗑️ Reset Database", use_container_width=True):
-                run_query("DELETE FROM matches")
-                run_query("DELETE FROM teams")
-                run_query("DELETE FROM players")
-                st.cache_data.clear()
-                st.warning("Database Reset Complete!")
-                st.rerun()
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                if st.button("🗑️ Reset Database", use_container_width=True):
+                    with transaction() as conn:
+                        clear_tournament(conn)
+                        bump_versions(conn, ALL_SCOPE)
+                    publish_snapshots()
+                    st.warning("Database Reset Complete!")
+                    st.rerun()
         
-        with col2:
-            if st.button("📦 Load Demo Data", use_container_width=True):
-                # Clear existing
-                run_query("DELETE FROM teams")
-                run_query("DELETE FROM players")
-                run_query("DELETE FROM matches")
-                
-                # Add teams
-                teams = [
-                    ('Mumbai Indians', 'MI'),
-                    ('Chennai Super Kings', 'CSK'),
-                    ('Royal Challengers', 'RCB')
-                ]
-                for team, short in teams:
-                    run_query("INSERT INTO teams (name, short_name) VALUES (?, ?)", (team, short))
-                
-                # Add players
-                mi_players = ['Rohit Sharma', 'Ishan Kishan', 'Suryakumar Yadav']
-                csk_players = ['MS Dhoni', 'Ruturaj Gaikwad', 'Ravindra Jadeja']
-                
-                for player in mi_players:
-                    run_query("INSERT INTO players (player_name, team_name) VALUES (?, ?)", 
-                             (player, 'Mumbai Indians'))
-                for player in csk_players:
-                    run_query("INSERT INTO players (player_name, team_name) VALUES (?, ?)", 
-                             (player, 'Chennai Super Kings'))
-                
-                # Add demo match
-                run_query("""
-                    INSERT INTO matches (team_a, team_b, status, team_a_runs, team_a_wickets, 
-                                        team_a_overs, batting_team)
-                    VALUES ('Mumbai Indians', 'Chennai Super Kings', 'Live', 145, 3, 15.2, 
-                           'Mumbai Indians')
-                """)
+            with col2:
+                if st.button("📦 Load Demo Data", use_container_width=True):
+                    teams = [
+                        ('Mumbai Indians', 'MI'),
+                        ('Chennai Super Kings', 'CSK'),
+                        ('Royal Challengers', 'RCB')
+                    ]
+                    mi_players = ['Rohit Sharma', 'Ishan Kishan', 'Suryakumar Yadav']
+                    csk_players = ['MS Dhoni', 'Ruturaj Gaikwad', 'Ravindra Jadeja']
+
+                    # Clear existing and load the demo in one commit
+                    with transaction() as conn:
+                        clear_tournament(conn)
+                        conn.executemany("INSERT INTO teams (name, short_name) VALUES (?, ?)", teams)
+                        conn.executemany(
+                            "INSERT INTO players (player_name, team_name) VALUES (?, ?)",
+                            [(player, 'Mumbai Indians') for player in mi_players]
+                            + [(player, 'Chennai Super Kings') for player in csk_players],
+                        )
+                        conn.execute("""
+                            INSERT INTO matches (team_a, team_b, status, team_a_runs, team_a_wickets, 
+                                                team_a_balls, batting_team)
+                            VALUES ('Mumbai Indians', 'Chennai Super Kings', 'Live', 145, 3, 92, 
+                                   'Mumbai Indians')
+                        """)
+                        bump_versions(conn, ALL_SCOPE)
+                    publish_snapshots()
                 
-                st.cache_data.clear()
-                st.success("Demo Data Loaded!")
-                st.rerun()
+                    st.success("Demo Data Loaded!")
+                    st.rerun()
+
+            with col3:
+                if st.button("♻️ Rebuild from Events", use_container_width=True, help="Recompute scoreboards and player stats from the ball-by-ball log"):
+                    with transaction() as conn:
+                        matches_rebuilt, players_rebuilt = rebuild_aggregates(conn)
+                    publish_snapshots()
+                    st.success(f"Rebuilt {matches_rebuilt} matches and {players_rebuilt} player rows from the delivery log.")
+
+            st.divider()
+            st.subheader("Bulk Import")
+            st.caption(
+                "CSV with a header row, a JSON array or JSON Lines. Teams: name, short_name. "
+                "Players: player_name, team_name. Fixtures: team_a, team_b, optional batting_team."
+            )
+            import_col1, import_col2 = st.columns([1, 3])
+            with import_col1:
+                import_kind = st.selectbox("Import", ["teams", "players", "fixtures"], key="bulk_import_kind")
+            with import_col2:
+                upload = st.file_uploader("File", type=["csv", "json", "jsonl", "ndjson"], key="bulk_import_file")
+            if upload is not None and st.button("📥 Import File", use_container_width=True):
+                try:
+                    report = import_upload(import_kind, upload)
+                except BulkImportError as exc:
+                    st.error(f"Import failed: {exc}")
+                else:
+                    publish_snapshots()
+                    st.success(report.summary())
+                    if report.errors:
+                        st.warning(f"{report.invalid:,} rows were skipped as invalid; the first few:")
+                        st.dataframe(
+                            pd.DataFrame(report.errors, columns=["Row", "Problem"]),
+                            use_container_width=True,
+                            hide_index=True,
+                        )
+
+            st.divider()
+            st.subheader("Synthetic Tournament")
+            st.caption(
+                "Seeded teams, squads and fixtures with ball-by-ball deliveries for load testing. "
+                "The same seed and sizes always produce the same tournament."
+            )
+            gen_col1, gen_col2, gen_col3, gen_col4 = st.columns(4)
+            with gen_col1:
+                gen_teams = st.number_input("Teams", min_value=2, max_value=20000, value=200, step=100)
+            with gen_col2:
+                gen_squad = st.number_input("Squad size", min_value=2, max_value=30, value=15)
+            with gen_col3:
+                gen_matches = st.number_input("Matches", min_value=1, max_value=100000, value=1000, step=500)
+            with gen_col4:
+                gen_seed = st.number_input("Seed", min_value=0, value=7)
+            if st.button("🏭 Generate Tournament", use_container_width=True):
+                with st.spinner("Simulating matches..."):
+                    try:
+                        report = generate_tournament(
+                            int(gen_teams), int(gen_squad), int(gen_matches), seed=int(gen_seed)
+                        )
+                    except GeneratorError as exc:
+                        st.error(f"Generation failed: {exc}")
+                    else:
+                        publish_snapshots()
+                        st.success(report.summary())
 
     # TAB 5: MATCH HISTORY
     with tab5:
-        st.subheader("Match History")
-        history_df = get_data(
-            """
-            SELECT id, status, team_a, team_a_runs, team_a_wickets, team_a_overs,
-                   team_b, team_b_runs, team_b_wickets, team_b_overs, target, winner, created_at
-            FROM matches
-            ORDER BY id DESC
-            """
-        )
-        if history_df.empty:
-            st.info("No matches recorded yet.")
-        else:
-            display_history = history_df.rename(
-                columns={
-                    "id": "Match ID",
-                    "team_a": "Team A",
-                    "team_a_runs": "A Runs",
-                    "team_a_wickets": "A Wkts",
-                    "team_a_overs": "A Overs",
-                    "team_b": "Team B",
-                    "team_b_runs": "B Runs",
-                    "team_b_wickets": "B Wkts",
-                    "team_b_overs": "B Overs",
-                    "target": "Target",
-                    "winner": "Winner",
-                    "status": "Status",
-                    "created_at": "Created",
-                }
-            )
-            st.dataframe(display_history, use_container_width=True, hide_index=True)
+        if tab5.open:
+            st.subheader("Match History")
+            history_df = results_archive("history")
+            if history_df.empty:
+                st.info("No matches match these filters.")
+            else:
+                history_df.insert(7, "team_a_rr", run_rate_column(history_df["team_a_runs"], history_df["team_a_balls"]))
+                history_df["team_b_rr"] = run_rate_column(history_df["team_b_runs"], history_df["team_b_balls"])
+                history_df["team_a_balls"] = format_overs_column(history_df["team_a_balls"])
+                history_df["team_b_balls"] = format_overs_column(history_df["team_b_balls"])
+                display_history = history_df.rename(
+                    columns={
+                        "id": "Match ID",
+                        "match_number": "Match #",
+                        "team_a": "Team A",
+                        "team_a_runs": "A Runs",
+                        "team_a_wickets": "A Wkts",
+                        "team_a_balls": "A Overs",
+                        "team_b": "Team B",
+                        "team_b_runs": "B Runs",
+                        "team_b_wickets": "B Wkts",
+                        "team_b_balls": "B Overs",
+                        "target": "Target",
+                        "winner": "Winner",
+                        "status": "Status",
+                        "created_at": "Created",
+                    }
+                )
+                st.dataframe(display_history, use_container_width=True, hide_index=True)
 
 # ==========================================
 # 7. AUTHENTICATION & ROUTING
@@ -2431,7 +2561,7 @@ def main():
 
     # Define menu options based on role
     menu_options = {
-        'guest': ["Dashboard", "Login"],
+        'guest': ["Live Scores", "Dashboard", "Login"],
         'scorer': ["Dashboard", "Scorer Panel", "Logout"],
         'admin': ["Dashboard", "Admin Panel", "Scorer Panel", "Logout"]
     }
@@ -2440,7 +2570,10 @@ def main():
     choice = st.sidebar.radio("Navigation", options)
 
     # Route to appropriate page
-    if choice == "Dashboard":
+    if choice == "Live Scores":
+        render_live_scores()
+
+    elif choice == "Dashboard":
         render_dashboard()
     
     elif choice == "Login":
@@ -2462,7 +2595,6 @@ def main():
     
     elif choice == "Logout":
         st.session_state['user_role'] = 'guest'
-        st.cache_data.clear()
         st.rerun()
 
     # Footer
@@ -0,0 +1,107 @@
+"""Rows per second registering a tournament: one commit per row versus bulk_import.
+
+Writes teams, squads and a round robin of fixtures as CSV into a scratch
+directory, then loads them into scratch copies of tournament.db twice: once
+row by row with run_query, the way the admin buttons add them (timed on the
+first --row-sample rows and extrapolated), and once through
+bulk_import.import_file in a single transaction per file:
+
+    python benchmarks/bench_bulk_import.py [--teams 32] [--squad 15] [--dir /var/tmp]
+"""
+import argparse
+import csv
+import shutil
+import sys
+import tempfile
+import time
+from itertools import islice
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+import bulk_import  # noqa: E402
+import cricket_db  # noqa: E402
+
+
+def write_files(directory, teams, squad):
+    names = [f"Import Team {t}" for t in range(1, teams + 1)]
+    files = {
+        "teams": (["name", "short_name"], ([name, f"IT{t}"] for t, name in enumerate(names, start=1))),
+        "players": (
+            ["player_name", "team_name"],
+            ([f"{name} #{n}", name] for name in names for n in range(1, squad + 1)),
+        ),
+        "fixtures": (
+            ["team_a", "team_b"],
+            ([home, away] for i, home in enumerate(names) for away in names[i + 1:]),
+        ),
+    }
+    paths = {}
+    for kind, (header, rows) in files.items():
+        paths[kind] = Path(directory) / f"{kind}.csv"
+        with open(paths[kind], "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(header)
+            writer.writerows(rows)
+    return paths
+
+
+ROW_BY_ROW = {
+    "teams": ("INSERT INTO teams (name, short_name) VALUES (?, ?)", ("teams",)),
+    "players": ("INSERT INTO players (player_name, team_name) VALUES (?, ?)", ("players",)),
+    "fixtures": (
+        "INSERT INTO matches (team_a, team_b, status, batting_team) VALUES (?, ?, 'Scheduled', ?)",
+        ("schedule",),
+    ),
+}
+
+
+def row_by_row(kind, path, sample):
+    """Rows/s adding rows one run_query (one commit) at a time."""
+    query, scopes = ROW_BY_ROW[kind]
+    with open(path, newline="", encoding="utf-8") as f:
+        rows = list(islice(csv.reader(f), 1, sample + 1))
+    start = time.perf_counter()
+    for row in rows:
+        params = row + [row[0]] if kind == "fixtures" else row
+        cricket_db.run_query(query, params, scopes=scopes)
+    return len(rows) / (time.perf_counter() - start)
+
+
+def fresh_copy(source, tmp, name):
+    db_path = str(Path(tmp) / name)
+    shutil.copyfile(source, db_path)
+    cricket_db.set_db_path(db_path)
+    cricket_db.init_db()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--db", default=str(ROOT / "tournament.db"))
+    parser.add_argument("--teams", type=int, default=32)
+    parser.add_argument("--squad", type=int, default=15)
+    parser.add_argument("--row-sample", type=int, default=200, help="rows timed for the row-by-row path")
+    parser.add_argument("--dir", default=None, help="directory for the scratch files")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(dir=args.dir) as tmp:
+        paths = write_files(tmp, args.teams, args.squad)
+        fresh_copy(args.db, tmp, "row_by_row.db")
+        slow = {kind: row_by_row(kind, path, args.row_sample) for kind, path in paths.items()}
+        cricket_db.close_connections()
+
+        fresh_copy(args.db, tmp, "bulk.db")
+        reports = {kind: bulk_import.import_file(kind, path) for kind, path in paths.items()}
+        cricket_db.close_connections()
+
+    print(f"{'kind':<10}{'rows':>10}{'row-by-row/s':>15}{'bulk/s':>12}{'speed-up':>10}")
+    for kind, report in reports.items():
+        print(
+            f"{kind:<10}{report.inserted:>10,}{slow[kind]:>15,.0f}{report.rows_per_s:>12,.0f}"
+            f"{report.rows_per_s / slow[kind]:>9.0f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""Per-query cost of connect/close-per-call versus the pooled WAL connections.
+
+Runs the scorer's hot statements against a scratch copy of tournament.db:
+
+    python benchmarks/bench_connections.py [--db tournament.db] [--iterations 2000]
+"""
+import argparse
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+import cricket_db  # noqa: E402
+
+HOT_QUERIES = [
+    ("match row", "SELECT * FROM matches WHERE id = ?", "match_id"),
+    ("live matches", "SELECT * FROM matches WHERE status = 'Live'", None),
+    (
+        "batters left",
+        "SELECT player_name FROM players WHERE team_name = ? AND out_status NOT LIKE 'Out%'",
+        "team",
+    ),
+    (
+        "player stats",
+        "SELECT runs, balls, fours, sixes, out_status FROM players WHERE player_name = ? AND team_name = ?",
+        "player",
+    ),
+    (
+        "player update",
+        "UPDATE players SET runs = runs + 0 WHERE player_name = ? AND team_name = ?",
+        "player",
+    ),
+]
+
+
+def sample_params(db_path):
+    conn = sqlite3.connect(db_path)
+    try:
+        match = conn.execute("SELECT id FROM matches ORDER BY id DESC LIMIT 1").fetchone()
+        player = conn.execute("SELECT player_name, team_name FROM players LIMIT 1").fetchone()
+    finally:
+        conn.close()
+    player = player or ("Nobody", "Nobody")
+    return {
+        "match_id": (match[0] if match else 0,),
+        "team": (player[1],),
+        "player": tuple(player),
+        None: (),
+    }
+
+
+def run_legacy(db_path, sql, params):
+    """The pre-pool pattern: open, execute, commit, close."""
+    conn = sqlite3.connect(db_path)
+    try:
+        cur = conn.execute(sql, params)
+        cur.fetchall()
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def run_pooled(sql, params):
+    with cricket_db.get_db_connection() as conn:
+        cur = conn.execute(sql, params)
+        cur.fetchall()
+        conn.commit()
+
+
+def time_per_call(fn, iterations):
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--db", default=str(ROOT / "tournament.db"))
+    parser.add_argument("--iterations", type=int, default=2000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        legacy_db = str(Path(tmp) / "legacy.db")
+        pooled_db = str(Path(tmp) / "pooled.db")
+        shutil.copyfile(args.db, legacy_db)
+        shutil.copyfile(args.db, pooled_db)
+
+        cricket_db.set_db_path(pooled_db)
+        cricket_db.init_db()
+        params_by_kind = sample_params(pooled_db)
+
+        print(f"{'query':<16}{'connect/close µs':>18}{'pooled µs':>12}{'speedup':>10}")
+        for label, sql, kind in HOT_QUERIES:
+            params = params_by_kind[kind]
+            legacy_us = time_per_call(lambda: run_legacy(legacy_db, sql, params), args.iterations)
+            pooled_us = time_per_call(lambda: run_pooled(sql, params), args.iterations)
+            print(f"{label:<16}{legacy_us:>18.1f}{pooled_us:>12.1f}{legacy_us / pooled_us:>9.1f}x")
+
+        cricket_db.close_connections()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""Deliveries per second: one commit per statement versus one transaction per ball.
+
+Replays the statements `apply_delivery` issues for an ordinary scoring ball
+(player stats, scoreboard, bowler figures, remaining-batter check) against a
+scratch copy of tournament.db. Use --dir to place the copy on a real disk so
+fsync cost shows up:
+
+    python benchmarks/bench_delivery_commit.py [--balls 600] [--dir /var/tmp]
+"""
+import argparse
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+import cricket_db  # noqa: E402
+
+
+def prepare(db_path, journal_mode):
+    """Bring the copy to the current schema and add a live match to score."""
+    cricket_db.set_db_path(db_path)
+    cricket_db.init_db()
+    cricket_db.close_connections()
+    conn = sqlite3.connect(db_path)
+    conn.execute(f"PRAGMA journal_mode = {journal_mode}")
+    try:
+        conn.execute("INSERT OR IGNORE INTO teams (name, short_name) VALUES ('Bench XI', 'BXI')")
+        conn.execute("INSERT OR IGNORE INTO teams (name, short_name) VALUES ('Bench Rivals', 'BRV')")
+        for name in ("Opener One", "Opener Two"):
+            conn.execute("INSERT INTO players (player_name, team_name) VALUES (?, 'Bench XI')", (name,))
+        cur = conn.execute(
+            "INSERT INTO matches (team_a, team_b, status, batting_team) VALUES ('Bench XI', 'Bench Rivals', 'Live', 'Bench XI')"
+        )
+        conn.commit()
+        return cur.lastrowid
+    finally:
+        conn.close()
+
+
+def ball_statements(match_id, ball_no):
+    """Write statements for one legal ball worth a single run."""
+    return [
+        ("UPDATE players SET runs = runs + ?, balls = balls + ? WHERE player_name = ? AND team_name = ?",
+         (1, 1, "Opener One", "Bench XI")),
+        ("UPDATE matches SET team_a_runs=?, team_a_wickets=?, team_a_balls=? WHERE id=?",
+         (ball_no, 0, ball_no, match_id)),
+        ("UPDATE matches SET current_bowler_runs = ?, current_bowler_wickets = ? WHERE id = ?",
+         (ball_no, 0, match_id)),
+    ]
+
+
+READS = [
+    ("SELECT * FROM matches WHERE id = ?", "match"),
+    ("SELECT player_name FROM players WHERE team_name = ? AND out_status NOT LIKE 'Out%'", "team"),
+]
+
+
+def read_params(kind, match_id):
+    return (match_id,) if kind == "match" else ("Bench XI",)
+
+
+def per_statement(db_path, match_id, balls):
+    """Baseline: every read and write opens a connection, and every write commits."""
+    for ball_no in range(1, balls + 1):
+        sql, kind = READS[0]
+        conn = sqlite3.connect(db_path)
+        conn.execute(sql, read_params(kind, match_id)).fetchall()
+        conn.close()
+        for sql, params in ball_statements(match_id, ball_no):
+            conn = sqlite3.connect(db_path)
+            conn.execute(sql, params)
+            conn.commit()
+            conn.close()
+        sql, kind = READS[1]
+        conn = sqlite3.connect(db_path)
+        conn.execute(sql, read_params(kind, match_id)).fetchall()
+        conn.close()
+
+
+def single_transaction(match_id, balls):
+    """New path: the whole ball runs inside one IMMEDIATE transaction."""
+    for ball_no in range(1, balls + 1):
+        with cricket_db.transaction() as conn:
+            sql, kind = READS[0]
+            cricket_db.fetch_one(conn, sql, read_params(kind, match_id))
+            for sql, params in ball_statements(match_id, ball_no):
+                conn.execute(sql, params)
+            sql, kind = READS[1]
+            cricket_db.fetch_all(conn, sql, read_params(kind, match_id))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--db", default=str(ROOT / "tournament.db"))
+    parser.add_argument("--balls", type=int, default=600)
+    parser.add_argument("--dir", default=None, help="directory for the scratch databases")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(dir=args.dir) as tmp:
+        legacy_db = str(Path(tmp) / "legacy.db")
+        txn_db = str(Path(tmp) / "txn.db")
+        shutil.copyfile(args.db, legacy_db)
+        shutil.copyfile(args.db, txn_db)
+
+        # The baseline ran in SQLite's default rollback-journal mode
+        legacy_match = prepare(legacy_db, "DELETE")
+        start = time.perf_counter()
+        per_statement(legacy_db, legacy_match, args.balls)
+        legacy_rate = args.balls / (time.perf_counter() - start)
+
+        txn_match = prepare(txn_db, "WAL")
+        cricket_db.set_db_path(txn_db)
+        start = time.perf_counter()
+        single_transaction(txn_match, args.balls)
+        txn_rate = args.balls / (time.perf_counter() - start)
+        cricket_db.close_connections()
+
+    print(f"{'mode':<28}{'deliveries/s':>14}{'commits/ball':>14}")
+    print(f"{'commit per statement':<28}{legacy_rate:>14.0f}{len(ball_statements(0, 1)):>14}")
+    print(f"{'one transaction per ball':<28}{txn_rate:>14.0f}{1:>14}")
+    print(f"speedup: {txn_rate / legacy_rate:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""Deliveries per second through the scoring rules alone, no database or UI.
+
+Plays simulated matches ball by ball through ScoringEngine: random runs,
+extras and dismissals, a new bowler at every over, new openers each innings
+and a fresh match whenever one finishes:
+
+    python benchmarks/bench_engine.py [--deliveries 2000000] [--seed 7]
+"""
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from scoring_engine import BatterStats, MatchState, ScoringEngine  # noqa: E402
+from tournament_generator import OUTCOMES  # noqa: E402
+
+SQUAD_SIZE = 11
+
+
+def new_match(match_id):
+    squads = {
+        team: {f"{team} {n}": BatterStats() for n in range(1, SQUAD_SIZE + 1)}
+        for team in ("Home", "Away")
+    }
+    return MatchState(match_id, "Home", "Away", "Home", squads=squads)
+
+
+def ready(state, over_no):
+    """Do what the scorer does between balls: pick openers and the next bowler."""
+    if state.striker is None or state.non_striker is None:
+        bench = [p for p in state.not_out() if p not in (state.striker, state.non_striker)]
+        if state.striker is None:
+            state.striker = bench.pop(0)
+        if state.non_striker is None and bench:
+            state.non_striker = bench.pop(0)
+    if state.pending_bowler or not state.bowler:
+        bowlers = list(state.squads[state.fielding_team])
+        state.bowler = bowlers[over_no % 5 + 6]
+        state.pending_bowler = False
+
+
+def run(deliveries, seed):
+    rng = random.Random(seed)
+    weights = [weight for weight, _ in OUTCOMES]
+    balls = [delivery for _, delivery in OUTCOMES]
+    # Pre-draw the outcomes so the timing is the engine, not the RNG
+    stream = rng.choices(balls, weights=weights, k=min(deliveries, 1 << 16))
+    mask = len(stream)
+
+    engine = ScoringEngine()
+    matches = writes = notifications = 0
+    state = new_match(0)
+    over_no = 0
+    start = time.perf_counter()
+    for i in range(deliveries):
+        if state.status == "Completed" or state.innings_complete:
+            matches += 1
+            state = new_match(matches)
+        ready(state, over_no)
+        transition = engine.apply(state, stream[i % mask])
+        writes += len(transition.writes) + 1
+        notifications += len(transition.notifications)
+        if state.pending_bowler:
+            over_no += 1
+    elapsed = time.perf_counter() - start
+    return elapsed, matches, writes, notifications
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--deliveries", type=int, default=2_000_000)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    elapsed, matches, writes, notifications = run(args.deliveries, args.seed)
+    print(f"deliveries:       {args.deliveries:,}")
+    print(f"matches finished: {matches:,}")
+    print(f"writes produced:  {writes:,} ({writes / args.deliveries:.2f} per ball)")
+    print(f"notifications:    {notifications:,}")
+    print(f"elapsed:          {elapsed:.2f} s")
+    print(f"throughput:       {args.deliveries / elapsed:,.0f} deliveries/s ({elapsed / args.deliveries * 1e6:.2f} µs each)")
+
+
+if __name__ == "__main__":
+    main()
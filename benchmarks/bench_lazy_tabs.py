@@ -0,0 +1,114 @@
+"""Server CPU and round trip of each Dashboard and Admin Panel tab on a large tournament.
+
+Generates --teams / --matches with tournament_generator into a scratch copy
+of tournament.db, starts the app under `streamlit run` in that directory and
+drives it over the browser's websocket as the admin, opening each tab of the
+two pages in turn. Every tab is timed --runs times cold (all cached reads
+invalidated first, as a write does) and --runs times warm. When only the open
+tab runs its queries the tabs cost different amounts; an app that renders
+every tab on every run has no tab state to select, so each page is timed once
+as "(all tabs)". Run it against an older revision of the app with --app to
+compare:
+
+    python benchmarks/bench_lazy_tabs.py [--teams 2000] [--matches 20000] [--runs 5]
+    git show HEAD~1:"Cricket App 4.py" > /tmp/old_app.py
+    python benchmarks/bench_lazy_tabs.py --app /tmp/old_app.py
+"""
+import argparse
+import asyncio
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from websockets.asyncio.client import connect
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+import cricket_db  # noqa: E402
+import tournament_generator  # noqa: E402
+from bench_score_api import cpu_seconds  # noqa: E402
+from bench_scorer_reruns import Browser, free_port, log_in, start_app  # noqa: E402
+
+# page -> (key of its tabs, tab labels)
+PAGES = {
+    "Dashboard": ("dashboard_section", ["Live Matches", "Recent Results", "Upcoming Schedule", "Points Table", "Top Batters"]),
+    "Admin Panel": ("admin_section", ["Teams", "Matches", "Players", "Database", "History"]),
+}
+
+
+def invalidate_reads():
+    """Bump every cache scope, so the app's next run reads from the database again."""
+    with cricket_db.transaction() as conn:
+        cricket_db.bump_versions(conn, cricket_db.ALL_SCOPE)
+
+
+async def time_runs(browser, pid, runs, cold):
+    """Median (seconds, CPU seconds) of `runs` reruns of the page as it stands."""
+    timings = []
+    for _ in range(runs):
+        if cold:
+            invalidate_reads()
+        cpu_before, started = cpu_seconds(pid), time.perf_counter()
+        await browser.interact()
+        timings.append((time.perf_counter() - started, cpu_seconds(pid) - cpu_before))
+    return statistics.median(t for t, _ in timings), statistics.median(c for _, c in timings)
+
+
+async def time_tabs(port, pid, runs):
+    """{(page, tab): (cold timings, warm timings)} for every tab the app lets us open."""
+    results = {}
+    async with connect(f"ws://127.0.0.1:{port}/_stcore/stream", subprotocols=["streamlit"], max_size=None) as conn:
+        browser = Browser(conn)
+        await log_in(browser, "admin", "admin123")
+        for page, (key, tabs) in PAGES.items():
+            await browser.set_value("radio", "Navigation", string_value=page)
+            tabs_id = next((wid for kind, wid in browser.widgets if kind == "tabs" and wid.endswith(key)), None)
+            for tab in tabs if tabs_id else ["(all tabs)"]:
+                if tabs_id:
+                    await browser.set_value("tabs", tabs_id, string_value=tab)
+                results[(page, tab)] = (
+                    await time_runs(browser, pid, runs, cold=True),
+                    await time_runs(browser, pid, runs, cold=False),
+                )
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--app", default=str(ROOT / "Cricket App 4.py"), help="app script to serve")
+    parser.add_argument("--db", default=str(ROOT / "tournament.db"))
+    parser.add_argument("--teams", type=int, default=2000)
+    parser.add_argument("--matches", type=int, default=20000)
+    parser.add_argument("--runs", type=int, default=5, help="reruns timed per tab, cold and warm")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="simulation processes")
+    parser.add_argument("--dir", default=None, help="directory for the scratch database")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(dir=args.dir) as tmp:
+        shutil.copyfile(args.db, Path(tmp) / "tournament.db")
+        cricket_db.set_db_path(str(Path(tmp) / "tournament.db"))
+        cricket_db.init_db()
+        print(tournament_generator.generate(args.teams, matches=args.matches, workers=args.workers).summary())
+
+        port = free_port()
+        server = start_app(Path(args.app).resolve(), tmp, port)
+        try:
+            results = asyncio.run(time_tabs(port, server.pid, args.runs))
+        finally:
+            server.terminate()
+            server.wait()
+            cricket_db.close_connections()
+
+    print(f"{Path(args.app).name}: median of {args.runs} reruns per tab")
+    print(f"{'page':<14}{'tab':<20}{'cold ms':>10}{'cold CPU ms':>13}{'warm ms':>10}{'warm CPU ms':>13}")
+    for (page, tab), ((cold, cold_cpu), (warm, warm_cpu)) in results.items():
+        print(f"{page:<14}{tab:<20}{cold * 1e3:>10,.1f}{cold_cpu * 1e3:>13,.1f}{warm * 1e3:>10,.1f}{warm_cpu * 1e3:>13,.1f}")
+
+
+if __name__ == "__main__":
+    main()
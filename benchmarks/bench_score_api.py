@@ -0,0 +1,216 @@
+"""Sustained requests/s from score_api on one core while matches are being scored.
+
+Puts --live matches live in a scratch copy of tournament.db, starts
+score_api.py in a subprocess pinned to one CPU (--cpu) and runs --clients
+polling processes against it for --seconds, while a writer thread scores
+--balls-per-sec deliveries across the live matches through the scorer's
+real path. Clients poll like a scoreboard screen: mostly one match's
+scorecard, sometimes the live list, the bowling card or the results, each
+resending the ETag it last saw unless --no-etag. Reports requests/s against
+wall time and against the server's own CPU time (so the number does not
+depend on how much of the core the clients took), the status mix, bytes per
+response and latency percentiles:
+
+    python benchmarks/bench_score_api.py [--clients 8] [--seconds 10] [--balls-per-sec 2]
+        [--no-etag] [--no-gzip]
+"""
+import argparse
+import http.client
+import os
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+import cricket_db  # noqa: E402
+from bench_scoring_e2e import build_tournament, go_live, prepare_ball  # noqa: E402
+from scoring_engine import ScoringEngine, read_match_state, score_delivery  # noqa: E402
+from tournament_generator import OUTCOMES  # noqa: E402
+
+# What a polling client asks for, by weight
+POLL_MIX = [(70, "match"), (20, "live"), (5, "bowling"), (5, "results")]
+WARMUP_BALLS = 30
+
+
+def start_server(db_path, cpu):
+    """score_api.py on an ephemeral port, pinned to `cpu` where the OS allows; returns (process, port)."""
+    pinned = cpu is not None and hasattr(os, "sched_setaffinity")
+    server = subprocess.Popen(
+        [sys.executable, str(ROOT / "score_api.py"), "--db", db_path, "--port", "0"],
+        stdout=subprocess.PIPE, text=True,
+        preexec_fn=(lambda: os.sched_setaffinity(0, {cpu})) if pinned else None,
+    )
+    line = server.stdout.readline()
+    if not line:
+        raise SystemExit("score_api.py exited before it started serving")
+    return server, int(line.rsplit(":", 1)[1].split("/", 1)[0])
+
+
+def cpu_seconds(pid):
+    """User + system CPU time of a process, from /proc (Linux only; None elsewhere)."""
+    try:
+        fields = Path(f"/proc/{pid}/stat").read_text().rsplit(")", 1)[1].split()
+    except OSError:
+        return None
+    return (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+
+
+class Scorer(threading.Thread):
+    """Scores deliveries round-robin across the live matches at a steady rate."""
+
+    def __init__(self, match_ids, rate, seed):
+        super().__init__(daemon=True)
+        self.rng = random.Random(seed)
+        self.engine = ScoringEngine()
+        self.interval = 1 / rate if rate else None
+        self.stopped = threading.Event()
+        self.balls = 0
+        self.matches = {}
+        for match_id in match_ids:
+            with cricket_db.get_db_connection() as conn:
+                state = read_match_state(conn, match_id)
+            self.matches[match_id] = [state, {
+                "striker": None, "non_striker": None, "bowler": None,
+                "pending_bowler": True, "innings_complete": False,
+            }, 0]
+
+    def ball(self, match_id):
+        state, live, overs = self.matches[match_id]
+        prepare_ball(state, live, overs)
+        delivery = self.rng.choices([d for _, d in OUTCOMES], weights=[w for w, _ in OUTCOMES])[0]
+        state, transition = score_delivery(self.engine, match_id, delivery, **live)
+        live.update(striker=state.striker, non_striker=state.non_striker, bowler=state.bowler,
+                    pending_bowler=state.pending_bowler, innings_complete=state.innings_complete)
+        self.matches[match_id] = [state, live, overs + state.pending_bowler]
+        self.balls += 1
+        if transition.match_completed or state.innings_complete:
+            del self.matches[match_id]
+        return transition
+
+    def run(self):
+        while self.interval and self.matches and not self.stopped.wait(self.interval):
+            self.ball(self.rng.choice(list(self.matches)))
+
+
+def poller(port, match_ids, seconds, start_at, seed, conditional, gzip):
+    """One keep-alive client polling until `seconds` after `start_at`; returns its tallies."""
+    rng = random.Random(seed)
+    weights, kinds = zip(*POLL_MIX)
+    conn = http.client.HTTPConnection("127.0.0.1", port)
+    etags, statuses, latencies = {}, Counter(), []
+    received = 0
+    time.sleep(max(0.0, start_at - time.time()))
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        kind = rng.choices(kinds, weights)[0]
+        match_id = rng.choice(match_ids)
+        path = {
+            "match": f"/api/matches/{match_id}",
+            "live": "/api/live",
+            "bowling": f"/api/matches/{match_id}/bowling",
+            "results": "/api/results",
+        }[kind]
+        headers = {"Accept-Encoding": "gzip"} if gzip else {}
+        if conditional and path in etags:
+            headers["If-None-Match"] = etags[path]
+        started = time.perf_counter()
+        conn.request("GET", path, headers=headers)
+        response = conn.getresponse()
+        body = response.read()
+        latencies.append(time.perf_counter() - started)
+        statuses[response.status] += 1
+        received += len(body)
+        if response.status == 200:
+            etags[path] = response.getheader("ETag")
+    conn.close()
+    return statuses, latencies, received
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--db", default=str(ROOT / "tournament.db"))
+    parser.add_argument("--clients", type=int, default=8, help="polling client processes")
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--live", type=int, default=4, help="matches in play")
+    parser.add_argument("--balls-per-sec", type=float, default=2.0, help="deliveries scored while polling (0 for none)")
+    parser.add_argument("--cpu", type=int, default=0, help="CPU the server is pinned to")
+    parser.add_argument("--no-etag", action="store_true", help="never send If-None-Match")
+    parser.add_argument("--no-gzip", action="store_true", help="never send Accept-Encoding: gzip")
+    parser.add_argument("--dir", default=None, help="directory for the scratch database")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(dir=args.dir) as tmp:
+        db_path = str(Path(tmp) / "api.db")
+        shutil.copyfile(args.db, db_path)
+        cricket_db.set_db_path(db_path)
+        cricket_db.init_db()
+        teams = 2
+        while teams * (teams - 1) // 2 < args.live:
+            teams += 1
+        fixtures = build_tournament(teams)[:args.live]
+        for match_id, team_a, team_b in fixtures:
+            go_live(match_id, team_a, team_b)
+        match_ids = [match_id for match_id, _, _ in fixtures]
+        scorer = Scorer(match_ids, args.balls_per_sec, seed=7)
+        for match_id in match_ids:
+            for _ in range(WARMUP_BALLS):
+                if match_id in scorer.matches:
+                    scorer.ball(match_id)
+        warmup_balls = scorer.balls
+
+        server, port = start_server(db_path, args.cpu)
+        try:
+            start_at = time.time() + 1.0
+            with ProcessPoolExecutor(max_workers=args.clients) as pool:
+                futures = [
+                    pool.submit(poller, port, match_ids, args.seconds, start_at, seed,
+                                not args.no_etag, not args.no_gzip)
+                    for seed in range(args.clients)
+                ]
+                time.sleep(max(0.0, start_at - time.time()))
+                cpu_before = cpu_seconds(server.pid)
+                scorer.start()
+                results = [future.result() for future in futures]
+                cpu_after = cpu_seconds(server.pid)
+            scorer.stopped.set()
+            scorer.join()
+        finally:
+            server.terminate()
+            server.wait()
+            cricket_db.close_connections()
+
+    statuses = sum((result[0] for result in results), Counter())
+    latencies = sorted(latency for result in results for latency in result[1])
+    received = sum(result[2] for result in results)
+    requests = len(latencies)
+    cuts = statistics.quantiles(latencies, n=100, method="inclusive")
+    print(
+        f"{args.clients} clients x {args.seconds:g} s against {args.live} live matches, "
+        f"{'conditional' if not args.no_etag else 'unconditional'} polls, "
+        f"{'gzip' if not args.no_gzip else 'identity'}; {scorer.balls - warmup_balls} balls scored meanwhile"
+    )
+    print(f"{'requests':<28}{requests:>12,}")
+    print(f"{'requests/s (wall)':<28}{requests / args.seconds:>12,.0f}")
+    if cpu_before is not None and cpu_after is not None and cpu_after > cpu_before:
+        print(f"{'server CPU seconds':<28}{cpu_after - cpu_before:>12,.2f}")
+        print(f"{'requests per server CPU s':<28}{requests / (cpu_after - cpu_before):>12,.0f}")
+    for status, count in sorted(statuses.items()):
+        print(f"{'HTTP ' + str(status):<28}{count:>12,}  ({count / requests:.0%})")
+    print(f"{'bytes per response':<28}{received / requests:>12,.0f}")
+    for pct in (50, 95, 99):
+        print(f"{f'latency p{pct} (ms)':<28}{cuts[pct - 1] * 1e3:>12,.2f}")
+    return 0 if set(statuses) <= {200, 304} else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
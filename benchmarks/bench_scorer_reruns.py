@@ -0,0 +1,196 @@
+"""Server CPU and scorer round trip per ball through a real `streamlit run` of the app.
+
+Puts --live matches live in a scratch copy of tournament.db, starts the app
+under `streamlit run` in that directory and drives it over the websocket the
+browser uses: logs in as the scorer, opens the Scorer Panel, confirms the
+opening bowler and scores --balls deliveries, confirming a bowler at every
+over. For each ball it times the click to the end of the last script run it
+set off (what the scorer waits for before the next tap) and takes the
+server's CPU time from /proc. Run it against an older revision of the app
+with --app to compare:
+
+    python benchmarks/bench_scorer_reruns.py [--balls 60] [--live 4]
+    git show HEAD~1:"Cricket App 4.py" > /tmp/old_app.py
+    python benchmarks/bench_scorer_reruns.py --app /tmp/old_app.py
+"""
+import argparse
+import asyncio
+import os
+import shutil
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from pathlib import Path
+
+from streamlit.proto.BackMsg_pb2 import BackMsg
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+from streamlit.proto.WidgetStates_pb2 import WidgetState
+from websockets.asyncio.client import connect
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+import cricket_db  # noqa: E402
+from bench_score_api import cpu_seconds  # noqa: E402
+from bench_scoring_e2e import build_tournament, go_live  # noqa: E402
+
+BALLS = ["1 Run", "Dot Ball •", "2 Runs", "Dot Ball •", "1 Run", "Wide +1"]
+DONE = {ForwardMsg.FINISHED_SUCCESSFULLY, ForwardMsg.FINISHED_FRAGMENT_RUN_SUCCESSFULLY}
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_app(app, workdir, port):
+    """`streamlit run app` serving out of `workdir`; returns the process once it answers its health check."""
+    server = subprocess.Popen(
+        [sys.executable, "-m", "streamlit", "run", str(app), "--server.headless", "true",
+         "--server.port", str(port), "--server.fileWatcherType", "none",
+         "--browser.gatherUsageStats", "false"],
+        cwd=workdir, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        env=dict(os.environ, PYTHONPATH=str(ROOT)),
+    )
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        try:
+            urllib.request.urlopen(f"http://127.0.0.1:{port}/_stcore/health", timeout=1).read()
+            return server
+        except OSError:
+            time.sleep(0.2)
+    server.terminate()
+    raise SystemExit("streamlit did not start serving")
+
+
+class Browser:
+    """The parts of the browser client the scorer's taps go through."""
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.widgets = {}  # (kind, label) -> (widget id, fragment id), as last rendered; tabs go by their id
+        self.values = {}  # widget id -> WidgetState the page holds
+        self.rendered = set()  # (kind, label) drawn by the last interaction
+
+    async def interact(self, trigger=None, fragment_id=""):
+        """Send the page's widget state (plus a button press) and wait for every run it sets off."""
+        msg = BackMsg()
+        msg.rerun_script.fragment_id = fragment_id
+        states = list(self.values.values())
+        if trigger is not None:
+            states.append(WidgetState(id=trigger, trigger_value=True))
+        msg.rerun_script.widget_states.widgets.extend(states)
+        self.rendered = set()
+        await self.conn.send(msg.SerializeToString())
+        while True:
+            raw = await self.conn.recv()
+            forward = ForwardMsg()
+            forward.ParseFromString(raw)
+            kind = forward.WhichOneof("type")
+            if kind == "delta" and forward.delta.WhichOneof("type") == "new_element":
+                element = forward.delta.new_element
+                if element.WhichOneof("type") == "exception":
+                    raise SystemExit(f"the app raised {element.exception.type}: {element.exception.message}")
+                widget = getattr(element, element.WhichOneof("type"))
+                if hasattr(widget, "id") and hasattr(widget, "label") and widget.id:
+                    key = (element.WhichOneof("type"), widget.label)
+                    self.widgets[key] = (widget.id, forward.delta.fragment_id)
+                    self.rendered.add(key)
+            elif kind == "delta" and forward.delta.WhichOneof("type") == "add_block":
+                tabs = forward.delta.add_block.tab_container
+                if forward.delta.add_block.HasField("tab_container") and tabs.id:
+                    self.widgets[("tabs", tabs.id)] = (tabs.id, forward.delta.fragment_id)
+            elif kind == "script_finished" and forward.script_finished in DONE:
+                return
+
+    async def click(self, label):
+        widget_id, fragment_id = self.widgets[("button", label)]
+        await self.interact(widget_id, fragment_id)
+
+    async def set_value(self, kind, label, **value):
+        widget_id, _ = self.widgets[(kind, label)]
+        self.values = {key: state for key, state in self.values.items() if key != widget_id}
+        self.values[widget_id] = WidgetState(id=widget_id, **value)
+        await self.interact()
+
+
+async def drive(port, pid, balls):
+    """Log in, open the scorer console and score `balls` deliveries; returns per-ball (seconds, CPU seconds)."""
+    async with connect(f"ws://127.0.0.1:{port}/_stcore/stream", subprotocols=["streamlit"], max_size=None) as conn:
+        return await score(Browser(conn), pid, balls)
+
+
+async def log_in(browser, username, password):
+    """Load the page and log in from the sidebar; the navigation radio is then redrawn with the role's pages."""
+    await browser.interact()
+    await browser.set_value("radio", "Navigation", string_value="Login")
+    for label, value in (("Username", username), ("Password", password)):
+        widget_id, _ = browser.widgets[("text_input", label)]
+        browser.values[widget_id] = WidgetState(id=widget_id, string_value=value)
+    await browser.click("Login")
+    browser.values = {}
+
+
+async def score(browser, pid, balls):
+    await log_in(browser, "scorer", "score123")
+    await browser.set_value("radio", "Navigation", string_value="Scorer Panel")
+    await browser.click("Confirm Bowler")
+
+    timings = []
+    for n in range(balls):
+        label = BALLS[n % len(BALLS)]
+        cpu_before, started = cpu_seconds(pid), time.perf_counter()
+        await browser.click(label)
+        timings.append((time.perf_counter() - started, cpu_seconds(pid) - cpu_before))
+        if ("button", "Confirm Bowler") in browser.rendered:
+            await browser.click("Confirm Bowler")
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--app", default=str(ROOT / "Cricket App 4.py"), help="app script to serve")
+    parser.add_argument("--db", default=str(ROOT / "tournament.db"))
+    parser.add_argument("--balls", type=int, default=60)
+    parser.add_argument("--live", type=int, default=4, help="matches in play")
+    parser.add_argument("--dir", default=None, help="directory for the scratch database")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(dir=args.dir) as tmp:
+        shutil.copyfile(args.db, Path(tmp) / "tournament.db")
+        cricket_db.set_db_path(str(Path(tmp) / "tournament.db"))
+        cricket_db.init_db()
+        teams = 2
+        while teams * (teams - 1) // 2 < args.live:
+            teams += 1
+        # Only the benchmark's matches are live, so the console opens on the first of them
+        cricket_db.run_query("UPDATE matches SET status = 'Completed' WHERE status = 'Live'", scopes=("schedule", "live"))
+        for match_id, team_a, team_b in build_tournament(teams)[:args.live]:
+            go_live(match_id, team_a, team_b)
+        cricket_db.close_connections()
+
+        port = free_port()
+        server = start_app(Path(args.app).resolve(), tmp, port)
+        try:
+            timings = asyncio.run(drive(port, server.pid, args.balls))
+        finally:
+            server.terminate()
+            server.wait()
+
+    seconds = sorted(t for t, _ in timings)
+    cpu = sum(c for _, c in timings)
+    cuts = statistics.quantiles(seconds, n=100, method="inclusive")
+    print(f"{Path(args.app).name}: {len(timings)} balls through the scorer console")
+    print(f"{'server CPU ms per ball':<28}{cpu / len(timings) * 1e3:>10,.1f}")
+    for pct in (50, 95):
+        print(f"{f'round trip p{pct} (ms)':<28}{cuts[pct - 1] * 1e3:>10,.1f}")
+    print(f"{'round trip mean (ms)':<28}{statistics.fmean(seconds) * 1e3:>10,.1f}")
+
+
+if __name__ == "__main__":
+    main()
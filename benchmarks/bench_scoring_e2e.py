@@ -0,0 +1,262 @@
+"""End-to-end scoring throughput and per-ball latency through the real scoring path.
+
+Builds a round-robin tournament in a scratch copy of tournament.db and plays
+every match ball by ball through `scoring_engine.score_delivery`, the same
+load / apply / persist transaction the scorer page runs. That covers runs,
+extras, bowling figures, wickets, replacement batters, innings changes and
+chase finishes. Between balls it picks bowlers and openers the way the
+scorer does. Reports deliveries/s, p50/p95/p99 latency per ball, and SQL
+statements and commits per ball, and writes everything to JSON so runs from
+different versions can be compared:
+
+    python benchmarks/bench_scoring_e2e.py [--teams 8] [--dir /var/tmp]
+        [--json benchmarks/results/scoring_e2e.json] [--compare OLD.json]
+"""
+import argparse
+import collections
+import json
+import platform
+import random
+import shutil
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+import cricket_db  # noqa: E402
+from bench_engine import SQUAD_SIZE  # noqa: E402
+from scoring_engine import ScoringEngine, read_match_state, score_delivery  # noqa: E402
+from tournament_generator import OUTCOMES  # noqa: E402
+
+DEFAULT_JSON = ROOT / "benchmarks" / "results" / "scoring_e2e.json"
+
+
+class StatementCounter:
+    """sqlite3 trace callback tallying statements by leading keyword."""
+
+    def __init__(self):
+        self.kinds = collections.Counter()
+
+    def __call__(self, sql):
+        self.kinds[sql.split(None, 1)[0].upper()] += 1
+
+    def total(self):
+        return sum(self.kinds.values())
+
+
+def build_tournament(teams):
+    """Add `teams` squads and a single round robin of scheduled matches."""
+    names = [f"E2E Team {t}" for t in range(1, teams + 1)]
+    with cricket_db.transaction() as conn:
+        conn.executemany("INSERT OR IGNORE INTO teams (name, short_name) VALUES (?, ?)",
+                         [(name, f"E{t}") for t, name in enumerate(names, start=1)])
+        conn.executemany(
+            "INSERT OR IGNORE INTO players (player_name, team_name) VALUES (?, ?)",
+            [(f"{name} #{n}", name) for name in names for n in range(1, SQUAD_SIZE + 1)],
+        )
+        match_ids = []
+        for i, home in enumerate(names):
+            for away in names[i + 1:]:
+                cur = conn.execute(
+                    "INSERT INTO matches (team_a, team_b, status, batting_team) VALUES (?, ?, 'Scheduled', ?)",
+                    (home, away, home),
+                )
+                match_ids.append((cur.lastrowid, home, away))
+        cricket_db.bump_versions(conn, "schedule", "teams", "players")
+    return match_ids
+
+
+def go_live(match_id, team_a, team_b):
+    """The admin Go Live button."""
+    cricket_db.reset_team_player_stats(team_a)
+    cricket_db.reset_team_player_stats(team_b)
+    cricket_db.reset_match_state(match_id, team_a)
+    cricket_db.run_query(
+        "UPDATE matches SET status = 'Live' WHERE id = ?",
+        (match_id,),
+        scopes=(cricket_db.match_scope(match_id), "live", "schedule"),
+    )
+
+
+def prepare_ball(state, live, overs_bowled):
+    """Scorer actions between balls: choose openers and confirm the next bowler."""
+    if live["striker"] is None or live["non_striker"] is None:
+        bench = [p for p in state.not_out() if p not in (live["striker"], live["non_striker"])]
+        if live["striker"] is None and bench:
+            live["striker"] = bench.pop(0)
+        if live["non_striker"] is None and bench:
+            live["non_striker"] = bench.pop(0)
+    if live["pending_bowler"] or not live["bowler"]:
+        bowlers = list(state.squads[state.fielding_team])
+        bowler = bowlers[-1 - overs_bowled % 5]
+        cricket_db.run_query(
+            "UPDATE matches SET current_bowler_name = ?, current_bowler_runs = 0, current_bowler_wickets = 0 WHERE id = ?",
+            (bowler, state.match_id),
+            scopes=(cricket_db.match_scope(state.match_id), "live"),
+        )
+        live["bowler"] = bowler
+        live["pending_bowler"] = False
+
+
+def play_match(engine, match_id, rng, weights, outcomes, counter, latencies, per_ball):
+    """Play one match to a result; returns the number of innings played."""
+    with cricket_db.get_db_connection() as conn:
+        state = read_match_state(conn, match_id)
+    live = {
+        "striker": None, "non_striker": None, "bowler": None,
+        "pending_bowler": True, "innings_complete": False,
+    }
+    innings, overs_bowled = 1, 0
+    while True:
+        prepare_ball(state, live, overs_bowled)
+        delivery = rng.choices(outcomes, weights=weights)[0]
+
+        before = counter.kinds.copy()
+        start = time.perf_counter()
+        state, transition = score_delivery(engine, match_id, delivery, **live)
+        latencies.append(time.perf_counter() - start)
+        per_ball.update(counter.kinds - before)
+
+        live.update(
+            striker=state.striker,
+            non_striker=state.non_striker,
+            bowler=state.bowler,
+            pending_bowler=state.pending_bowler,
+            innings_complete=state.innings_complete,
+        )
+        if state.pending_bowler:
+            overs_bowled += 1
+        if transition.new_innings:
+            innings += 1
+        if transition.match_completed or state.innings_complete:
+            return innings
+
+
+def percentile_ms(cuts, pct):
+    return round(cuts[pct - 1] * 1e3, 4)
+
+
+def run(args):
+    rng = random.Random(args.seed)
+    weights = [weight for weight, _ in OUTCOMES]
+    outcomes = [delivery for _, delivery in OUTCOMES]
+    engine = ScoringEngine()
+    counter = StatementCounter()
+    per_ball = collections.Counter()
+    latencies = []
+
+    with tempfile.TemporaryDirectory(dir=args.dir) as tmp:
+        db_path = str(Path(tmp) / "e2e.db")
+        shutil.copyfile(args.db, db_path)
+        cricket_db.set_db_path(db_path)
+        cricket_db.init_db()
+        fixtures = build_tournament(args.teams)
+
+        # Single-threaded, so the pool keeps lending this one connection
+        with cricket_db.get_db_connection() as conn:
+            conn.set_trace_callback(counter)
+
+        innings = 0
+        start = time.perf_counter()
+        for match_id, team_a, team_b in fixtures:
+            go_live(match_id, team_a, team_b)
+            innings += play_match(engine, match_id, rng, weights, outcomes, counter, latencies, per_ball)
+        elapsed = time.perf_counter() - start
+        total_statements = counter.total()
+        cricket_db.close_connections()
+
+    balls = len(latencies)
+    cuts = statistics.quantiles(latencies, n=100, method="inclusive")
+    ball_statements = sum(per_ball.values())
+    return {
+        "deliveries": balls,
+        "matches": len(fixtures),
+        "innings": innings,
+        "elapsed_s": round(elapsed, 3),
+        "deliveries_per_s": round(balls / elapsed, 1),
+        "latency_ms": {
+            "mean": round(statistics.fmean(latencies) * 1e3, 4),
+            "p50": percentile_ms(cuts, 50),
+            "p95": percentile_ms(cuts, 95),
+            "p99": percentile_ms(cuts, 99),
+            "max": round(max(latencies) * 1e3, 4),
+        },
+        "statements_per_ball": round(ball_statements / balls, 3),
+        "commits_per_ball": round(per_ball["COMMIT"] / balls, 3),
+        "statements_per_ball_by_kind": {
+            kind: round(count / balls, 3) for kind, count in sorted(per_ball.items())
+        },
+        "statements_between_balls": total_statements - ball_statements,
+    }
+
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def flatten(results, prefix=""):
+    for key, value in results.items():
+        if isinstance(value, dict):
+            yield from flatten(value, f"{prefix}{key}.")
+        elif isinstance(value, (int, float)):
+            yield f"{prefix}{key}", value
+
+
+def print_report(results, previous=None):
+    old = dict(flatten(previous["results"])) if previous else {}
+    if previous:
+        print(f"compared with {previous.get('git_revision') or '?'} ({previous.get('timestamp', '?')})")
+    for key, value in flatten(results):
+        line = f"{key:<40}{value:>14,}"
+        if key in old and old[key]:
+            change = (value - old[key]) / old[key] * 100
+            line += f"{old[key]:>14,}  {change:+6.1f}%"
+        print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--db", default=str(ROOT / "tournament.db"))
+    parser.add_argument("--teams", type=int, default=8, help="round robin of teams*(teams-1)/2 matches")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--dir", default=None, help="directory for the scratch database")
+    parser.add_argument("--json", default=str(DEFAULT_JSON), help="where to write the results")
+    parser.add_argument("--compare", default=None, help="earlier results JSON to diff against")
+    args = parser.parse_args()
+
+    results = run(args)
+    report = {
+        "benchmark": "scoring_e2e",
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "git_revision": git_revision(),
+        "python": platform.python_version(),
+        "sqlite": sqlite3.sqlite_version,
+        "params": {"teams": args.teams, "seed": args.seed, "dir": args.dir},
+        "results": results,
+    }
+
+    previous = None
+    if args.compare:
+        previous = json.loads(Path(args.compare).read_text(encoding="utf-8"))
+    print_report(results, previous)
+
+    out = Path(args.json)
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+    print(f"\nwrote {out}")
+
+
+if __name__ == "__main__":
+    main()
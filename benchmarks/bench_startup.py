@@ -0,0 +1,79 @@
+"""Per-rerun cost of schema setup: re-running every check versus PRAGMA user_version.
+
+Streamlit re-executes the app script, and with it `init_db()`, on every
+interaction. This times three ways of doing that against a scratch copy of
+tournament.db that is already at the current schema:
+
+    python benchmarks/bench_startup.py [--db tournament.db] [--reruns 2000]
+
+- every check: the unversioned setup, replaying all CREATE ... IF NOT EXISTS,
+  PRAGMA table_info and column checks and then committing
+- user_version read: the versioned runner in a fresh process (one PRAGMA)
+- memoized: the versioned runner once this process has seen the file
+"""
+import argparse
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+import cricket_db  # noqa: E402
+
+
+def every_check():
+    """What init_db did before versioning: all idempotent checks, then commit."""
+    with cricket_db.get_db_connection() as conn:
+        c = conn.cursor()
+        for migration in cricket_db.MIGRATIONS:
+            migration(c)
+        conn.commit()
+
+
+def version_read():
+    """The versioned runner without the in-process memo."""
+    cricket_db._migrated_paths.clear()
+    cricket_db.init_db()
+
+
+def time_per_call(fn, reruns):
+    start = time.perf_counter()
+    for _ in range(reruns):
+        fn()
+    return (time.perf_counter() - start) / reruns * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--db", default=str(ROOT / "tournament.db"))
+    parser.add_argument("--reruns", type=int, default=2000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = str(Path(tmp) / "startup.db")
+        shutil.copyfile(args.db, db_path)
+        cricket_db.set_db_path(db_path)
+
+        start = time.perf_counter()
+        cricket_db.init_db()
+        first_ms = (time.perf_counter() - start) * 1e3
+
+        rows = [
+            ("every check", time_per_call(every_check, args.reruns)),
+            ("user_version read", time_per_call(version_read, args.reruns)),
+            ("memoized", time_per_call(cricket_db.init_db, args.reruns)),
+        ]
+        cricket_db.close_connections()
+
+    print(f"first run (migrate to v{cricket_db.SCHEMA_VERSION}): {first_ms:.1f} ms")
+    print(f"{'per rerun':<20}{'µs':>10}{'saved µs':>12}")
+    baseline = rows[0][1]
+    for label, micros in rows:
+        print(f"{label:<20}{micros:>10.1f}{baseline - micros:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
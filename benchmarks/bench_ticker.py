@@ -0,0 +1,155 @@
+"""Database load and delivery lag of the score_api live ticker as viewers are added.
+
+Starts a ScoreAPIServer in-process on a scratch copy of tournament.db with
+--live matches in play, then for each count in --viewers opens that many
+server-sent-event connections to /api/stream and scores --balls-per-sec
+deliveries for --seconds through the scorer's real path. Reports the SQL
+statements the ticker ran per second (which should not move with the number
+of viewers), the events it pushed and how many reached the viewers, and the
+lag from a ball's commit to each viewer reading it:
+
+    python benchmarks/bench_ticker.py [--viewers 10 100 1000] [--seconds 8] [--balls-per-sec 2]
+"""
+import argparse
+import json
+import resource
+import selectors
+import shutil
+import socket
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+import cricket_db  # noqa: E402
+import score_api  # noqa: E402
+from bench_score_api import Scorer  # noqa: E402
+from bench_scoring_e2e import build_tournament, go_live  # noqa: E402
+
+
+class TimedScorer(Scorer):
+    """Scorer noting when each (match id, version) was committed."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.committed = {}
+
+    def ball(self, match_id):
+        transition = super().ball(match_id)
+        self.committed[(match_id, transition.version)] = time.perf_counter()
+        return transition
+
+
+class Viewers(threading.Thread):
+    """Reads every viewer's event stream on one selector thread."""
+
+    def __init__(self, port, count, committed):
+        super().__init__(daemon=True)
+        self.committed = committed
+        self.selector = selectors.DefaultSelector()
+        self.buffers = {}
+        self.stopped = threading.Event()
+        self.events = 0
+        self.lags = []
+        self.since = float("inf")  # only balls committed after this are timed, not the connect snapshots
+        for _ in range(count):
+            sock = socket.create_connection(("127.0.0.1", port))
+            sock.sendall(b"GET /api/stream HTTP/1.1\r\nHost: bench\r\n\r\n")
+            sock.setblocking(False)
+            self.selector.register(sock, selectors.EVENT_READ)
+            self.buffers[sock] = b""
+
+    def read(self, sock):
+        chunk = sock.recv(65536)
+        received = time.perf_counter()
+        if not chunk:
+            self.selector.unregister(sock)
+            return
+        *blocks, self.buffers[sock] = (self.buffers[sock] + chunk).split(b"\n\n")
+        for block in blocks:
+            if b"event: score" not in block:
+                continue
+            self.events += 1
+            delta = json.loads(block.rpartition(b"data: ")[2])
+            committed = self.committed.get((delta["id"], delta["version"]))
+            if committed is not None and committed >= self.since:
+                self.lags.append(received - committed)
+
+    def run(self):
+        while not self.stopped.is_set():
+            for key, _ in self.selector.select(0.1):
+                self.read(key.fileobj)
+
+    def close(self):
+        self.stopped.set()
+        self.join()
+        for sock in self.buffers:
+            sock.close()
+        self.selector.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--db", default=str(ROOT / "tournament.db"))
+    parser.add_argument("--viewers", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--seconds", type=float, default=8.0, help="scoring time per viewer count")
+    parser.add_argument("--live", type=int, default=4, help="matches in play")
+    parser.add_argument("--balls-per-sec", type=float, default=2.0)
+    parser.add_argument("--dir", default=None, help="directory for the scratch database")
+    args = parser.parse_args()
+
+    # Two descriptors per viewer: the client socket and the server's side of it
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    wanted = 2 * max(args.viewers) + 64
+    if soft != resource.RLIM_INFINITY and soft < wanted:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (min(wanted, hard), hard))
+
+    with tempfile.TemporaryDirectory(dir=args.dir) as tmp:
+        db_path = str(Path(tmp) / "ticker.db")
+        shutil.copyfile(args.db, db_path)
+        cricket_db.set_db_path(db_path)
+        cricket_db.init_db()
+        teams = 2
+        while teams * (teams - 1) // 2 < args.live:
+            teams += 1
+        fixtures = build_tournament(teams)[:args.live]
+        for match_id, team_a, team_b in fixtures:
+            go_live(match_id, team_a, team_b)
+
+        server = score_api.ScoreAPIServer(("127.0.0.1", 0))
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        ticker = server.ticker
+        scorer = TimedScorer([match_id for match_id, _, _ in fixtures], args.balls_per_sec, seed=7)
+        print(f"{'viewers':>8}{'balls':>8}{'ticker SQL/s':>14}{'events':>8}{'delivered':>11}"
+              f"{'lag p50 ms':>12}{'lag p95 ms':>12}")
+        try:
+            for count in args.viewers:
+                viewers = Viewers(server.server_port, count, scorer.committed)
+                viewers.start()
+                time.sleep(1.0)  # let every viewer take its snapshot
+                statements, events, delivered, balls = ticker.statements, ticker.seq, viewers.events, scorer.balls
+                started = viewers.since = time.perf_counter()
+                while time.perf_counter() - started < args.seconds and scorer.matches:
+                    time.sleep(scorer.interval)
+                    scorer.ball(scorer.rng.choice(list(scorer.matches)))
+                time.sleep(2 * score_api.TICKER_INTERVAL)
+                elapsed = time.perf_counter() - started
+                lags = sorted(viewers.lags) or [0.0]
+                cuts = statistics.quantiles(lags, n=100, method="inclusive") if len(lags) > 1 else lags * 99
+                print(f"{count:>8,}{scorer.balls - balls:>8,}{(ticker.statements - statements) / elapsed:>14,.1f}"
+                      f"{ticker.seq - events:>8,}{viewers.events - delivered:>11,}"
+                      f"{cuts[49] * 1e3:>12,.1f}{cuts[94] * 1e3:>12,.1f}")
+                viewers.close()
+        finally:
+            server.shutdown()
+            server.server_close()
+            cricket_db.close_connections()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,291 @@
+"""Query-plan regression check for every SQL string in the app.
+
+Builds a synthetic database (100k players / 50k matches by default), pulls
+every SQL literal out of the app and the database layer, and runs
+EXPLAIN QUERY PLAN on each. A query fails when it scans a whole table or
+sorts through a temp B-tree instead of walking an index, unless it is listed
+in COLD_QUERIES or BOUNDED_SORTS with the reason that is acceptable. A
+statement the current schema cannot prepare (a dropped or renamed column)
+fails too, unless it is a migration step listed in HISTORICAL_STATEMENTS.
+Exits non-zero on any failure:
+
+    python benchmarks/query_plan_check.py [--players 100000] [--matches 50000]
+"""
+import argparse
+import ast
+import random
+import re
+import sqlite3
+import sys
+import tempfile
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+import cricket_db  # noqa: E402
+
+SOURCES = [ROOT / "Cricket App 4.py", ROOT / "cricket_db.py", ROOT / "scoring_engine.py", ROOT / "bulk_import.py",
+           ROOT / "tournament_generator.py", ROOT / "live_snapshots.py", ROOT / "score_api.py"]
+SQL_START = re.compile(r"^\s*(SELECT|UPDATE|DELETE|INSERT|WITH)\b")
+
+# Functions assembling SQL at run time; their statements are checked through ARCHIVE_FILTERS
+DYNAMIC_SQL = {"_archive_branches", "archive_page_query", "archive_count_query"}
+ARCHIVE_COLUMNS = "id, status, team_a, team_b, created_at"
+
+# Statements allowed to read a whole table, keyed by normalized prefix.
+COLD_QUERIES = {
+    "SELECT COUNT(*) FROM teams": "dashboard metric, served from the read cache",
+    "SELECT COUNT(*) FROM players": "dashboard metric, served from the read cache",
+    "SELECT id, name, short_name FROM teams": "admin team list",
+    "SELECT name FROM teams": "admin team pickers",
+    "SELECT * FROM matches WHERE status != 'Completed'": "admin match list",
+    "SELECT id, status, team_a, team_a_runs": "admin history table",
+    "SELECT id FROM matches ORDER BY created_at, id": "full snapshot publish reads every id, in index order",
+    "WITH agg AS": "batch rebuild from the delivery log",
+    "WITH latest AS": "batch rebuild from the delivery log",
+    "INSERT OR IGNORE INTO bowling_figures": "one-off backfill from the delivery log",
+    "INSERT INTO bowling_figures (match_id, innings, bowler, runs, balls, wickets) SELECT":
+        "batch rebuild from the delivery log",
+    "DELETE FROM bowling_figures WHERE match_id IN (SELECT match_id FROM deliveries)":
+        "batch rebuild from the delivery log",
+    "INSERT OR IGNORE INTO player_innings": "one-off backfill from the delivery log",
+    "UPDATE player_innings SET runs = 0": "batch rebuild from the delivery log",
+    "INSERT INTO player_innings (match_id, team_name, player_name, runs, balls, fours, sixes, out_status) SELECT":
+        "batch rebuild from the delivery log",
+    "SELECT team_name AS Team, played AS P": "points table walks idx_standings_table, one row per team",
+    "WITH completed_sides": "full standings recompute over completed matches",
+    "WITH numbered AS": "one-off match number backfill in the migration",
+    "WITH extras AS": "batch rebuild from the delivery log",
+    "UPDATE deliveries SET commentary =": "one-off commentary backfill in the migration",
+    "SELECT player_name AS Player, team_name AS Team, matches AS M":
+        "top ten off idx_player_career_runs, the LIMIT ends the index walk",
+    "SELECT (SELECT COUNT(*) FROM matches)": "archive total, cached until the schedule changes",
+    f"SELECT {ARCHIVE_COLUMNS} FROM matches ORDER BY created_at DESC, id DESC LIMIT ?":
+        "newest archive page off idx_matches_created, the LIMIT ends the index walk",
+}
+
+# Statements allowed to sort in a temp B-tree because the rows sorted are bounded.
+BOUNDED_SORTS = {
+    "SELECT player_name, runs, balls, fours, sixes, out_status FROM players WHERE team_name = ? AND out_status = 'Not Out'":
+        "sorts one squad's not-out batters",
+    "SELECT team_name AS Team, player_name AS Player, runs AS Runs":
+        "sorts one match's batters",
+    "SELECT team_name, player_name, runs, balls, fours, sixes, out_status FROM player_innings WHERE match_id = ?":
+        "sorts one match's batters",
+    "SELECT * FROM (SELECT": "merges one archive page per team side and status",
+}
+
+# Migration steps that read columns a later step drops, so they no longer prepare against the current schema
+HISTORICAL_STATEMENTS = {
+    "UPDATE matches SET team_a_balls = CAST(team_a_overs AS INTEGER)":
+        "migration 3 converts the overs columns to balls before dropping them",
+}
+
+# Every filter combination of the results archive, whose SQL is assembled at run time
+ARCHIVE_FILTERS = [
+    {},
+    {"status": "Completed"},
+    {"team": "Team 5"},
+    {"team": "Team 5", "status": "Live"},
+    {"date_from": "2025-01-10", "date_to": "2025-01-20"},
+    {"team": "Team 5", "status": "Completed", "date_from": "2025-01-10"},
+]
+
+
+def normalize(sql):
+    return " ".join(sql.split())
+
+
+def _fill_placeholder(node):
+    """Stand-in text for an f-string hole so the statement can be planned."""
+    expr = ast.unparse(node.value)
+    if "prefix" in expr or "side" in expr:
+        return "team_a"
+    if "join" in expr:
+        return "?"
+    return "1"
+
+
+def _string_value(node, named):
+    """Text of a string literal, f-string or `name + literal` concatenation."""
+    if isinstance(node, ast.Constant) and isinstance(node.value, str):
+        return node.value
+    if isinstance(node, ast.JoinedStr):
+        return "".join(
+            value.value if isinstance(value, ast.Constant) else _fill_placeholder(value)
+            for value in node.values
+        )
+    if isinstance(node, ast.Name):
+        return named.get(node.id)
+    if isinstance(node, ast.BinOp) and isinstance(node.op, ast.Add):
+        left, right = _string_value(node.left, named), _string_value(node.right, named)
+        if left is not None and right is not None:
+            return left + right
+    return None
+
+
+def extract_sql(path):
+    """Yield (line, sql) for every SQL statement built from string literals in a source file."""
+    tree = ast.parse(path.read_text(encoding="utf-8"))
+    named, assigned = {}, {}
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Assign) and len(node.targets) == 1 and isinstance(node.targets[0], ast.Name):
+            value = _string_value(node.value, {})
+            if value is not None:
+                named[node.targets[0].id] = value
+                assigned[node.targets[0].id] = id(node.value)
+
+    # Pieces of a larger expression are reported as part of that expression only
+    nested = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.FunctionDef) and node.name in DYNAMIC_SQL:
+            nested.update(id(inner) for inner in ast.walk(node))
+    for node in ast.walk(tree):
+        if isinstance(node, ast.JoinedStr):
+            nested.update(id(value) for value in node.values)
+        elif isinstance(node, ast.BinOp):
+            nested.update((id(node.left), id(node.right)))
+            for operand in (node.left, node.right):
+                if isinstance(operand, ast.Name) and operand.id in assigned:
+                    nested.add(assigned[operand.id])
+
+    for node in ast.walk(tree):
+        if id(node) in nested or isinstance(node, ast.Name):
+            continue
+        text = _string_value(node, named)
+        if text is not None and SQL_START.match(text):
+            yield node.lineno, normalize(text)
+
+
+def collect_queries():
+    seen = {}
+    for path in SOURCES:
+        for line, sql in extract_sql(path):
+            seen.setdefault(sql, f"{path.name}:{line}")
+    for number, filters in enumerate(ARCHIVE_FILTERS, start=1):
+        for after in (None, ("2025-01-20 00:00:00", 30000)):
+            sql, _ = cricket_db.archive_page_query(ARCHIVE_COLUMNS, 21, after=after, **filters)
+            seen.setdefault(normalize(sql), f"archive page #{number}")
+        sql, _ = cricket_db.archive_count_query(**filters)
+        seen.setdefault(normalize(sql), f"archive count #{number}")
+    return seen
+
+
+class _AnyParams(dict):
+    """Named-parameter mapping that binds NULL for every name."""
+
+    def __missing__(self, key):
+        return None
+
+
+def explain(conn, sql):
+    if re.search(r":\w+", sql) and "?" not in sql:
+        params = _AnyParams()
+    else:
+        params = (None,) * sql.count("?")
+    return [row[3] for row in conn.execute("EXPLAIN QUERY PLAN " + sql, params)]
+
+
+def allowance(sql, allowed):
+    for prefix, reason in allowed.items():
+        if sql.startswith(prefix):
+            return reason
+    return None
+
+
+def problems_in(sql, plan):
+    """Return (problems, reasons): unexcused scans/sorts and the excuses used."""
+    found, reasons = [], []
+    for detail in plan:
+        if detail.startswith("SCAN ") and detail != "SCAN CONSTANT ROW" and not detail.startswith("SCAN (subquery"):
+            reason = allowance(sql, COLD_QUERIES)
+        elif "USE TEMP B-TREE FOR" in detail and "ORDER BY" in detail:
+            reason = allowance(sql, COLD_QUERIES) or allowance(sql, BOUNDED_SORTS)
+        else:
+            continue
+        if reason:
+            reasons.append(reason)
+        else:
+            found.append(detail)
+    return found, reasons
+
+
+def build_database(db_path, players, matches, seed=7):
+    """Create a synthetic tournament with the app's schema and indexes."""
+    rng = random.Random(seed)
+    team_count = max(2, players // 15)
+    cricket_db.set_db_path(db_path)
+    cricket_db.init_db()
+    with cricket_db.transaction() as conn:
+        conn.executemany(
+            "INSERT INTO teams (name, short_name) VALUES (?, ?)",
+            ((f"Team {t}", f"T{t}") for t in range(team_count)),
+        )
+        conn.executemany(
+            "INSERT INTO players (player_name, team_name, runs, balls, out_status) VALUES (?, ?, ?, ?, ?)",
+            (
+                (f"Player {p}", f"Team {p % team_count}", rng.randint(0, 90), rng.randint(0, 60),
+                 rng.choice(("Not Out", "Not Out", "Out (B)", "Out (C)")))
+                for p in range(players)
+            ),
+        )
+        statuses = ("Completed",) * 8 + ("Scheduled", "Live")
+        conn.executemany(
+            """
+            INSERT INTO matches (team_a, team_b, status, batting_team, team_a_runs, team_a_balls, created_at)
+            VALUES (?, ?, ?, ?, ?, ?, datetime('2025-01-01', ? || ' minutes'))
+            """,
+            (
+                (f"Team {m % team_count}", f"Team {(m + 1) % team_count}", rng.choice(statuses),
+                 f"Team {m % team_count}", rng.randint(80, 220), rng.randint(60, 120), m)
+                for m in range(matches)
+            ),
+        )
+        conn.execute("ANALYZE")
+    cricket_db.close_connections()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--players", type=int, default=100_000)
+    parser.add_argument("--matches", type=int, default=50_000)
+    args = parser.parse_args()
+
+    failures = 0
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = str(Path(tmp) / "plans.db")
+        build_database(db_path, args.players, args.matches)
+        conn = sqlite3.connect(db_path)
+        try:
+            for sql, origin in sorted(collect_queries().items(), key=lambda item: item[1]):
+                try:
+                    plan = explain(conn, sql)
+                except sqlite3.Error as exc:
+                    reason = allowance(sql, HISTORICAL_STATEMENTS)
+                    if reason:
+                        print(f"SKIP  {origin:<28} {sql[:70]} ({reason})")
+                    else:
+                        failures += 1
+                        print(f"FAIL  {origin:<28} {sql[:70]}")
+                        print(f"        does not prepare: {exc}")
+                    continue
+                problems, reasons = problems_in(sql, plan)
+                if problems:
+                    failures += 1
+                    print(f"FAIL  {origin:<28} {sql[:70]}")
+                    for detail in problems:
+                        print(f"        {detail}")
+                elif reasons:
+                    print(f"ALLOW {origin:<28} {sql[:70]} ({reasons[0]})")
+                else:
+                    print(f"ok    {origin:<28} {sql[:70]}")
+        finally:
+            conn.close()
+
+    print(f"\n{failures} hot quer{'y' if failures == 1 else 'ies'} failed to prepare or fell back to a full scan or sort")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,57 @@
+"""Permission check for the published live-score snapshots.
+
+Publishes every snapshot from a scratch copy of tournament.db under --umask
+and checks that index.json and each match-<id>.json carry the mode a plain
+open() would give (0644 less the umask), so a static file server or CDN
+origin running as another user can read them. Exits non-zero on any file
+with another mode:
+
+    python benchmarks/snapshot_mode_check.py [--umask 022]
+"""
+import argparse
+import os
+import shutil
+import stat
+import sys
+import tempfile
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--db", default=str(ROOT / "tournament.db"))
+    parser.add_argument("--umask", type=lambda text: int(text, 8), default=0o022, help="octal (default: 022)")
+    args = parser.parse_args()
+
+    # live_snapshots reads the umask when it is imported
+    os.umask(args.umask)
+    import cricket_db
+    import live_snapshots
+
+    expected = 0o644 & ~args.umask
+    failures = 0
+    with tempfile.TemporaryDirectory() as tmp:
+        shutil.copyfile(args.db, Path(tmp) / "tournament.db")
+        cricket_db.set_db_path(str(Path(tmp) / "tournament.db"))
+        cricket_db.init_db()
+        snapshot_dir = Path(tmp) / "snapshots"
+        try:
+            live_snapshots.publish_all(str(snapshot_dir), every_match=True)
+        finally:
+            cricket_db.close_connections()
+        published = sorted(snapshot_dir.iterdir())
+        for path in published:
+            mode = stat.S_IMODE(path.stat().st_mode)
+            if mode != expected:
+                failures += 1
+                print(f"FAIL  {path.name:<20} {mode:04o}, expected {expected:04o}")
+
+    print(f"{failures} of {len(published)} snapshots published with a mode other than {expected:04o}")
+    return 1 if failures or not published else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
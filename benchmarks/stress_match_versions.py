@@ -0,0 +1,228 @@
+"""Several processes scoring one match at once: no run or ball may be lost or doubled.
+
+Puts one fresh match live in a scratch copy of tournament.db and starts
+--workers processes that each commit --balls deliveries to it through
+`score_delivery`, passing the match version they last saw. A worker whose
+version is stale gets MatchConflict, re-reads the match and scores again,
+as the scorer page does after it resyncs. Afterwards the scoreboard, the
+batters and the bowling figures must agree with the delivery log, with the
+balls the workers saw committed and with a rebuild from the log; exits
+non-zero otherwise. --naive runs the same load through the read, then write
+absolute totals pattern the scorer used before match versions, to show what
+it loses:
+
+    python benchmarks/stress_match_versions.py [--workers 4] [--balls 300] [--think-ms 1] [--naive]
+"""
+import argparse
+import random
+import shutil
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+import cricket_db  # noqa: E402
+from cricket_db import MatchConflict, fetch_one  # noqa: E402
+from scoring_engine import Delivery, ScoringEngine, score_delivery  # noqa: E402
+
+TEAMS = ("Stress XI A", "Stress XI B")
+SQUAD_SIZE = 11
+# No wickets, so the innings outlasts any run length and every ball is comparable
+OUTCOMES = [Delivery(0), Delivery(1), Delivery(1), Delivery(2), Delivery(4), Delivery(6),
+            Delivery(1, is_extra=True, credit_batsman=False)]
+BOWLER_SQL = "UPDATE matches SET current_bowler_name = ?, current_bowler_runs = 0, current_bowler_wickets = 0 WHERE id = ?"
+
+
+# What each worker adds up from the balls it saw committed, checked against the database
+CHECKS = ("runs", "legal balls", "batter runs", "bowler runs")
+NAIVE_CHECKS = CHECKS[:2]  # the naive writer keeps only the scoreboard
+
+
+def add_ball(totals, delivery):
+    totals["runs"] += delivery.runs
+    totals["legal balls"] += 0 if delivery.is_extra else 1
+    totals["batter runs"] += delivery.credited_runs
+    totals["bowler runs"] += delivery.runs
+
+
+def setup_match():
+    """Two squads and one live match with team A batting; returns the match id."""
+    with cricket_db.transaction() as conn:
+        conn.executemany("INSERT OR IGNORE INTO teams (name, short_name) VALUES (?, ?)",
+                         [(team, f"SX{n}") for n, team in enumerate(TEAMS, start=1)])
+        conn.executemany(
+            "INSERT INTO players (player_name, team_name) VALUES (?, ?)",
+            [(f"{team} #{n:02d}", team) for team in TEAMS for n in range(1, SQUAD_SIZE + 1)],
+        )
+        match_id = conn.execute(
+            "INSERT INTO matches (team_a, team_b, status, batting_team) VALUES (?, ?, 'Live', ?)",
+            (TEAMS[0], TEAMS[1], TEAMS[0]),
+        ).lastrowid
+        cricket_db.bump_versions(conn, cricket_db.ALL_SCOPE)
+    cricket_db.reset_match_state(match_id, TEAMS[0])
+    return match_id
+
+
+def resync(match_id):
+    """What a scorer page rebuilds after a conflict: the version, then the live fields."""
+    with cricket_db.get_db_connection() as conn:
+        # Version first: anything written after it makes the next claim fail, never pass
+        row = fetch_one(conn, "SELECT version, current_bowler_name FROM matches WHERE id = ?", (match_id,))
+        last = conn.execute(
+            "SELECT striker, non_striker FROM deliveries WHERE match_id = ? AND innings = 1 ORDER BY id DESC LIMIT 1",
+            (match_id,),
+        ).fetchone()
+    striker, non_striker = last or (f"{TEAMS[0]} #01", f"{TEAMS[0]} #02")
+    return row["version"], {
+        "striker": striker, "non_striker": non_striker, "bowler": row["current_bowler_name"],
+        "pending_bowler": row["current_bowler_name"] is None, "innings_complete": False,
+    }
+
+
+def versioned_worker(db_path, match_id, balls, seed, start_at, think):
+    """Commit `balls` deliveries with compare-and-set; returns (balls, conflicts, totals)."""
+    cricket_db.set_db_path(db_path)
+    rng = random.Random(seed)
+    engine = ScoringEngine()
+    committed = conflicts = 0
+    totals = dict.fromkeys(CHECKS, 0)
+    version, live = resync(match_id)
+    time.sleep(max(0.0, start_at - time.time()))
+    while committed < balls:
+        time.sleep(think)
+        try:
+            if live["pending_bowler"]:
+                # Confirm Bowler
+                bowler = f"{TEAMS[1]} #{rng.randrange(7, SQUAD_SIZE + 1):02d}"
+                version = cricket_db.update_match(
+                    match_id, BOWLER_SQL, (bowler, match_id), expected_version=version,
+                    scopes=(cricket_db.match_scope(match_id), "live"),
+                )
+                live.update(bowler=bowler, pending_bowler=False)
+                continue
+            delivery = rng.choice(OUTCOMES)
+            state, transition = score_delivery(engine, match_id, delivery, version, **live)
+        except MatchConflict:
+            conflicts += 1
+            version, live = resync(match_id)
+            continue
+        version = transition.version
+        live.update(striker=state.striker, non_striker=state.non_striker, bowler=state.bowler,
+                    pending_bowler=state.pending_bowler)
+        committed += 1
+        add_ball(totals, delivery)
+    cricket_db.close_connections()
+    return committed, conflicts, totals
+
+
+def naive_worker(db_path, match_id, balls, seed, start_at, think):
+    """Read the totals, then write them back absolute: the pattern match versions replace."""
+    cricket_db.set_db_path(db_path)
+    rng = random.Random(seed)
+    totals = dict.fromkeys(CHECKS, 0)
+    time.sleep(max(0.0, start_at - time.time()))
+    for _ in range(balls):
+        delivery = rng.choice(OUTCOMES)
+        with cricket_db.get_db_connection() as conn:
+            current_runs, current_balls = conn.execute(
+                "SELECT team_a_runs, team_a_balls FROM matches WHERE id = ?", (match_id,)
+            ).fetchone()
+        time.sleep(think)
+        cricket_db.run_query(
+            "UPDATE matches SET team_a_runs = ?, team_a_balls = ? WHERE id = ?",
+            (current_runs + delivery.runs, current_balls + (0 if delivery.is_extra else 1), match_id),
+        )
+        add_ball(totals, delivery)
+    cricket_db.close_connections()
+    return balls, 0, totals
+
+
+def counters(conn, match_id):
+    """The materialized totals for team A's innings."""
+    runs, balls = conn.execute("SELECT team_a_runs, team_a_balls FROM matches WHERE id = ?", (match_id,)).fetchone()
+    return {
+        "runs": runs,
+        "legal balls": balls,
+        "batter runs": conn.execute("SELECT SUM(runs) FROM players WHERE team_name = ?", (TEAMS[0],)).fetchone()[0],
+        "bowler runs": conn.execute("SELECT SUM(runs) FROM bowling_figures WHERE match_id = ?", (match_id,)).fetchone()[0],
+    }
+
+
+def log_totals(conn, match_id):
+    """The same totals summed from the delivery log, and the number of balls logged."""
+    count, runs, legal, batter = conn.execute(
+        "SELECT COUNT(*), SUM(runs), SUM(is_legal), SUM(batsman_runs) FROM deliveries WHERE match_id = ?",
+        (match_id,),
+    ).fetchone()
+    return count, {"runs": runs, "legal balls": legal, "batter runs": batter, "bowler runs": runs}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--db", default=str(ROOT / "tournament.db"))
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--balls", type=int, default=300, help="deliveries each worker commits")
+    parser.add_argument("--think-ms", type=float, default=1.0, help="pause between reading the match and writing")
+    parser.add_argument("--naive", action="store_true", help="unversioned read-then-write instead")
+    parser.add_argument("--dir", default=None, help="directory for the scratch database")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(dir=args.dir) as tmp:
+        db_path = str(Path(tmp) / "stress.db")
+        shutil.copyfile(args.db, db_path)
+        cricket_db.set_db_path(db_path)
+        cricket_db.init_db()
+        match_id = setup_match()
+        with cricket_db.get_db_connection() as conn:
+            version_before = cricket_db.match_version(conn, match_id)
+        cricket_db.close_connections()
+
+        worker = naive_worker if args.naive else versioned_worker
+        start_at = time.time() + 1.0
+        started = time.perf_counter()
+        with ProcessPoolExecutor(max_workers=args.workers) as pool:
+            results = list(pool.map(
+                worker,
+                *zip(*[(db_path, match_id, args.balls, seed, start_at, args.think_ms / 1000)
+                       for seed in range(args.workers)]),
+            ))
+        elapsed = time.perf_counter() - started - 1.0
+
+        committed = sum(result[0] for result in results)
+        conflicts = sum(result[1] for result in results)
+        expected = {name: sum(result[2][name] for result in results) for name in CHECKS}
+        with cricket_db.get_db_connection() as conn:
+            stored = counters(conn, match_id)
+            logged_balls, logged = log_totals(conn, match_id)
+            version_after = cricket_db.match_version(conn, match_id)
+        with cricket_db.transaction() as conn:
+            cricket_db.rebuild_aggregates(conn)
+        with cricket_db.get_db_connection() as conn:
+            rebuilt = counters(conn, match_id)
+        cricket_db.close_connections()
+
+    print(
+        f"{args.workers} workers x {args.balls} balls, {'naive' if args.naive else 'versioned'}, "
+        f"in {elapsed:.1f} s: {committed:,} committed ({committed / elapsed:,.0f}/s), "
+        f"{conflicts:,} conflicts retried, match version {version_before} -> {version_after}"
+    )
+    print(f"{'':<14}{'workers':>10}{'counters':>10}{'log':>10}{'rebuilt':>10}")
+    failures = 0
+    for name in NAIVE_CHECKS if args.naive else CHECKS:
+        values = (expected[name], stored[name]) if args.naive else (
+            expected[name], stored[name], logged[name], rebuilt[name])
+        lost = len(set(values)) != 1
+        failures += lost
+        print(f"{name:<14}" + "".join(f"{value or 0:>10,}" for value in values) + ("   LOST OR DOUBLED" if lost else ""))
+    if not args.naive and logged_balls != committed:
+        failures += 1
+        print(f"{logged_balls:,} deliveries logged for {committed:,} committed")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,289 @@
+"""Streaming bulk import of teams, players and fixtures for CricStream.
+
+Reads CSV (with a header row) or JSON (a top-level array of objects, or
+JSON Lines) one row at a time, validates each row and inserts the good ones
+with executemany in fixed-size batches inside a single transaction, so
+files far larger than memory load in one commit and one cache
+invalidation. Used by the admin Database tab and from the command line:
+
+    python bulk_import.py teams teams.csv
+    python bulk_import.py players squads.jsonl
+    python bulk_import.py fixtures fixtures.json [--db tournament.db] [--format json]
+"""
+import csv
+import io
+import json
+import time
+from itertools import islice
+
+from cricket_db import bump_versions, squad_scope, transaction
+
+BATCH_SIZE = 5000
+MAX_NAME_LENGTH = 100
+MAX_REPORTED_ERRORS = 20
+JSON_CHUNK_SIZE = 1 << 16
+
+
+class BulkImportError(ValueError):
+    """The file as a whole cannot be imported (unknown kind or format, bad JSON)."""
+
+
+# kind -> (required fields, optional fields with defaults)
+KINDS = {
+    "teams": (("name",), {"short_name": None}),
+    "players": (("player_name", "team_name"), {}),
+    "fixtures": (("team_a", "team_b"), {"batting_team": None}),
+}
+
+
+class ImportReport:
+    """Counts and timing for one import."""
+
+    __slots__ = ("kind", "read", "inserted", "invalid", "errors", "elapsed")
+
+    def __init__(self, kind):
+        self.kind = kind
+        self.read = 0
+        self.inserted = 0
+        self.invalid = 0
+        self.errors = []      # (row number, message), the first MAX_REPORTED_ERRORS only
+        self.elapsed = 0.0
+
+    @property
+    def skipped(self):
+        """Valid rows that were already in the database."""
+        return self.read - self.invalid - self.inserted
+
+    @property
+    def rows_per_s(self):
+        return self.read / self.elapsed if self.elapsed else 0.0
+
+    def reject(self, row_number, message):
+        self.invalid += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append((row_number, message))
+
+    def summary(self):
+        return (
+            f"{self.kind}: {self.read:,} rows read, {self.inserted:,} inserted, "
+            f"{self.skipped:,} already present, {self.invalid:,} invalid "
+            f"in {self.elapsed:.2f} s ({self.rows_per_s:,.0f} rows/s)"
+        )
+
+
+# ==========================================
+# READERS
+# ==========================================
+def detect_format(filename):
+    return "csv" if str(filename).lower().endswith(".csv") else "json"
+
+
+def iter_csv(stream):
+    """Yield one dict per data row of a CSV text stream with a header row."""
+    yield from csv.DictReader(stream)
+
+
+def iter_json(stream):
+    """Yield the objects of a JSON array or of JSON Lines without reading the whole stream."""
+    decoder = json.JSONDecoder()
+    buffer = ""
+    pos = 0
+    eof = False
+    in_array = None
+
+    while True:
+        # Skip whitespace and the array punctuation between objects
+        while True:
+            while pos < len(buffer) and buffer[pos] in " \t\r\n,":
+                pos += 1
+            if pos < len(buffer) and in_array is None:
+                in_array = buffer[pos] == "["
+                if in_array:
+                    pos += 1
+                    continue
+            if pos < len(buffer) and buffer[pos] == "]" and in_array:
+                return
+            if pos < len(buffer) or eof:
+                break
+            buffer, pos = stream.read(JSON_CHUNK_SIZE), 0
+            eof = not buffer
+        if pos >= len(buffer):
+            if in_array:
+                raise BulkImportError("JSON array is not closed")
+            return
+        try:
+            obj, end = decoder.raw_decode(buffer, pos)
+        except json.JSONDecodeError as exc:
+            if eof:
+                raise BulkImportError(f"invalid JSON: {exc}") from None
+            chunk = stream.read(JSON_CHUNK_SIZE)
+            eof = not chunk
+            buffer, pos = buffer[pos:] + chunk, 0
+            continue
+        # A value that ends exactly at the buffer edge may be a truncated number
+        if end == len(buffer) and not eof and not isinstance(obj, (dict, list)):
+            chunk = stream.read(JSON_CHUNK_SIZE)
+            eof = not chunk
+            buffer, pos = buffer[pos:] + chunk, 0
+            continue
+        yield obj
+        pos = end
+
+
+def iter_records(stream, fmt):
+    if fmt == "csv":
+        return iter_csv(stream)
+    if fmt == "json":
+        return iter_json(stream)
+    raise BulkImportError(f"unknown format {fmt!r}; expected csv or json")
+
+
+# ==========================================
+# VALIDATION
+# ==========================================
+def _clean(value):
+    return value.strip() if isinstance(value, str) else ("" if value is None else str(value).strip())
+
+
+def validate(kind, record, known_teams):
+    """Return (row parameters, None) for a good record or (None, message) for a bad one."""
+    if not isinstance(record, dict):
+        return None, "expected an object"
+    required, optional = KINDS[kind]
+    values = {}
+    for field in required:
+        value = _clean(record.get(field))
+        if not value:
+            return None, f"missing {field}"
+        values[field] = value
+    for field, default in optional.items():
+        values[field] = _clean(record.get(field)) or default
+    for field, value in values.items():
+        if value is not None and len(value) > MAX_NAME_LENGTH:
+            return None, f"{field} longer than {MAX_NAME_LENGTH} characters"
+
+    if kind == "teams":
+        known_teams.add(values["name"])
+        return (values["name"], values["short_name"]), None
+    if kind == "players":
+        if values["team_name"] not in known_teams:
+            return None, f"unknown team {values['team_name']!r}"
+        return values, None
+
+    team_a, team_b = values["team_a"], values["team_b"]
+    if team_a == team_b:
+        return None, "a team cannot play itself"
+    for team in (team_a, team_b):
+        if team not in known_teams:
+            return None, f"unknown team {team!r}"
+    batting_team = values["batting_team"] or team_a
+    if batting_team not in (team_a, team_b):
+        return None, f"batting_team {batting_team!r} is not playing"
+    return (team_a, team_b, batting_team), None
+
+
+# ==========================================
+# IMPORT
+# ==========================================
+INSERT_SQL = {
+    "teams": "INSERT OR IGNORE INTO teams (name, short_name) VALUES (?, ?)",
+    # Older databases lack UNIQUE(player_name, team_name), so duplicates are skipped by lookup
+    "players": """
+        INSERT INTO players (player_name, team_name)
+        SELECT :player_name, :team_name
+        WHERE NOT EXISTS (SELECT 1 FROM players WHERE player_name = :player_name AND team_name = :team_name)
+    """,
+    "fixtures": "INSERT INTO matches (team_a, team_b, status, batting_team) VALUES (?, ?, 'Scheduled', ?)",
+}
+
+
+def import_stream(kind, stream, fmt="csv", batch_size=BATCH_SIZE):
+    """Import every valid row of a text stream in one transaction; returns an ImportReport."""
+    if kind not in KINDS:
+        raise BulkImportError(f"unknown kind {kind!r}; expected one of {', '.join(KINDS)}")
+    report = ImportReport(kind)
+    insert = INSERT_SQL[kind]
+    squads = set()
+    start = time.perf_counter()
+
+    with transaction() as conn:
+        known_teams = {row[0] for row in conn.execute("SELECT name FROM teams")}
+
+        def valid_rows():
+            for number, record in enumerate(iter_records(stream, fmt), start=1):
+                report.read = number
+                row, problem = validate(kind, record, known_teams)
+                if problem:
+                    report.reject(number, problem)
+                    continue
+                if kind == "players":
+                    squads.add(row["team_name"])
+                yield row
+
+        rows = valid_rows()
+        while True:
+            batch = list(islice(rows, batch_size))
+            if not batch:
+                break
+            # rowcount leaves out trigger writes (trg_matches_number numbers each fixture it inserts)
+            report.inserted += conn.executemany(insert, batch).rowcount
+
+        if kind == "teams":
+            bump_versions(conn, "teams")
+        elif kind == "players":
+            bump_versions(conn, "players", *(squad_scope(team) for team in squads))
+        else:
+            bump_versions(conn, "schedule")
+
+    report.elapsed = time.perf_counter() - start
+    return report
+
+
+def import_file(kind, path, fmt=None, batch_size=BATCH_SIZE):
+    """Import a CSV or JSON file from disk; the format defaults to the file extension."""
+    with open(path, newline="", encoding="utf-8-sig") as stream:
+        return import_stream(kind, stream, fmt or detect_format(path), batch_size)
+
+
+def import_upload(kind, upload, fmt=None):
+    """Import a Streamlit UploadedFile (or any binary file object with a name)."""
+    stream = io.TextIOWrapper(upload, encoding="utf-8-sig", newline="")
+    try:
+        return import_stream(kind, stream, fmt or detect_format(upload.name))
+    finally:
+        stream.detach()
+
+
+# ==========================================
+# COMMAND LINE
+# ==========================================
+def main(argv=None):
+    import argparse
+
+    import cricket_db
+
+    parser = argparse.ArgumentParser(description="Bulk import teams, players or fixtures")
+    parser.add_argument("kind", choices=sorted(KINDS))
+    parser.add_argument("path", help="CSV with a header row, JSON array or JSON Lines file")
+    parser.add_argument("--format", choices=("csv", "json"), help="default: from the file extension")
+    parser.add_argument("--db", default=cricket_db.DB_PATH, help="database file (default: %(default)s)")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    args = parser.parse_args(argv)
+
+    cricket_db.set_db_path(args.db)
+    cricket_db.init_db()
+    try:
+        report = import_file(args.kind, args.path, args.format, args.batch_size)
+    except BulkImportError as exc:
+        parser.exit(1, f"import failed: {exc}\n")
+    finally:
+        cricket_db.close_connections()
+    print(report.summary())
+    for number, message in report.errors:
+        print(f"  row {number}: {message}")
+    if report.invalid > len(report.errors):
+        print(f"  ... and {report.invalid - len(report.errors):,} more invalid rows")
+
+
+if __name__ == "__main__":
+    main()
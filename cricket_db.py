@@ -0,0 +1,1294 @@
+"""Database access layer for CricStream.
+
+Keeps a small bounded pool of long-lived SQLite connections (WAL journal,
+busy timeout, tuned pragmas) so the Streamlit pages, scripts and benchmarks
+stop paying a connect/close cycle on every query. The schema is versioned
+with PRAGMA user_version and only migrated when it is behind.
+"""
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+DB_PATH = 'tournament.db'
+
+POOL_SIZE = 4
+BUSY_TIMEOUT_MS = 5000
+CONNECTION_PRAGMAS = (
+    "PRAGMA journal_mode = WAL",
+    "PRAGMA synchronous = FULL",       # one WAL fsync per commit
+    f"PRAGMA busy_timeout = {BUSY_TIMEOUT_MS}",
+    "PRAGMA cache_size = -16000",      # ~16 MB page cache per connection
+    "PRAGMA temp_store = MEMORY",
+    "PRAGMA mmap_size = 67108864",
+)
+
+
+# ==========================================
+# CONNECTION POOL
+# ==========================================
+class PoolExhausted(sqlite3.OperationalError):
+    """Every pooled connection stayed borrowed for longer than the busy timeout."""
+
+
+class ConnectionPool:
+    """Bounded pool of reusable SQLite connections for one database file."""
+
+    def __init__(self, db_path, size=POOL_SIZE):
+        self.db_path = db_path
+        self.size = size
+        self._idle = queue.LifoQueue(maxsize=size)
+        self._created = 0
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        conn = sqlite3.connect(
+            self.db_path,
+            timeout=BUSY_TIMEOUT_MS / 1000,
+            check_same_thread=False,
+        )
+        for pragma in CONNECTION_PRAGMAS:
+            conn.execute(pragma)
+        return conn
+
+    def acquire(self):
+        """Borrow a connection, opening a new one while under the pool size."""
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            if self._created < self.size:
+                self._created += 1
+                try:
+                    return self._connect()
+                except Exception:
+                    self._created -= 1
+                    raise
+        try:
+            return self._idle.get(timeout=BUSY_TIMEOUT_MS / 1000)
+        except queue.Empty:
+            raise PoolExhausted(
+                f"all {self.size} pooled connections to {self.db_path} stayed in use for "
+                f"{BUSY_TIMEOUT_MS / 1000:g} s; raise the pool size with set_pool_size()"
+            ) from None
+
+    def release(self, conn):
+        """Return a connection, rolling back anything left uncommitted."""
+        if conn.in_transaction:
+            conn.rollback()
+        self._idle.put_nowait(conn)
+
+    def close(self):
+        """Close every idle connection and reset the pool."""
+        with self._lock:
+            while True:
+                try:
+                    self._idle.get_nowait().close()
+                except queue.Empty:
+                    break
+            self._created = 0
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    """Return the process-wide pool for DB_PATH, creating it on first use."""
+    global _pool
+    if _pool is None or _pool.db_path != DB_PATH or _pool.size != POOL_SIZE:
+        with _pool_lock:
+            if _pool is None or _pool.db_path != DB_PATH or _pool.size != POOL_SIZE:
+                if _pool is not None:
+                    _pool.close()
+                _pool = ConnectionPool(DB_PATH, POOL_SIZE)
+    return _pool
+
+
+def set_db_path(db_path):
+    """Point the layer at a different database file (scripts and benchmarks)."""
+    global DB_PATH
+    close_connections()
+    DB_PATH = db_path
+    # The file may have been replaced, so check its schema again
+    _migrated_paths.discard(db_path)
+
+
+def set_pool_size(size):
+    """Size the process-wide pool, e.g. to a server's number of request threads."""
+    global POOL_SIZE
+    if size < 1:
+        raise ValueError("the pool needs at least one connection")
+    close_connections()
+    POOL_SIZE = size
+
+
+def close_connections():
+    """Close all pooled connections."""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.close()
+            _pool = None
+
+
+@contextmanager
+def get_db_connection():
+    """Context manager lending a pooled connection"""
+    pool = get_pool()
+    conn = pool.acquire()
+    try:
+        yield conn
+    finally:
+        pool.release(conn)
+
+
+@contextmanager
+def transaction():
+    """Run a block of statements as one IMMEDIATE transaction and a single commit.
+
+    The write lock is taken up front so reads inside the block see the rows
+    they are about to update; any exception rolls the whole block back.
+    """
+    with get_db_connection() as conn:
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.rollback()
+            raise
+        conn.commit()
+
+
+def fetch_one(conn, query, params=()):
+    """Return the first row of a query as a sqlite3.Row (or None)."""
+    cur = conn.cursor()
+    cur.row_factory = sqlite3.Row
+    return cur.execute(query, params).fetchone()
+
+
+def fetch_all(conn, query, params=()):
+    """Return every row of a query as sqlite3.Row objects."""
+    cur = conn.cursor()
+    cur.row_factory = sqlite3.Row
+    return cur.execute(query, params).fetchall()
+
+
+# ==========================================
+# SCHEMA
+# ==========================================
+# Each migration moves the schema up one PRAGMA user_version. Databases
+# created before versioning report version 0 but may already have some of the
+# changes, so every step is written to be safe to re-apply.
+def _migrate_base_tables(c):
+    """1: teams, players and matches, with the columns added over time."""
+    c.execute('''CREATE TABLE IF NOT EXISTS teams (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        name TEXT UNIQUE,
+        short_name TEXT
+    )''')
+
+    c.execute('''CREATE TABLE IF NOT EXISTS players (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        player_name TEXT,
+        team_name TEXT,
+        UNIQUE(player_name, team_name)
+    )''')
+
+    c.execute("PRAGMA table_info(players)")
+    columns = [col[1] for col in c.fetchall()]
+
+    if 'runs' not in columns:
+        c.execute("ALTER TABLE players ADD COLUMN runs INTEGER DEFAULT 0")
+    if 'balls' not in columns:
+        c.execute("ALTER TABLE players ADD COLUMN balls INTEGER DEFAULT 0")
+    if 'fours' not in columns:
+        c.execute("ALTER TABLE players ADD COLUMN fours INTEGER DEFAULT 0")
+    if 'sixes' not in columns:
+        c.execute("ALTER TABLE players ADD COLUMN sixes INTEGER DEFAULT 0")
+    if 'out_status' not in columns:
+        c.execute("ALTER TABLE players ADD COLUMN out_status TEXT DEFAULT 'Not Out'")
+
+    c.execute('''CREATE TABLE IF NOT EXISTS matches (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        team_a TEXT,
+        team_b TEXT,
+        status TEXT DEFAULT 'Scheduled',
+        team_a_runs INTEGER DEFAULT 0,
+        team_a_wickets INTEGER DEFAULT 0,
+        team_a_overs REAL DEFAULT 0.0,
+        team_b_runs INTEGER DEFAULT 0,
+        team_b_wickets INTEGER DEFAULT 0,
+        team_b_overs REAL DEFAULT 0.0,
+        batting_team TEXT,
+        target INTEGER DEFAULT 0,
+        winner TEXT,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )''')
+
+    c.execute("PRAGMA table_info(matches)")
+    match_columns = [col[1] for col in c.fetchall()]
+    if 'first_innings_team' not in match_columns:
+        c.execute("ALTER TABLE matches ADD COLUMN first_innings_team TEXT")
+    if 'first_innings_runs' not in match_columns:
+        c.execute("ALTER TABLE matches ADD COLUMN first_innings_runs INTEGER DEFAULT 0")
+    if 'created_at' not in match_columns:
+        c.execute("ALTER TABLE matches ADD COLUMN created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP")
+    if 'current_bowler_name' not in match_columns:
+        c.execute("ALTER TABLE matches ADD COLUMN current_bowler_name TEXT")
+    if 'current_bowler_runs' not in match_columns:
+        c.execute("ALTER TABLE matches ADD COLUMN current_bowler_runs INTEGER DEFAULT 0")
+    if 'current_bowler_wickets' not in match_columns:
+        c.execute("ALTER TABLE matches ADD COLUMN current_bowler_wickets INTEGER DEFAULT 0")
+
+
+def _migrate_deliveries(c):
+    """2: append-only ball-by-ball event log."""
+    c.execute('''CREATE TABLE IF NOT EXISTS deliveries (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        match_id INTEGER NOT NULL,
+        innings INTEGER NOT NULL,
+        over_number INTEGER NOT NULL,
+        ball_number INTEGER NOT NULL,
+        batting_team TEXT,
+        striker TEXT,
+        non_striker TEXT,
+        bowler TEXT,
+        runs INTEGER DEFAULT 0,
+        batsman_runs INTEGER DEFAULT 0,
+        extra_runs INTEGER DEFAULT 0,
+        extras_type TEXT,
+        is_legal INTEGER DEFAULT 1,
+        is_wicket INTEGER DEFAULT 0,
+        dismissed_player TEXT,
+        dismissal_type TEXT,
+        dismissal_code TEXT,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )''')
+    c.execute("CREATE INDEX IF NOT EXISTS idx_deliveries_match ON deliveries(match_id, innings, id)")
+
+
+def _migrate_ball_counts(c):
+    """3: REAL overs (15.2) become integer legal-ball counts (92)."""
+    c.execute("PRAGMA table_info(matches)")
+    match_columns = [col[1] for col in c.fetchall()]
+    if 'team_a_balls' not in match_columns:
+        c.execute("ALTER TABLE matches ADD COLUMN team_a_balls INTEGER DEFAULT 0")
+        c.execute("ALTER TABLE matches ADD COLUMN team_b_balls INTEGER DEFAULT 0")
+    if 'team_a_overs' in match_columns:
+        for side in ("team_a", "team_b"):
+            c.execute(
+                f"""
+                UPDATE matches
+                SET {side}_balls = CAST({side}_overs AS INTEGER) * 6
+                    + CAST(ROUND(({side}_overs - CAST({side}_overs AS INTEGER)) * 10) AS INTEGER)
+                WHERE {side}_overs IS NOT NULL
+                """
+            )
+            c.execute(f"ALTER TABLE matches DROP COLUMN {side}_overs")
+
+
+def _migrate_hot_indexes(c):
+    """4: covering indexes for the hot lookups."""
+    # Match ordering needs a concrete timestamp so it can come straight off an index
+    c.execute("UPDATE matches SET created_at = CURRENT_TIMESTAMP WHERE created_at IS NULL")
+
+    # Superseded by the indexes below
+    c.execute("DROP INDEX IF EXISTS idx_players_team")
+    c.execute("DROP INDEX IF EXISTS idx_matches_status")
+    # bench / batting card: team_name = ? AND out_status NOT LIKE 'Out%'
+    c.execute("CREATE INDEX IF NOT EXISTS idx_players_team_status ON players(team_name, out_status, player_name)")
+    # per-ball player updates: player_name = ? AND team_name = ?
+    c.execute("CREATE INDEX IF NOT EXISTS idx_players_name_team ON players(player_name, team_name)")
+    # live / scheduled / completed lists, newest results first
+    c.execute("CREATE INDEX IF NOT EXISTS idx_matches_status_created ON matches(status, created_at, id)")
+    # match numbering in creation order
+    c.execute("CREATE INDEX IF NOT EXISTS idx_matches_created ON matches(created_at, id)")
+
+
+def _migrate_data_versions(c):
+    """5: per-scope write counters that key the app's read cache."""
+    c.execute('''CREATE TABLE IF NOT EXISTS data_versions (
+        scope TEXT PRIMARY KEY,
+        version INTEGER NOT NULL DEFAULT 0
+    ) WITHOUT ROWID''')
+
+
+# Per-innings bowling figures folded from the delivery log; byes and leg byes are not charged to the bowler
+BOWLING_FIGURES_FROM_LOG = """
+    SELECT match_id, innings, bowler,
+           SUM(CASE WHEN extras_type IN ('bye', 'leg_bye') THEN 0 ELSE runs END),
+           SUM(is_legal),
+           SUM(is_wicket)
+    FROM deliveries
+    WHERE bowler IS NOT NULL
+    GROUP BY match_id, innings, bowler
+"""
+
+
+def _migrate_bowling_figures(c):
+    """6: bowling figures per match, innings and bowler, backfilled from the log."""
+    c.execute('''CREATE TABLE IF NOT EXISTS bowling_figures (
+        match_id INTEGER NOT NULL,
+        innings INTEGER NOT NULL,
+        bowler TEXT NOT NULL,
+        runs INTEGER NOT NULL DEFAULT 0,
+        balls INTEGER NOT NULL DEFAULT 0,
+        wickets INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY (match_id, innings, bowler)
+    ) WITHOUT ROWID''')
+    # bowling card, best figures first
+    c.execute(
+        "CREATE INDEX IF NOT EXISTS idx_bowling_figures_card "
+        "ON bowling_figures(match_id, innings, wickets DESC, runs, balls)"
+    )
+    c.execute(
+        "INSERT OR IGNORE INTO bowling_figures (match_id, innings, bowler, runs, balls, wickets)"
+        + BOWLING_FIGURES_FROM_LOG
+    )
+
+
+# One row per batter per match folded from the delivery log, as record_delivery writes them
+PLAYER_INNINGS_FROM_LOG = """
+    SELECT match_id, team_name, player_name, SUM(runs), SUM(balls), SUM(fours), SUM(sixes),
+           COALESCE(MAX(out_status), 'Not Out')
+    FROM (
+        SELECT match_id, batting_team AS team_name, striker AS player_name, batsman_runs AS runs,
+               is_legal AS balls, batsman_runs = 4 AS fours, batsman_runs = 6 AS sixes, NULL AS out_status
+        FROM deliveries
+        WHERE striker IS NOT NULL
+        UNION ALL
+        SELECT match_id, batting_team, dismissed_player, 0, 0, 0, 0,
+               'Out' || COALESCE(' (' || dismissal_code || ')', '')
+        FROM deliveries
+        WHERE is_wicket = 1 AND dismissed_player IS NOT NULL
+    )
+    GROUP BY match_id, team_name, player_name
+"""
+
+# Career rows summed over every completed match's player_innings
+PLAYER_CAREER_FROM_INNINGS = """
+    SELECT pi.team_name, pi.player_name, COUNT(*),
+           SUM(pi.balls > 0 OR pi.out_status != 'Not Out'),
+           SUM(pi.runs), SUM(pi.balls), SUM(pi.fours), SUM(pi.sixes),
+           SUM(pi.out_status != 'Not Out')
+    FROM player_innings pi
+    JOIN matches m ON m.id = pi.match_id
+    WHERE m.status = 'Completed'
+    GROUP BY pi.team_name, pi.player_name
+"""
+
+
+def _migrate_player_history(c):
+    """7: per-match player innings and career totals, backfilled from the log."""
+    c.execute('''CREATE TABLE IF NOT EXISTS player_innings (
+        match_id INTEGER NOT NULL,
+        team_name TEXT NOT NULL,
+        player_name TEXT NOT NULL,
+        runs INTEGER NOT NULL DEFAULT 0,
+        balls INTEGER NOT NULL DEFAULT 0,
+        fours INTEGER NOT NULL DEFAULT 0,
+        sixes INTEGER NOT NULL DEFAULT 0,
+        out_status TEXT NOT NULL DEFAULT 'Not Out',
+        PRIMARY KEY (match_id, team_name, player_name)
+    ) WITHOUT ROWID''')
+    c.execute('''CREATE TABLE IF NOT EXISTS player_career (
+        team_name TEXT NOT NULL,
+        player_name TEXT NOT NULL,
+        matches INTEGER NOT NULL DEFAULT 0,
+        innings INTEGER NOT NULL DEFAULT 0,
+        runs INTEGER NOT NULL DEFAULT 0,
+        balls INTEGER NOT NULL DEFAULT 0,
+        fours INTEGER NOT NULL DEFAULT 0,
+        sixes INTEGER NOT NULL DEFAULT 0,
+        outs INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY (team_name, player_name)
+    ) WITHOUT ROWID''')
+    # run-scorer leaderboard
+    c.execute("CREATE INDEX IF NOT EXISTS idx_player_career_runs ON player_career(runs DESC, balls)")
+    c.execute(
+        "INSERT OR IGNORE INTO player_innings "
+        "(match_id, team_name, player_name, runs, balls, fours, sixes, out_status)"
+        + PLAYER_INNINGS_FROM_LOG
+    )
+    c.execute(
+        "INSERT OR IGNORE INTO player_career "
+        "(team_name, player_name, matches, innings, runs, balls, fours, sixes, outs)"
+        + PLAYER_CAREER_FROM_INNINGS
+    )
+
+
+# Each completed match seen from both sides; a winner of 'Draw' (or none) is a tie
+STANDINGS_FROM_MATCHES = """
+    WITH completed_sides (team_name, won, drawn, runs_for, balls_for, runs_against, balls_against) AS (
+        SELECT team_a, winner IS team_a, winner IS NULL OR winner = 'Draw',
+               team_a_runs, team_a_balls, team_b_runs, team_b_balls
+        FROM matches
+        WHERE status = 'Completed'
+        UNION ALL
+        SELECT team_b, winner IS team_b, winner IS NULL OR winner = 'Draw',
+               team_b_runs, team_b_balls, team_a_runs, team_a_balls
+        FROM matches
+        WHERE status = 'Completed'
+    )
+    INSERT INTO standings (
+        team_name, played, won, lost, drawn, points, runs_for, balls_for, runs_against, balls_against
+    )
+    SELECT team_name, COUNT(*), SUM(won), SUM(1 - won - drawn), SUM(drawn), SUM(2 * won + drawn),
+           SUM(runs_for), SUM(balls_for), SUM(runs_against), SUM(balls_against)
+    FROM completed_sides
+    GROUP BY team_name
+"""
+
+
+def _migrate_standings(c):
+    """8: points table with exact net run rate, built from completed matches."""
+    c.execute('''CREATE TABLE IF NOT EXISTS standings (
+        team_name TEXT PRIMARY KEY,
+        played INTEGER NOT NULL DEFAULT 0,
+        won INTEGER NOT NULL DEFAULT 0,
+        lost INTEGER NOT NULL DEFAULT 0,
+        drawn INTEGER NOT NULL DEFAULT 0,
+        points INTEGER NOT NULL DEFAULT 0,
+        runs_for INTEGER NOT NULL DEFAULT 0,
+        balls_for INTEGER NOT NULL DEFAULT 0,
+        runs_against INTEGER NOT NULL DEFAULT 0,
+        balls_against INTEGER NOT NULL DEFAULT 0,
+        nrr REAL GENERATED ALWAYS AS (
+            CASE WHEN balls_for > 0 AND balls_against > 0
+                 THEN 6.0 * runs_for / balls_for - 6.0 * runs_against / balls_against
+                 ELSE 0.0 END
+        ) VIRTUAL
+    ) WITHOUT ROWID''')
+    # points table order
+    c.execute("CREATE INDEX IF NOT EXISTS idx_standings_table ON standings(points DESC, nrr DESC, team_name)")
+    c.execute("DELETE FROM standings")
+    c.execute(STANDINGS_FROM_MATCHES)
+
+
+def _migrate_archive_indexes(c):
+    """9: per-team indexes for the keyset-paginated results archive."""
+    # one team's matches of one status, newest first, walked from both sides of the fixture
+    c.execute("CREATE INDEX IF NOT EXISTS idx_matches_team_a_archive ON matches(team_a, status, created_at, id)")
+    c.execute("CREATE INDEX IF NOT EXISTS idx_matches_team_b_archive ON matches(team_b, status, created_at, id)")
+
+
+def _migrate_match_numbers(c):
+    """10: stored "Match #N" sequence numbers, assigned on insert and backfilled."""
+    c.execute("PRAGMA table_info(matches)")
+    if 'match_number' not in [col[1] for col in c.fetchall()]:
+        c.execute("ALTER TABLE matches ADD COLUMN match_number INTEGER")
+    c.execute(
+        """
+        WITH numbered AS (
+            SELECT id,
+                   (SELECT COALESCE(MAX(match_number), 0) FROM matches)
+                   + ROW_NUMBER() OVER (ORDER BY created_at, id) AS match_number
+            FROM matches
+            WHERE match_number IS NULL
+        )
+        UPDATE matches
+        SET match_number = numbered.match_number
+        FROM numbered
+        WHERE matches.id = numbered.id
+        """
+    )
+    c.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_matches_number ON matches(match_number)")
+    # Every insert path gets the next number inside its own statement; MAX comes off the index
+    c.execute(
+        """
+        CREATE TRIGGER IF NOT EXISTS trg_matches_number
+        AFTER INSERT ON matches
+        WHEN NEW.match_number IS NULL
+        BEGIN
+            UPDATE matches
+            SET match_number = (SELECT COALESCE(MAX(match_number), 0) + 1 FROM matches)
+            WHERE id = NEW.id;
+        END
+        """
+    )
+
+
+# deliveries.extras_type -> suffix of the matches column counting those runs for each batting side
+EXTRAS_COLUMNS = {"wide": "wides", "no_ball": "no_balls", "bye": "byes", "leg_bye": "leg_byes"}
+
+# Per-side extras from the delivery log, for matches that have one
+EXTRAS_FROM_LOG = """
+    WITH extras AS (
+        SELECT d.match_id,
+               SUM(CASE WHEN d.batting_team = m.team_a AND d.extras_type = 'wide' THEN d.extra_runs ELSE 0 END) AS a_wides,
+               SUM(CASE WHEN d.batting_team = m.team_a AND d.extras_type = 'no_ball' THEN d.extra_runs ELSE 0 END) AS a_no_balls,
+               SUM(CASE WHEN d.batting_team = m.team_a AND d.extras_type = 'bye' THEN d.extra_runs ELSE 0 END) AS a_byes,
+               SUM(CASE WHEN d.batting_team = m.team_a AND d.extras_type = 'leg_bye' THEN d.extra_runs ELSE 0 END) AS a_leg_byes,
+               SUM(CASE WHEN d.batting_team = m.team_b AND d.extras_type = 'wide' THEN d.extra_runs ELSE 0 END) AS b_wides,
+               SUM(CASE WHEN d.batting_team = m.team_b AND d.extras_type = 'no_ball' THEN d.extra_runs ELSE 0 END) AS b_no_balls,
+               SUM(CASE WHEN d.batting_team = m.team_b AND d.extras_type = 'bye' THEN d.extra_runs ELSE 0 END) AS b_byes,
+               SUM(CASE WHEN d.batting_team = m.team_b AND d.extras_type = 'leg_bye' THEN d.extra_runs ELSE 0 END) AS b_leg_byes
+        FROM deliveries d
+        JOIN matches m ON m.id = d.match_id
+        GROUP BY d.match_id
+    )
+    UPDATE matches
+    SET team_a_wides = extras.a_wides,
+        team_a_no_balls = extras.a_no_balls,
+        team_a_byes = extras.a_byes,
+        team_a_leg_byes = extras.a_leg_byes,
+        team_b_wides = extras.b_wides,
+        team_b_no_balls = extras.b_no_balls,
+        team_b_byes = extras.b_byes,
+        team_b_leg_byes = extras.b_leg_byes
+    FROM extras
+    WHERE matches.id = extras.match_id
+"""
+
+
+def _migrate_extras(c):
+    """11: per-side extras counters on matches, split by kind and backfilled from the log."""
+    c.execute("PRAGMA table_info(matches)")
+    match_columns = [col[1] for col in c.fetchall()]
+    for side in ("team_a", "team_b"):
+        for suffix in EXTRAS_COLUMNS.values():
+            if f"{side}_{suffix}" not in match_columns:
+                c.execute(f"ALTER TABLE matches ADD COLUMN {side}_{suffix} INTEGER NOT NULL DEFAULT 0")
+    c.execute(EXTRAS_FROM_LOG)
+
+
+def _migrate_commentary(c):
+    """12: the commentary line of each logged ball, backfilled as the scorer would have written it."""
+    c.execute("PRAGMA table_info(deliveries)")
+    if 'commentary' not in [col[1] for col in c.fetchall()]:
+        c.execute("ALTER TABLE deliveries ADD COLUMN commentary TEXT")
+    # Delivery.describe() in SQL; a non-wicket no ball kept no dismissal_type, so its label comes from extras_type
+    c.execute(
+        """
+        UPDATE deliveries
+        SET commentary = COALESCE(striker, 'Team') || ' → ' || runs
+            || CASE WHEN is_wicket = 1 THEN ' W' ELSE '' END
+            || CASE WHEN is_legal = 0 THEN ' (extra)' ELSE '' END
+            || CASE WHEN dismissal_type IS NOT NULL THEN ' [' || dismissal_type || ']'
+                    WHEN extras_type = 'no_ball' THEN ' [No Ball]'
+                    ELSE '' END
+        WHERE commentary IS NULL
+        """
+    )
+
+
+def _migrate_match_versions(c):
+    """13: a per-match row version for optimistic concurrency between consoles."""
+    c.execute("PRAGMA table_info(matches)")
+    if 'version' not in [col[1] for col in c.fetchall()]:
+        c.execute("ALTER TABLE matches ADD COLUMN version INTEGER NOT NULL DEFAULT 0")
+    # Any write that leaves the version alone advances it, so every writer is seen
+    c.execute(
+        """
+        CREATE TRIGGER IF NOT EXISTS trg_matches_version
+        AFTER UPDATE ON matches
+        WHEN NEW.version = OLD.version
+        BEGIN
+            UPDATE matches SET version = OLD.version + 1 WHERE id = NEW.id;
+        END
+        """
+    )
+
+
+# Append only: a migration's position is its schema version
+MIGRATIONS = [
+    _migrate_base_tables,
+    _migrate_deliveries,
+    _migrate_ball_counts,
+    _migrate_hot_indexes,
+    _migrate_data_versions,
+    _migrate_bowling_figures,
+    _migrate_player_history,
+    _migrate_standings,
+    _migrate_archive_indexes,
+    _migrate_match_numbers,
+    _migrate_extras,
+    _migrate_commentary,
+    _migrate_match_versions,
+]
+SCHEMA_VERSION = len(MIGRATIONS)
+
+_migrated_paths = set()
+
+
+def schema_version(conn):
+    """Return the PRAGMA user_version recorded in a database."""
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def init_db():
+    """Bring the database up to SCHEMA_VERSION.
+
+    Once a file has been checked in this process the call returns without
+    touching SQLite, so Streamlit reruns pay nothing; otherwise a single
+    PRAGMA read decides whether any migration needs to run.
+    """
+    if DB_PATH in _migrated_paths:
+        return
+    with get_db_connection() as conn:
+        if schema_version(conn) < SCHEMA_VERSION:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                # Another process may have migrated while we waited for the lock
+                version = schema_version(conn)
+                c = conn.cursor()
+                for number in range(version + 1, SCHEMA_VERSION + 1):
+                    MIGRATIONS[number - 1](c)
+                    c.execute(f"PRAGMA user_version = {number}")
+            except BaseException:
+                conn.rollback()
+                raise
+            conn.commit()
+    _migrated_paths.add(DB_PATH)
+
+
+# ==========================================
+# DATA VERSIONS
+# ==========================================
+# Cached reads are keyed on the version of every scope they depend on, and
+# writes bump the scopes they change in the same transaction, so one ball in
+# one match only invalidates that match's entries. Scopes:
+#   all           - every cached read (resets, demo data, rebuilds)
+#   teams         - the teams table
+#   players       - squad membership across all teams
+#   squad:<team>  - one team's player rows, stats included
+#   schedule      - which matches exist, their status, winner and order
+#   live          - scoreboards of live matches (live lists and counts)
+#   match:<id>    - one match's scoreboard, bowling figures and player innings
+#   career        - player_career totals
+#   standings     - the points table
+ALL_SCOPE = "all"
+
+
+def match_scope(match_id):
+    return f"match:{int(match_id)}"
+
+
+def squad_scope(team_name):
+    return f"squad:{team_name}"
+
+
+def bump_versions(conn, *scopes):
+    """Advance the version of each scope inside the caller's transaction."""
+    conn.executemany(
+        """
+        INSERT INTO data_versions (scope, version) VALUES (?, 1)
+        ON CONFLICT(scope) DO UPDATE SET version = version + 1
+        """,
+        [(scope,) for scope in dict.fromkeys(scopes)],
+    )
+
+
+def read_versions(conn, scopes):
+    """Return the current version of `all` followed by each scope (0 if never written)."""
+    scopes = (ALL_SCOPE,) + tuple(scopes)
+    placeholders = ", ".join("?" for _ in scopes)
+    found = dict(conn.execute(
+        f"SELECT scope, version FROM data_versions WHERE scope IN ({placeholders})",
+        scopes,
+    ).fetchall())
+    return tuple(found.get(scope, 0) for scope in scopes)
+
+
+# ==========================================
+# MATCH VERSIONS
+# ==========================================
+# Every write to a matches row advances matches.version (trg_matches_version).
+# A console remembers the version its live fields (striker, bowler, undo
+# history) were built on and passes it back as `expected_version`; the write
+# then compare-and-sets the version first and is refused with MatchConflict
+# if anyone else wrote the match in between.
+class MatchConflict(Exception):
+    """The match changed since the version the writer last saw."""
+
+    def __init__(self, match_id, expected, actual):
+        super().__init__(f"match {match_id} is at version {actual}, not {expected}")
+        self.match_id = match_id
+        self.expected = expected
+        self.actual = actual
+
+
+def claim_match(conn, match_id, expected_version):
+    """Compare-and-set the match version inside the caller's transaction.
+
+    Raises MatchConflict (rolling the transaction back) unless the match is
+    still at `expected_version`; None skips the check.
+    """
+    if expected_version is None:
+        return
+    cur = conn.execute(
+        "UPDATE matches SET version = version + 1 WHERE id = ? AND version = ?",
+        (match_id, expected_version),
+    )
+    if cur.rowcount == 0:
+        raise MatchConflict(match_id, expected_version, match_version(conn, match_id))
+
+
+def match_version(conn, match_id):
+    """The match's current version, or None when it does not exist."""
+    row = conn.execute("SELECT version FROM matches WHERE id = ?", (match_id,)).fetchone()
+    return row[0] if row else None
+
+
+def update_match(match_id, query, params=(), expected_version=None, scopes=()):
+    """run_query for one match's row, guarded by claim_match; returns the new version."""
+    with transaction() as conn:
+        claim_match(conn, match_id, expected_version)
+        conn.execute(query, params)
+        if scopes:
+            bump_versions(conn, *scopes)
+        return match_version(conn, match_id)
+
+
+# ==========================================
+# WRITE HELPERS
+# ==========================================
+def run_query(query, params=(), scopes=()):
+    """Execute a query without returning results, bumping the scopes it changes"""
+    with get_db_connection() as conn:
+        c = conn.cursor()
+        c.execute(query, params)
+        if scopes:
+            bump_versions(conn, *scopes)
+        conn.commit()
+
+
+def clear_tournament(conn):
+    """Delete every match, team, player, delivery and aggregate inside the caller's transaction.
+
+    The caller bumps ALL_SCOPE once its own writes are done.
+    """
+    conn.execute("DELETE FROM deliveries")
+    conn.execute("DELETE FROM bowling_figures")
+    conn.execute("DELETE FROM player_innings")
+    conn.execute("DELETE FROM player_career")
+    conn.execute("DELETE FROM standings")
+    conn.execute("DELETE FROM matches")
+    conn.execute("DELETE FROM players")
+    conn.execute("DELETE FROM teams")
+
+
+def reset_team_player_stats(team_name):
+    """Reset player scorecard stats for a team."""
+    run_query(
+        """
+        UPDATE players
+        SET runs = 0, balls = 0, fours = 0, sixes = 0, out_status = 'Not Out'
+        WHERE team_name = ?
+        """,
+        (team_name,),
+        scopes=(squad_scope(team_name),),
+    )
+
+
+def reset_match_state(match_id, batting_team, expected_version=None, status=None):
+    """Clear match scoreboard, first-innings metadata, the match's delivery log and figures.
+
+    Player innings are cleared back to a zero row for every squad member, and
+    a completed match is taken out of the career totals first. A `status`
+    (Go Live passes 'Live') is set in the same guarded write. Returns the
+    match's new version.
+    """
+    with transaction() as conn:
+        claim_match(conn, match_id, expected_version)
+        bump_versions(conn, match_scope(match_id), "live", "schedule")
+        row = conn.execute("SELECT status FROM matches WHERE id = ?", (match_id,)).fetchone()
+        if row is not None and row[0] == "Completed":
+            fold_result(conn, match_id, -1)
+        conn.execute("DELETE FROM deliveries WHERE match_id = ?", (match_id,))
+        conn.execute("DELETE FROM bowling_figures WHERE match_id = ?", (match_id,))
+        conn.execute("DELETE FROM player_innings WHERE match_id = ?", (match_id,))
+        conn.execute(
+            """
+            INSERT INTO player_innings (match_id, team_name, player_name)
+            SELECT m.id, p.team_name, p.player_name
+            FROM matches m
+            JOIN players p ON p.team_name IN (m.team_a, m.team_b)
+            WHERE m.id = ?
+            """,
+            (match_id,),
+        )
+        conn.execute(
+            """
+            UPDATE matches
+            SET team_a_runs = 0,
+                team_a_wickets = 0,
+                team_a_balls = 0,
+                team_b_runs = 0,
+                team_b_wickets = 0,
+                team_b_balls = 0,
+                team_a_wides = 0,
+                team_a_no_balls = 0,
+                team_a_byes = 0,
+                team_a_leg_byes = 0,
+                team_b_wides = 0,
+                team_b_no_balls = 0,
+                team_b_byes = 0,
+                team_b_leg_byes = 0,
+                batting_team = ?,
+                target = 0,
+                winner = NULL,
+                first_innings_team = NULL,
+                first_innings_runs = 0,
+                current_bowler_name = NULL,
+                current_bowler_runs = 0,
+                current_bowler_wickets = 0,
+                status = COALESCE(?, status)
+            WHERE id = ?
+            """,
+            (batting_team, status, match_id),
+        )
+        return match_version(conn, match_id)
+
+
+def complete_match(match_id, winner, expected_version=None):
+    """Mark a match Completed, clear its bowler and fold it into the career totals and standings.
+
+    Does nothing for a match that is already completed, so a repeated click
+    never counts a match twice. Returns True when the match was closed.
+    """
+    with transaction() as conn:
+        claim_match(conn, match_id, expected_version)
+        changes_before = conn.total_changes
+        conn.execute(
+            """
+            UPDATE matches
+            SET status = 'Completed',
+                winner = ?,
+                current_bowler_name = NULL,
+                current_bowler_runs = 0,
+                current_bowler_wickets = 0
+            WHERE id = ? AND status != 'Completed'
+            """,
+            (winner, match_id),
+        )
+        if conn.total_changes == changes_before:
+            return False
+        fold_result(conn, match_id)
+        bump_versions(conn, match_scope(match_id), "live", "schedule")
+    return True
+
+
+# ==========================================
+# DELIVERY LOG & MATERIALIZED AGGREGATES
+# ==========================================
+def out_status_text(dismissal_code):
+    """Scorecard status for a dismissed batter, e.g. 'Out (C)'."""
+    return f"Out ({dismissal_code})" if dismissal_code else "Out"
+
+
+def extras_split(extras_type, extra_runs):
+    """(wides, no_balls, byes, leg_byes) one delivery adds to its side's extras."""
+    return tuple(extra_runs if extras_type == kind else 0 for kind in EXTRAS_COLUMNS)
+
+
+def record_delivery(conn, delivery, prefix):
+    """Append one ball to the log and fold it into the materialized aggregates.
+
+    `delivery` holds the deliveries columns; `prefix` is the batting side's
+    column prefix on matches ("team_a" or "team_b"). Runs inside the caller's
+    transaction, bumps the match, live and batting-squad scopes and returns
+    the new delivery id.
+    """
+    bump_versions(conn, match_scope(delivery["match_id"]), "live", squad_scope(delivery["batting_team"]))
+    cur = conn.execute(
+        """
+        INSERT INTO deliveries (
+            match_id, innings, over_number, ball_number, batting_team,
+            striker, non_striker, bowler, runs, batsman_runs, extra_runs,
+            extras_type, is_legal, is_wicket, dismissed_player,
+            dismissal_type, dismissal_code, commentary
+        )
+        VALUES (
+            :match_id, :innings, :over_number, :ball_number, :batting_team,
+            :striker, :non_striker, :bowler, :runs, :batsman_runs, :extra_runs,
+            :extras_type, :is_legal, :is_wicket, :dismissed_player,
+            :dismissal_type, :dismissal_code, :commentary
+        )
+        """,
+        delivery,
+    )
+
+    conn.execute(
+        f"UPDATE matches SET {prefix}_runs = {prefix}_runs + ?, {prefix}_wickets = {prefix}_wickets + ?, "
+        f"{prefix}_balls = {prefix}_balls + ?, {prefix}_wides = {prefix}_wides + ?, "
+        f"{prefix}_no_balls = {prefix}_no_balls + ?, {prefix}_byes = {prefix}_byes + ?, "
+        f"{prefix}_leg_byes = {prefix}_leg_byes + ?, version = version + 1 WHERE id = ?",
+        (delivery["runs"], delivery["is_wicket"], delivery["is_legal"])
+        + extras_split(delivery["extras_type"], delivery["extra_runs"])
+        + (delivery["match_id"],),
+    )
+
+    batsman_runs = delivery["batsman_runs"]
+    if delivery["striker"] and (batsman_runs or delivery["is_legal"]):
+        batting = (
+            batsman_runs,
+            delivery["is_legal"],
+            1 if batsman_runs == 4 else 0,
+            1 if batsman_runs == 6 else 0,
+            delivery["striker"],
+            delivery["batting_team"],
+        )
+        conn.execute(
+            """
+            UPDATE players
+            SET runs = runs + ?, balls = balls + ?, fours = fours + ?, sixes = sixes + ?
+            WHERE player_name = ? AND team_name = ?
+            """,
+            batting,
+        )
+        conn.execute(
+            """
+            INSERT INTO player_innings (runs, balls, fours, sixes, player_name, team_name, match_id)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(match_id, team_name, player_name) DO UPDATE
+            SET runs = runs + excluded.runs, balls = balls + excluded.balls,
+                fours = fours + excluded.fours, sixes = sixes + excluded.sixes
+            """,
+            batting + (delivery["match_id"],),
+        )
+    if delivery["is_wicket"] and delivery["dismissed_player"]:
+        dismissal = (
+            out_status_text(delivery["dismissal_code"]),
+            delivery["dismissed_player"],
+            delivery["batting_team"],
+        )
+        conn.execute(
+            "UPDATE players SET out_status = ? WHERE player_name = ? AND team_name = ?",
+            dismissal,
+        )
+        conn.execute(
+            """
+            INSERT INTO player_innings (out_status, player_name, team_name, match_id)
+            VALUES (?, ?, ?, ?)
+            ON CONFLICT(match_id, team_name, player_name) DO UPDATE SET out_status = excluded.out_status
+            """,
+            dismissal + (delivery["match_id"],),
+        )
+    if delivery["bowler"]:
+        conn.execute(
+            """
+            INSERT INTO bowling_figures (match_id, innings, bowler, runs, balls, wickets)
+            VALUES (?, ?, ?, ?, ?, ?)
+            ON CONFLICT(match_id, innings, bowler) DO UPDATE
+            SET runs = runs + excluded.runs, balls = balls + excluded.balls, wickets = wickets + excluded.wickets
+            """,
+            (
+                delivery["match_id"],
+                delivery["innings"],
+                delivery["bowler"],
+                0 if delivery["extras_type"] in ("bye", "leg_bye") else delivery["runs"],
+                delivery["is_legal"],
+                delivery["is_wicket"],
+            ),
+        )
+    return cur.lastrowid
+
+
+# Adds (sign 1) or removes (sign -1) one match's player innings in player_career
+CAREER_FOLD_SQL = """
+    INSERT INTO player_career (team_name, player_name, matches, innings, runs, balls, fours, sixes, outs)
+    SELECT team_name, player_name, :sign, :sign * (balls > 0 OR out_status != 'Not Out'),
+           :sign * runs, :sign * balls, :sign * fours, :sign * sixes, :sign * (out_status != 'Not Out')
+    FROM player_innings
+    WHERE match_id = :match_id
+    ON CONFLICT(team_name, player_name) DO UPDATE
+    SET matches = matches + excluded.matches, innings = innings + excluded.innings,
+        runs = runs + excluded.runs, balls = balls + excluded.balls, fours = fours + excluded.fours,
+        sixes = sixes + excluded.sixes, outs = outs + excluded.outs
+"""
+
+
+# Adds (sign 1) or removes (sign -1) one completed match in the standings, both sides at once.
+# Reads the match's final totals and winner, so it runs after the result is written.
+STANDINGS_FOLD_SQL = """
+    WITH sides (team_name, won, drawn, runs_for, balls_for, runs_against, balls_against) AS (
+        SELECT team_a, winner IS team_a, winner IS NULL OR winner = 'Draw',
+               team_a_runs, team_a_balls, team_b_runs, team_b_balls
+        FROM matches
+        WHERE id = :match_id
+        UNION ALL
+        SELECT team_b, winner IS team_b, winner IS NULL OR winner = 'Draw',
+               team_b_runs, team_b_balls, team_a_runs, team_a_balls
+        FROM matches
+        WHERE id = :match_id
+    )
+    INSERT INTO standings (
+        team_name, played, won, lost, drawn, points, runs_for, balls_for, runs_against, balls_against
+    )
+    SELECT team_name, :sign, :sign * won, :sign * (1 - won - drawn), :sign * drawn,
+           :sign * (2 * won + drawn), :sign * runs_for, :sign * balls_for,
+           :sign * runs_against, :sign * balls_against
+    FROM sides
+    WHERE true
+    ON CONFLICT(team_name) DO UPDATE
+    SET played = played + excluded.played, won = won + excluded.won, lost = lost + excluded.lost,
+        drawn = drawn + excluded.drawn, points = points + excluded.points,
+        runs_for = runs_for + excluded.runs_for, balls_for = balls_for + excluded.balls_for,
+        runs_against = runs_against + excluded.runs_against,
+        balls_against = balls_against + excluded.balls_against
+"""
+
+# What completing a match folds in, each statement taking {"sign", "match_id"}
+RESULT_FOLDS = (CAREER_FOLD_SQL, STANDINGS_FOLD_SQL)
+RESULT_SCOPES = ("career", "standings")
+
+
+def fold_result(conn, match_id, sign=1):
+    """Apply (or with sign=-1 take back) a completed match inside the caller's transaction."""
+    params = {"sign": sign, "match_id": match_id}
+    for query in RESULT_FOLDS:
+        conn.execute(query, params)
+    bump_versions(conn, *RESULT_SCOPES)
+
+
+def rows_changed(conn):
+    """Rows the connection's last statement wrote itself, leaving out trigger writes.
+
+    cursor.rowcount is -1 for statements that open with WITH, and
+    total_changes also counts what triggers such as trg_matches_version write.
+    """
+    return conn.execute("SELECT changes()").fetchone()[0]
+
+
+def rebuild_standings(conn):
+    """Recompute the points table from every completed match; returns the number of teams."""
+    conn.execute("DELETE FROM standings")
+    conn.execute(STANDINGS_FROM_MATCHES)
+    teams = rows_changed(conn)
+    bump_versions(conn, "standings")
+    return teams
+
+
+def save_transition(conn, transition):
+    """Persist a scoring_engine Transition inside the caller's transaction.
+
+    Logs the ball (if any) through record_delivery, runs the follow-up writes
+    in order and bumps any extra cache scopes. Returns the new delivery id,
+    or None when the transition logged no ball.
+    """
+    delivery_id = None
+    if transition.delivery is not None:
+        delivery_id = record_delivery(conn, transition.delivery, transition.prefix)
+    for query, params in transition.writes:
+        conn.execute(query, params)
+    if transition.scopes:
+        bump_versions(conn, *transition.scopes)
+    return delivery_id
+
+
+def rebuild_aggregates(conn):
+    """Recompute scoreboards and player counters from the delivery log.
+
+    Set-based: one grouped pass over deliveries per aggregate. Matches without
+    logged deliveries keep their stored totals. Player counters hold a team's
+    most recent match, so they are rebuilt from the latest logged match of
+    each batting team; bowling figures and player innings are rebuilt for
+    every logged match, and career totals and standings from every
+    completed match. Invalidates every cached read. Returns
+    (matches_rebuilt, players_rebuilt).
+    """
+    conn.execute(
+        """
+        WITH agg AS (
+            SELECT d.match_id,
+                   SUM(CASE WHEN d.batting_team = m.team_a THEN d.runs ELSE 0 END) AS a_runs,
+                   SUM(CASE WHEN d.batting_team = m.team_a THEN d.is_wicket ELSE 0 END) AS a_wickets,
+                   SUM(CASE WHEN d.batting_team = m.team_a THEN d.is_legal ELSE 0 END) AS a_balls,
+                   SUM(CASE WHEN d.batting_team = m.team_b THEN d.runs ELSE 0 END) AS b_runs,
+                   SUM(CASE WHEN d.batting_team = m.team_b THEN d.is_wicket ELSE 0 END) AS b_wickets,
+                   SUM(CASE WHEN d.batting_team = m.team_b THEN d.is_legal ELSE 0 END) AS b_balls
+            FROM deliveries d
+            JOIN matches m ON m.id = d.match_id
+            GROUP BY d.match_id
+        )
+        UPDATE matches
+        SET team_a_runs = agg.a_runs,
+            team_a_wickets = agg.a_wickets,
+            team_a_balls = agg.a_balls,
+            team_b_runs = agg.b_runs,
+            team_b_wickets = agg.b_wickets,
+            team_b_balls = agg.b_balls
+        FROM agg
+        WHERE matches.id = agg.match_id
+        """
+    )
+    matches_rebuilt = rows_changed(conn)
+    conn.execute(EXTRAS_FROM_LOG)
+
+    latest_cte = """
+        WITH latest AS (
+            SELECT batting_team AS team_name, MAX(match_id) AS match_id
+            FROM deliveries
+            GROUP BY batting_team
+        )
+    """
+    conn.execute(
+        latest_cte + """
+        UPDATE players
+        SET runs = 0, balls = 0, fours = 0, sixes = 0, out_status = 'Not Out'
+        WHERE team_name IN (SELECT team_name FROM latest)
+        """
+    )
+    players_rebuilt = rows_changed(conn)
+    conn.execute(
+        latest_cte + """
+        , batting AS (
+            SELECT d.batting_team AS team_name,
+                   d.striker AS player_name,
+                   SUM(d.batsman_runs) AS runs,
+                   SUM(d.is_legal) AS balls,
+                   SUM(d.batsman_runs = 4) AS fours,
+                   SUM(d.batsman_runs = 6) AS sixes
+            FROM deliveries d
+            JOIN latest l ON l.team_name = d.batting_team AND l.match_id = d.match_id
+            WHERE d.striker IS NOT NULL
+            GROUP BY d.batting_team, d.striker
+        )
+        UPDATE players
+        SET runs = batting.runs, balls = batting.balls, fours = batting.fours, sixes = batting.sixes
+        FROM batting
+        WHERE players.team_name = batting.team_name AND players.player_name = batting.player_name
+        """
+    )
+    conn.execute(
+        latest_cte + """
+        , dismissals AS (
+            SELECT d.batting_team AS team_name,
+                   d.dismissed_player AS player_name,
+                   'Out' || COALESCE(' (' || MAX(d.dismissal_code) || ')', '') AS out_status
+            FROM deliveries d
+            JOIN latest l ON l.team_name = d.batting_team AND l.match_id = d.match_id
+            WHERE d.is_wicket = 1 AND d.dismissed_player IS NOT NULL
+            GROUP BY d.batting_team, d.dismissed_player
+        )
+        UPDATE players
+        SET out_status = dismissals.out_status
+        FROM dismissals
+        WHERE players.team_name = dismissals.team_name AND players.player_name = dismissals.player_name
+        """
+    )
+    conn.execute("DELETE FROM bowling_figures WHERE match_id IN (SELECT match_id FROM deliveries)")
+    conn.execute(
+        "INSERT INTO bowling_figures (match_id, innings, bowler, runs, balls, wickets)"
+        + BOWLING_FIGURES_FROM_LOG
+    )
+    conn.execute(
+        """
+        UPDATE player_innings
+        SET runs = 0, balls = 0, fours = 0, sixes = 0, out_status = 'Not Out'
+        WHERE match_id IN (SELECT match_id FROM deliveries)
+        """
+    )
+    conn.execute(
+        "INSERT INTO player_innings (match_id, team_name, player_name, runs, balls, fours, sixes, out_status)"
+        + PLAYER_INNINGS_FROM_LOG
+        + """
+        ON CONFLICT(match_id, team_name, player_name) DO UPDATE
+        SET runs = excluded.runs, balls = excluded.balls, fours = excluded.fours,
+            sixes = excluded.sixes, out_status = excluded.out_status
+        """
+    )
+    conn.execute("DELETE FROM player_career")
+    conn.execute(
+        "INSERT INTO player_career (team_name, player_name, matches, innings, runs, balls, fours, sixes, outs)"
+        + PLAYER_CAREER_FROM_INNINGS
+    )
+    rebuild_standings(conn)
+    bump_versions(conn, ALL_SCOPE)
+    return matches_rebuilt, players_rebuilt
+
+
+# ==========================================
+# RESULTS ARCHIVE
+# ==========================================
+# Pages run newest first on (created_at, id) and continue from the last row
+# seen rather than an OFFSET, so every page is an index range walk of at most
+# `limit` rows per branch however many matches exist. A team filter reads
+# both sides of the fixture, one branch per status, and merges them.
+MATCH_STATUSES = ("Scheduled", "Live", "Completed")
+
+
+def _archive_branches(team=None, status=None, date_from=None, date_to=None, after=None):
+    """(WHERE clause or "", params) for each index-ordered branch of an archive read."""
+    sides = ("team_a", "team_b") if team else (None,)
+    statuses = (status,) if status else (MATCH_STATUSES if team else (None,))
+    branches = []
+    for side in sides:
+        for branch_status in statuses:
+            conditions, params = [], []
+            if side:
+                conditions.append(f"{side} = ?")
+                params.append(team)
+            if branch_status:
+                conditions.append("status = ?")
+                params.append(branch_status)
+            if date_from:
+                conditions.append("created_at >= ?")
+                params.append(str(date_from))
+            if date_to:
+                conditions.append("created_at < date(?, '+1 day')")
+                params.append(str(date_to))
+            if after:
+                conditions.append("(created_at, id) < (?, ?)")
+                params.extend(after)
+            branches.append((" WHERE " + " AND ".join(conditions) if conditions else "", params))
+    return branches
+
+
+def archive_page_query(columns, limit, team=None, status=None, date_from=None, date_to=None, after=None):
+    """SQL and params for one page of matches, newest first.
+
+    `columns` is the projected column list and must include created_at and
+    id; `after` is the (created_at, id) of the previous page's last row.
+    """
+    order = "ORDER BY created_at DESC, id DESC LIMIT ?"
+    branches = _archive_branches(team, status, date_from, date_to, after)
+    if len(branches) == 1:
+        where, params = branches[0]
+        return f"SELECT {columns} FROM matches{where} {order}", params + [limit]
+    parts, params = [], []
+    for where, branch_params in branches:
+        parts.append(f"SELECT * FROM (SELECT {columns} FROM matches{where} {order})")
+        params.extend(branch_params + [limit])
+    return " UNION ALL ".join(parts) + f" {order}", params + [limit]
+
+
+def archive_count_query(team=None, status=None, date_from=None, date_to=None):
+    """SQL and params counting every match an archive filter matches."""
+    branches = _archive_branches(team, status, date_from, date_to)
+    params = [param for _, branch_params in branches for param in branch_params]
+    counts = " + ".join(f"(SELECT COUNT(*) FROM matches{where})" for where, _ in branches)
+    return f"SELECT {counts}", params
+
+
+# ==========================================
+# COMMAND LINE
+# ==========================================
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="CricStream database tools")
+    parser.add_argument("--db", default=DB_PATH, help="database file (default: %(default)s)")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("rebuild", help="recompute scoreboards, player stats, bowling figures and careers from the delivery log")
+    commands.add_parser("standings", help="recompute the points table from completed matches")
+    args = parser.parse_args(argv)
+
+    set_db_path(args.db)
+    init_db()
+    if args.command == "rebuild":
+        with transaction() as conn:
+            matches_rebuilt, players_rebuilt = rebuild_aggregates(conn)
+        print(f"Rebuilt {matches_rebuilt} matches and {players_rebuilt} player rows from the delivery log.")
+    elif args.command == "standings":
+        with transaction() as conn:
+            teams = rebuild_standings(conn)
+        print(f"Recomputed standings for {teams} teams.")
+    close_connections()
+
+
+if __name__ == "__main__":
+    main()
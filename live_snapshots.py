@@ -0,0 +1,330 @@
+"""Static JSON snapshots of live scores for public viewers.
+
+After a write commits, the scorer and admin pages publish a compact JSON
+file for the match (`match-<id>.json`) and a tournament `index.json` into
+SNAPSHOT_DIR. Each file is written to a temporary name and moved into
+place with os.replace, so a reader (the app's Live Scores page, a static
+file server or a CDN in front of the directory) sees either the old or the
+new snapshot, never a torn one. Reading a snapshot touches no database, so
+the number of viewers no longer adds load to the file the scorer writes.
+
+    python live_snapshots.py [--dir snapshots] [--all] [--db tournament.db]
+"""
+import json
+import os
+import tempfile
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+from cricket_db import fetch_all, fetch_one, get_db_connection, read_versions
+
+SNAPSHOT_DIR = "snapshots"
+INDEX_FILE = "index.json"
+RECENT_RESULTS = 10
+UPCOMING_FIXTURES = 50
+SNAPSHOT_COMMENTARY = 12
+CREASE_BATTERS = 2
+
+# Index sections rebuilt only when one of these scopes has moved since the last index
+INDEX_SCOPES = ("teams", "players", "schedule")
+EXTRAS_KEYS = ("wides", "no_balls", "byes", "leg_byes")
+SUMMARY_COLUMNS = """
+    id, match_number, status, team_a, team_b, batting_team, target, winner, version,
+    team_a_runs, team_a_wickets, team_a_balls, team_b_runs, team_b_wickets, team_b_balls
+"""
+
+# mkstemp creates files 0600 and os.replace keeps that, so published files get the mode a plain
+# open() would have given them. The umask is read once: setting it is process-wide, not per thread.
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+SNAPSHOT_MODE = 0o644 & ~_UMASK
+
+
+def match_file(match_id):
+    return f"match-{int(match_id)}.json"
+
+
+def write_json_atomic(path, payload):
+    """Write `payload` as compact JSON to `path` through a temporary file and os.replace."""
+    directory = os.path.dirname(path) or "."
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(payload, f, separators=(",", ":"), ensure_ascii=False)
+        os.chmod(tmp_path, SNAPSHOT_MODE)
+        # Snapshots are derived data, republished on the next write, so no fsync
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def load_snapshot(name, directory=SNAPSHOT_DIR):
+    """A published snapshot as a dict, or None when it has not been published."""
+    try:
+        with open(os.path.join(directory, name), encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+# ==========================================
+# SNAPSHOTS
+# ==========================================
+@contextmanager
+def read_snapshot():
+    """A pooled connection inside one read transaction, so every query sees the same commit."""
+    with get_db_connection() as conn:
+        conn.execute("BEGIN")
+        try:
+            yield conn
+        finally:
+            conn.rollback()
+
+
+def _now():
+    return datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def _overs(balls):
+    return f"{balls // 6}.{balls % 6}"
+
+
+def _side(row, prefix):
+    runs, balls = row[f"{prefix}_runs"] or 0, row[f"{prefix}_balls"] or 0
+    side = {
+        "team": row[prefix],
+        "runs": runs,
+        "wickets": row[f"{prefix}_wickets"] or 0,
+        "balls": balls,
+        "overs": _overs(balls),
+        "run_rate": f"{runs * 6 / balls:.2f}" if balls else None,  # null until the side has faced a ball
+    }
+    if f"{prefix}_wides" in row.keys():
+        side["extras"] = {key: row[f"{prefix}_{key}"] or 0 for key in EXTRAS_KEYS}
+    return side
+
+
+def match_summary(row):
+    """One match in the index: enough for a scoreboard strip."""
+    return {
+        "id": row["id"],
+        "match_number": row["match_number"],
+        "status": row["status"],
+        "batting_team": row["batting_team"],
+        "target": row["target"] or 0,
+        "winner": row["winner"],
+        "version": row["version"],
+        "team_a": _side(row, "team_a"),
+        "team_b": _side(row, "team_b"),
+        "file": match_file(row["id"]),
+    }
+
+
+def current_bowler(row):
+    """The bowler of the over in progress off a match row, or None between overs."""
+    if not row["current_bowler_name"]:
+        return None
+    return {
+        "name": row["current_bowler_name"],
+        "runs": row["current_bowler_runs"] or 0,
+        "wickets": row["current_bowler_wickets"] or 0,
+    }
+
+
+def crease_batters(conn, batting_team):
+    """The batting side's not-out batters most likely at the crease, top scorer first."""
+    return [
+        dict(batter) for batter in fetch_all(
+            conn,
+            """
+            SELECT player_name, runs, balls, fours, sixes, out_status
+            FROM players
+            WHERE team_name = ? AND out_status = 'Not Out'
+            ORDER BY runs DESC, balls ASC
+            LIMIT ?
+            """,
+            (batting_team, CREASE_BATTERS),
+        )
+    ]
+
+
+def latest_commentary(conn, match_id, limit):
+    """The last `limit` balls' commentary, newest first."""
+    return [
+        {"innings": line["innings"], "ball": f"{line['over_number']}.{line['ball_number']}",
+         "text": line["commentary"], "at": line["created_at"]}
+        for line in fetch_all(
+            conn,
+            """
+            SELECT id, innings, over_number, ball_number, commentary, created_at
+            FROM deliveries
+            WHERE match_id = ?
+            ORDER BY innings DESC, id DESC
+            LIMIT ?
+            """,
+            (match_id, limit),
+        )
+    ]
+
+
+def match_snapshot(conn, match_id):
+    """Everything a scoreboard shows for one match, or None if it does not exist."""
+    row = fetch_one(conn, "SELECT * FROM matches WHERE id = ?", (match_id,))
+    if row is None:
+        return None
+    snapshot = match_summary(row)
+    del snapshot["file"]
+    snapshot.update(
+        published_at=_now(),
+        first_innings_team=row["first_innings_team"],
+        first_innings_runs=row["first_innings_runs"] or 0,
+        bowler=current_bowler(row),
+        batters=[],
+    )
+    if row["status"] == "Live" and row["batting_team"]:
+        snapshot["batters"] = crease_batters(conn, row["batting_team"])
+    innings = 2 if row["target"] else 1
+    snapshot["bowling"] = [
+        dict(figures, overs=_overs(figures["balls"])) for figures in fetch_all(
+            conn,
+            """
+            SELECT bowler, balls, runs, wickets
+            FROM bowling_figures
+            WHERE match_id = ? AND innings = ?
+            ORDER BY wickets DESC, runs, balls
+            """,
+            (match_id, innings),
+        )
+    ]
+    snapshot["commentary"] = latest_commentary(conn, match_id, SNAPSHOT_COMMENTARY)
+    return snapshot
+
+
+def index_snapshot(conn, previous=None):
+    """The tournament index; sections that only change with INDEX_SCOPES are reused from `previous`."""
+    versions = list(read_versions(conn, INDEX_SCOPES))
+    live = [
+        match_summary(row) for row in fetch_all(
+            conn, f"SELECT {SUMMARY_COLUMNS} FROM matches WHERE status = 'Live' ORDER BY created_at, id"
+        )
+    ]
+    index = {"published_at": _now(), "versions": versions, "live": live}
+    if previous and previous.get("versions") == versions:
+        index.update(metrics=previous["metrics"], results=previous["results"], upcoming=previous["upcoming"])
+    else:
+        index["metrics"] = {
+            "teams": conn.execute("SELECT COUNT(*) FROM teams").fetchone()[0],
+            "players": conn.execute("SELECT COUNT(*) FROM players").fetchone()[0],
+            "completed": conn.execute("SELECT COUNT(*) FROM matches WHERE status = 'Completed'").fetchone()[0],
+        }
+        index["results"] = [
+            match_summary(row) for row in fetch_all(
+                conn,
+                f"""
+                SELECT {SUMMARY_COLUMNS} FROM matches
+                WHERE status = 'Completed'
+                ORDER BY created_at DESC, id DESC
+                LIMIT ?
+                """,
+                (RECENT_RESULTS,),
+            )
+        ]
+        index["upcoming"] = [
+            dict(row) for row in fetch_all(
+                conn,
+                """
+                SELECT id, match_number, team_a, team_b FROM matches
+                WHERE status = 'Scheduled'
+                ORDER BY created_at, id
+                LIMIT ?
+                """,
+                (UPCOMING_FIXTURES,),
+            )
+        ]
+    index["metrics"]["live"] = len(live)
+    return index
+
+
+# ==========================================
+# PUBLISHING
+# ==========================================
+def publish_index(directory=SNAPSHOT_DIR, conn=None):
+    """Rewrite index.json; returns the index."""
+    os.makedirs(directory, exist_ok=True)
+    previous = load_snapshot(INDEX_FILE, directory)
+    if conn is None:
+        with read_snapshot() as conn:
+            index = index_snapshot(conn, previous)
+    else:
+        index = index_snapshot(conn, previous)
+    write_json_atomic(os.path.join(directory, INDEX_FILE), index)
+    return index
+
+
+def publish_match(match_id, directory=SNAPSHOT_DIR):
+    """Republish one match's snapshot and the index after a write to that match."""
+    os.makedirs(directory, exist_ok=True)
+    with read_snapshot() as conn:
+        snapshot = match_snapshot(conn, match_id)
+        if snapshot is None:
+            try:
+                os.unlink(os.path.join(directory, match_file(match_id)))
+            except FileNotFoundError:
+                pass
+        else:
+            write_json_atomic(os.path.join(directory, match_file(match_id)), snapshot)
+        publish_index(directory, conn)
+
+
+def publish_all(directory=SNAPSHOT_DIR, every_match=False):
+    """Republish the index and the live and recent matches (every match with `every_match`).
+
+    Snapshots of matches that no longer exist are removed. Returns the
+    number of match files written.
+    """
+    os.makedirs(directory, exist_ok=True)
+    written = 0
+    with read_snapshot() as conn:
+        # Not reusing the old index: whatever prompted a full publish may have moved anything
+        index = index_snapshot(conn)
+        existing = [row[0] for row in conn.execute("SELECT id FROM matches ORDER BY created_at, id")]
+        match_ids = existing if every_match else [match["id"] for match in index["live"] + index["results"]]
+        for match_id in match_ids:
+            write_json_atomic(os.path.join(directory, match_file(match_id)), match_snapshot(conn, match_id))
+            written += 1
+        existing = set(existing)
+        write_json_atomic(os.path.join(directory, INDEX_FILE), index)
+    for name in os.listdir(directory):
+        if name.startswith("match-") and name.endswith(".json"):
+            stem = name[len("match-"):-len(".json")]
+            if stem.isdigit() and int(stem) not in existing:
+                os.unlink(os.path.join(directory, name))
+    return written
+
+
+# ==========================================
+# COMMAND LINE
+# ==========================================
+def main(argv=None):
+    import argparse
+
+    import cricket_db
+
+    parser = argparse.ArgumentParser(description="Publish the live-score JSON snapshots")
+    parser.add_argument("--db", default=cricket_db.DB_PATH, help="database file (default: %(default)s)")
+    parser.add_argument("--dir", default=SNAPSHOT_DIR, help="snapshot directory (default: %(default)s)")
+    parser.add_argument("--all", action="store_true", help="write a snapshot for every match, not just live and recent")
+    args = parser.parse_args(argv)
+
+    cricket_db.set_db_path(args.db)
+    cricket_db.init_db()
+    try:
+        written = publish_all(args.dir, every_match=args.all)
+    finally:
+        cricket_db.close_connections()
+    print(f"published {INDEX_FILE} and {written:,} match snapshots to {args.dir}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,593 @@
+"""Read-only HTTP API for live scores: scoreboard screens, bots and mobile clients.
+
+A standard-library server (one thread per keep-alive connection) over the
+same cricket_db connection pool as the app, so polling clients never load
+the Streamlit page:
+
+    GET /api/live                      live matches, one scoreboard summary each
+    GET /api/matches/<id>              scoreboard, batting card, bowling card, latest commentary
+    GET /api/matches/<id>/bowling      bowling figures for both innings
+    GET /api/results[?limit=&before=]  completed matches newest first; `before` is the
+                                       `next` cursor of the previous page
+    GET /api/stream                    server-sent events: a delta per ball for every live match
+    GET /api/matches/<id>/stream       the same for one match
+    GET /api/updates?since=<id>        long-poll fallback: the events after `since`, as JSON
+
+Every response carries a weak ETag built from the matches' `version`
+counters (the data_versions scopes for the results list). The tag is read
+before any body is built, so a poll whose If-None-Match still matches costs
+one or two indexed lookups and gets an empty 304. Bodies are gzipped for
+clients that accept it, and the encoded bodies are kept per URL and ETag,
+so any number of clients polling one match share a single render.
+
+The streams are fed by one Ticker thread per server, which notices commits
+through PRAGMA data_version and builds each match's delta once, however many
+clients are subscribed.
+
+    python score_api.py [--host 127.0.0.1] [--port 8765] [--db tournament.db] [--pool-size 16]
+"""
+import gzip
+import hashlib
+import json
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict, deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import cricket_db
+from cricket_db import ConnectionPool, PoolExhausted, archive_page_query, fetch_all, fetch_one, match_version, read_versions, squad_scope
+from live_snapshots import (
+    SUMMARY_COLUMNS,
+    crease_batters,
+    current_bowler,
+    latest_commentary,
+    match_snapshot,
+    match_summary,
+    read_snapshot,
+)
+
+DEFAULT_PORT = 8765
+DEFAULT_POOL_SIZE = 16    # database connections shared by the request threads
+RESULTS_PAGE = 20
+MAX_RESULTS_PAGE = 100
+GZIP_MIN_BYTES = 256
+GZIP_LEVEL = 6
+CACHE_SIZE = 1024
+RESULT_COLUMNS = SUMMARY_COLUMNS + ", created_at"
+DELTA_COLUMNS = SUMMARY_COLUMNS + ", current_bowler_name, current_bowler_runs, current_bowler_wickets"
+TICKER_INTERVAL = 0.2    # seconds between PRAGMA data_version checks
+TICKER_HISTORY = 4096    # events kept for reconnecting and long-polling clients
+HEARTBEAT_SECONDS = 15
+LONG_POLL_SECONDS = 25
+STREAM_PATH = re.compile(r"/api(?:/matches/(\d+))?/stream")
+
+
+class ApiError(Exception):
+    """A request the API refuses, with the HTTP status to answer it with."""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+# ==========================================
+# RESOURCES
+# ==========================================
+# Each resource is a pair: `tag` returns the ETag for the current data (None
+# when the resource does not exist) and `body` builds the JSON payload. Both
+# run inside one read transaction, so a body always matches its tag.
+def _digest(parts):
+    return hashlib.blake2b(repr(parts).encode(), digest_size=8).hexdigest()
+
+
+def _listed(row):
+    """A match summary pointing at its API scorecard instead of its snapshot file."""
+    summary = match_summary(row)
+    del summary["file"]
+    summary["url"] = f"/api/matches/{summary['id']}"
+    return summary
+
+
+def live_tag(conn, query):
+    rows = conn.execute(
+        "SELECT id, version FROM matches WHERE status = 'Live' ORDER BY created_at, id"
+    ).fetchall()
+    return f"live.{read_versions(conn, ())[0]}.{_digest(rows)}"
+
+
+def live_body(conn, query):
+    return {"live": [
+        _listed(row) for row in fetch_all(
+            conn, f"SELECT {SUMMARY_COLUMNS} FROM matches WHERE status = 'Live' ORDER BY created_at, id"
+        )
+    ]}
+
+
+def match_tag(conn, query, match_id):
+    # A ball bumps the match version; the squad scope also moves when an admin resets the batters' stats
+    row = conn.execute("SELECT version, batting_team FROM matches WHERE id = ?", (match_id,)).fetchone()
+    if row is None:
+        return None
+    version, batting_team = row
+    return f"m{match_id}.{version}." + ".".join(map(str, read_versions(conn, (squad_scope(batting_team),))))
+
+
+def match_body(conn, query, match_id):
+    scorecard = match_snapshot(conn, match_id)
+    del scorecard["published_at"]
+    batting = {}
+    for row in fetch_all(
+        conn,
+        """
+        SELECT team_name, player_name, runs, balls, fours, sixes, out_status
+        FROM player_innings
+        WHERE match_id = ? AND (balls > 0 OR out_status != 'Not Out')
+        ORDER BY team_name, runs DESC
+        """,
+        (match_id,),
+    ):
+        batting.setdefault(row["team_name"], []).append(
+            {key: row[key] for key in row.keys() if key != "team_name"}
+        )
+    scorecard["batting"] = batting
+    return scorecard
+
+
+def bowling_tag(conn, query, match_id):
+    # Bowling figures move with the match version, so the card reuses the scorecard's tag
+    tag = match_tag(conn, query, match_id)
+    return tag and "bowling." + tag
+
+
+def bowling_body(conn, query, match_id):
+    innings = {}
+    for row in fetch_all(
+        conn,
+        """
+        SELECT innings, bowler, balls, runs, wickets
+        FROM bowling_figures
+        WHERE match_id = ?
+        ORDER BY innings, wickets DESC, runs, balls
+        """,
+        (match_id,),
+    ):
+        innings.setdefault(str(row["innings"]), []).append({
+            "bowler": row["bowler"],
+            "overs": f"{row['balls'] // 6}.{row['balls'] % 6}",
+            "balls": row["balls"],
+            "runs": row["runs"],
+            "wickets": row["wickets"],
+            "economy": round(row["runs"] * 6 / row["balls"], 2) if row["balls"] else 0.0,
+        })
+    return {"match_id": match_id, "innings": innings}
+
+
+def results_tag(conn, query):
+    # Completed rows only change when a match completes (schedule) or everything is rebuilt (all)
+    return "r." + ".".join(map(str, read_versions(conn, ("schedule",))))
+
+
+def _results_page(query):
+    """(limit, after) from the query string, or ApiError."""
+    try:
+        limit = int(query.get("limit", [RESULTS_PAGE])[0])
+    except ValueError:
+        raise ApiError(400, "limit must be a whole number") from None
+    if not 1 <= limit <= MAX_RESULTS_PAGE:
+        raise ApiError(400, f"limit must be between 1 and {MAX_RESULTS_PAGE}")
+    before = query.get("before", [None])[0]
+    if before is None:
+        return limit, None
+    created_at, _, match_id = before.rpartition("|")
+    if not created_at or not match_id.isdigit():
+        raise ApiError(400, "before must be the `next` cursor of a previous page")
+    return limit, (created_at, int(match_id))
+
+
+def results_body(conn, query):
+    limit, after = _results_page(query)
+    sql, params = archive_page_query(RESULT_COLUMNS, limit + 1, status="Completed", after=after)
+    rows = fetch_all(conn, sql, params)
+    results = [dict(_listed(row), created_at=row["created_at"]) for row in rows[:limit]]
+    last = rows[limit - 1] if len(rows) > limit else None
+    return {"results": results, "next": f"{last['created_at']}|{last['id']}" if last else None}
+
+
+ROUTES = [
+    (re.compile(r"/api/live"), live_tag, live_body),
+    (re.compile(r"/api/matches/(\d+)"), match_tag, match_body),
+    (re.compile(r"/api/matches/(\d+)/bowling"), bowling_tag, bowling_body),
+    (re.compile(r"/api/results"), results_tag, results_body),
+]
+
+
+def resolve(path):
+    """(tag, body, args) for a request path, or ApiError 404."""
+    for pattern, tag, body in ROUTES:
+        matched = pattern.fullmatch(path.rstrip("/") or "/")
+        if matched:
+            return tag, body, tuple(int(arg) for arg in matched.groups())
+    raise ApiError(404, f"no such resource: {path}")
+
+
+# ==========================================
+# RESPONSES
+# ==========================================
+class ResponseCache:
+    """The latest encoded body per request target, valid while its ETag is current."""
+
+    def __init__(self, size=CACHE_SIZE):
+        self.size = size
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, target, tag):
+        """(raw, gzipped) for `target` if it was cached under `tag`, else None."""
+        with self._lock:
+            entry = self._entries.get(target)
+            if entry is None or entry[0] != tag:
+                return None
+            self._entries.move_to_end(target)
+            return entry[1], entry[2]
+
+    def put(self, target, tag, raw, gzipped):
+        with self._lock:
+            self._entries[target] = (tag, raw, gzipped)
+            self._entries.move_to_end(target)
+            while len(self._entries) > self.size:
+                self._entries.popitem(last=False)
+
+
+def encode(payload):
+    """(raw, gzipped or None) JSON bodies for a payload; small bodies are not worth compressing."""
+    raw = json.dumps(payload, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+    if len(raw) < GZIP_MIN_BYTES:
+        return raw, None
+    return raw, gzip.compress(raw, compresslevel=GZIP_LEVEL, mtime=0)
+
+
+def etag_matches(header, etag):
+    """If-None-Match uses the weak comparison: W/ prefixes are ignored."""
+    if header is None:
+        return False
+    if header.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(candidate.strip().removeprefix("W/") == opaque for candidate in header.split(","))
+
+
+def accepts_gzip(header):
+    for coding in (header or "").split(","):
+        name, _, params = coding.strip().partition(";")
+        if name.strip().lower() in ("gzip", "*"):
+            return params.replace(" ", "") not in ("q=0", "q=0.0", "q=0.00", "q=0.000")
+    return False
+
+
+# ==========================================
+# LIVE TICKER
+# ==========================================
+def match_delta(conn, row):
+    """What the ticker pushes for one match: the score, the bowler, the batters in and the last ball."""
+    delta = _listed(row)
+    delta["bowler"] = current_bowler(row)
+    delta["batters"] = crease_batters(conn, row["batting_team"]) if row["status"] == "Live" and row["batting_team"] else []
+    last = latest_commentary(conn, row["id"], 1)
+    delta["last_ball"] = last[0] if last else None
+    return delta
+
+
+class Ticker(threading.Thread):
+    """One watcher shared by every subscriber.
+
+    The thread owns a connection of its own, so PRAGMA data_version moves
+    whenever any other connection commits. Only then does it re-read the
+    live matches' versions and build a delta for each match whose version
+    moved (or that stopped being live). Each delta is encoded once into a
+    bounded event log with a sequence number; subscribers wait on
+    `changed` and copy what is new, so the database load depends on the
+    scoring rate, not on the number of clients.
+    """
+
+    def __init__(self, interval=TICKER_INTERVAL, history=TICKER_HISTORY):
+        super().__init__(name="score-ticker", daemon=True)
+        self.interval = interval
+        self.events = deque(maxlen=history)  # (seq, match_id, event name, JSON data)
+        self.latest = {}                     # live match id -> (seq, JSON data) of its last delta
+        self.seq = 0
+        self.changed = threading.Condition()
+        self.stopped = threading.Event()
+        self.statements = 0                  # everything the ticker ran, for the benchmarks
+        self._versions = {}
+        self._pool = ConnectionPool(cricket_db.DB_PATH, size=1)
+
+    def _count(self, sql):
+        self.statements += 1
+
+    def run(self):
+        conn = self._pool.acquire()
+        conn.set_trace_callback(self._count)
+        data_version = None
+        try:
+            while not self.stopped.is_set():
+                current = conn.execute("PRAGMA data_version").fetchone()[0]
+                if current != data_version:
+                    try:
+                        self._scan(conn)
+                        data_version = current
+                    except sqlite3.OperationalError:
+                        pass  # busy past the timeout: scan again on the next tick
+                self.stopped.wait(self.interval)
+        finally:
+            self._pool.release(conn)
+            self._pool.close()
+
+    def _scan(self, conn):
+        events = []
+        conn.execute("BEGIN")
+        try:
+            live = dict(conn.execute("SELECT id, version FROM matches WHERE status = 'Live'").fetchall())
+            moved = [match_id for match_id, version in live.items() if self._versions.get(match_id) != version]
+            moved += [match_id for match_id in self._versions if match_id not in live]
+            for match_id in moved:
+                row = fetch_one(conn, f"SELECT {DELTA_COLUMNS} FROM matches WHERE id = ?", (match_id,))
+                if row is None:
+                    events.append((match_id, "removed", {"id": match_id}))
+                else:
+                    events.append((match_id, "score", match_delta(conn, row)))
+        finally:
+            conn.rollback()
+        self._versions = live
+        if events:
+            self._publish(events)
+
+    def _publish(self, events):
+        encoded = [
+            (match_id, name, payload.get("status") == "Live",
+             json.dumps(payload, separators=(",", ":"), ensure_ascii=False))
+            for match_id, name, payload in events
+        ]
+        with self.changed:
+            for match_id, name, live, data in encoded:
+                self.seq += 1
+                self.events.append((self.seq, match_id, name, data))
+                if live:
+                    self.latest[match_id] = (self.seq, data)
+                else:
+                    self.latest.pop(match_id, None)
+            self.changed.notify_all()
+
+    def snapshot(self, match_id=None):
+        """(seq, events): the last delta of each live match (or just `match_id`) as of `seq`."""
+        with self.changed:
+            return self.seq, [
+                (seq, live_id, "score", data)
+                for live_id, (seq, data) in sorted(self.latest.items())
+                if match_id in (None, live_id)
+            ]
+
+    def wait(self, after, match_id=None, timeout=None):
+        """(events, seq, complete): the events after `after`, waiting up to `timeout` for one.
+
+        `seq` is the position to pass as `after` next time. `complete` is
+        False when events after `after` have already left the history; the
+        caller then starts again from snapshot().
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self.changed:
+            while True:
+                if after > self.seq or (self.events and after < self.events[0][0] - 1):
+                    return [], self.seq, False
+                new = []
+                for event in reversed(self.events):
+                    if event[0] <= after:
+                        break
+                    if match_id is None or event[1] == match_id:
+                        new.append(event)
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if new or self.stopped.is_set() or (remaining is not None and remaining <= 0):
+                    return new[::-1], self.seq, True
+                after = self.seq
+                self.changed.wait(remaining)
+
+    def stop(self):
+        self.stopped.set()
+        with self.changed:
+            self.changed.notify_all()
+        if self.is_alive():
+            self.join()
+
+
+def sse_event(seq, match_id, name, data):
+    return f"id: {seq}\nevent: {name}\ndata: {data}\n\n".encode("utf-8")
+
+
+class ScoreAPIHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server_version = "CricStreamAPI/1.0"
+    # Headers and body go out in separate writes; with Nagle on, keep-alive clients wait out a delayed ACK
+    disable_nagle_algorithm = True
+    verbose = False
+
+    def do_GET(self):
+        path = urlsplit(self.path).path.rstrip("/")
+        try:
+            stream = STREAM_PATH.fullmatch(path)
+            if stream:
+                match_id = stream.group(1) and int(stream.group(1))
+                if match_id is not None:
+                    with read_snapshot() as conn:
+                        if match_version(conn, match_id) is None:
+                            raise ApiError(404, f"no such match: {match_id}")
+                self._stream(match_id)
+            elif path == "/api/updates":
+                self._updates(parse_qs(urlsplit(self.path).query))
+            else:
+                self._serve(send_body=True)
+        except ApiError as exc:
+            self._send(exc.status, encode({"error": str(exc)}))
+        except PoolExhausted as exc:
+            self._send(503, encode({"error": str(exc)}))
+
+    def do_HEAD(self):
+        self._serve(send_body=False)
+
+    def _serve(self, send_body):
+        url = urlsplit(self.path)
+        target = url.path + ("?" + url.query if url.query else "")
+        try:
+            tag_of, body_of, args = resolve(url.path)
+            query = parse_qs(url.query)
+            with read_snapshot() as conn:
+                tag = tag_of(conn, query, *args)
+                if tag is None:
+                    raise ApiError(404, f"no such resource: {url.path}")
+                etag = f'W/"{tag}"'
+                if etag_matches(self.headers.get("If-None-Match"), etag):
+                    self._send(304, etag=etag)
+                    return
+                cached = self.server.responses.get(target, tag)
+                if cached is None:
+                    cached = encode(body_of(conn, query, *args))
+                    self.server.responses.put(target, tag, *cached)
+        except ApiError as exc:
+            self._send(exc.status, encode({"error": str(exc)}), send_body=send_body)
+            return
+        except PoolExhausted as exc:
+            self._send(503, encode({"error": str(exc)}), send_body=send_body)
+            return
+        self._send(200, cached, etag=etag, send_body=send_body)
+
+    def _stream(self, match_id):
+        """Server-sent events until the client goes away; resumes from Last-Event-ID."""
+        ticker = self.server.ticker
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream; charset=utf-8")
+        self.send_header("Cache-Control", "no-store")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        last_id = self.headers.get("Last-Event-ID", "")
+        after = int(last_id) if last_id.isdigit() else None
+        try:
+            while not ticker.stopped.is_set():
+                if after is None:
+                    after, events = ticker.snapshot(match_id)
+                    self.wfile.write(b"".join(sse_event(after, *event[1:]) for event in events) or b": live\n\n")
+                events, seq, complete = ticker.wait(after, match_id, HEARTBEAT_SECONDS)
+                if not complete:
+                    # Fell behind the history: the snapshot that follows replaces everything the client holds
+                    self.wfile.write(b"event: resync\ndata: {}\n\n")
+                    after = None
+                    continue
+                self.wfile.write(b"".join(sse_event(*event) for event in events) or b": keep-alive\n\n")
+                after = seq
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    def _updates(self, query):
+        """Long poll: {"seq", "resync", "events"}; pass `seq` back as `since`."""
+        ticker = self.server.ticker
+        try:
+            since = query.get("since", [None])[0]
+            since = None if since is None else int(since)
+            match_id = query.get("match", [None])[0]
+            match_id = None if match_id is None else int(match_id)
+            timeout = min(float(query.get("timeout", [LONG_POLL_SECONDS])[0]), LONG_POLL_SECONDS)
+        except ValueError:
+            raise ApiError(400, "since, match and timeout must be numbers") from None
+        complete = since is not None
+        if complete:
+            events, seq, complete = ticker.wait(since, match_id, max(timeout, 0.0))
+        if not complete:
+            seq, events = ticker.snapshot(match_id)
+        body = b'{"seq":%d,"resync":%s,"events":[%s]}' % (
+            seq,
+            b"false" if complete or since is None else b"true",
+            b",".join(
+                b'{"id":%d,"match_id":%d,"event":"%s","data":%s}'
+                % (event_seq, event_match, name.encode(), data.encode("utf-8"))
+                for event_seq, event_match, name, data in events
+            ),
+        )
+        self.send_response(200)
+        self.send_header("Cache-Control", "no-store")
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send(self, status, bodies=None, etag=None, send_body=True):
+        self.send_response(status)
+        if etag:
+            self.send_header("ETag", etag)
+            self.send_header("Cache-Control", "no-cache")
+        self.send_header("Vary", "Accept-Encoding")
+        if bodies is None:
+            self.end_headers()
+            return
+        raw, gzipped = bodies
+        body = raw
+        if gzipped is not None and accepts_gzip(self.headers.get("Accept-Encoding")):
+            body = gzipped
+            self.send_header("Content-Encoding", "gzip")
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if send_body:
+            self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        if self.verbose:
+            super().log_message(format, *args)
+
+
+class ScoreAPIServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 128
+
+    def __init__(self, address, handler=ScoreAPIHandler):
+        super().__init__(address, handler)
+        self.responses = ResponseCache()
+        self.ticker = Ticker()
+        self.ticker.start()
+
+    def server_close(self):
+        self.ticker.stop()
+        super().server_close()
+
+
+# ==========================================
+# COMMAND LINE
+# ==========================================
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Serve live scores as a read-only JSON API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--db", default=cricket_db.DB_PATH, help="database file (default: %(default)s)")
+    parser.add_argument("--pool-size", type=int, default=DEFAULT_POOL_SIZE,
+                        help="pooled database connections, at most one per concurrent request (default: %(default)s)")
+    parser.add_argument("--verbose", action="store_true", help="log every request")
+    args = parser.parse_args(argv)
+
+    cricket_db.set_pool_size(args.pool_size)
+    cricket_db.set_db_path(args.db)
+    cricket_db.init_db()
+    ScoreAPIHandler.verbose = args.verbose
+    server = ScoreAPIServer((args.host, args.port))
+    print(f"serving {args.db} on http://{args.host}:{server.server_port}/api/live", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        cricket_db.close_connections()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,730 @@
+"""Headless scoring rules for CricStream.
+
+`MatchState` holds what the rules need to know about one match in play,
+and `ScoringEngine` turns a `Delivery` into a `Transition`. A transition
+carries the mutated state, the deliveries row to log, the follow-up SQL
+writes and the notifications for the scorer. The engine never touches
+Streamlit or opens a connection, so the rules can be benchmarked, batched
+or served from an API. `read_match_state` and `score_delivery` at the end
+are the database-backed path the scorer page uses.
+"""
+from collections import deque
+
+from cricket_db import (
+    RESULT_FOLDS,
+    RESULT_SCOPES,
+    claim_match,
+    extras_split,
+    fetch_all,
+    fetch_one,
+    match_scope,
+    match_version,
+    out_status_text,
+    save_transition,
+    squad_scope,
+    transaction,
+)
+
+BALLS_PER_OVER = 6
+UNDO_DEPTH = 60  # ten overs of undo/redo per scorer session
+
+DISMISSAL_META = {
+    "Bowled": ("Bowled", "B"),
+    "Catch Out": ("Catch Out", "C"),
+    "Run Out": ("Run Out", "R"),
+    "No Ball Run Out": ("No Ball Run Out", "NBO"),
+}
+
+# Statements run on every ball advance matches.version themselves, which spares them trg_matches_version
+BOWLER_FIGURES_SQL = (
+    "UPDATE matches SET current_bowler_runs = ?, current_bowler_wickets = ?, version = version + 1 WHERE id = ?"
+)
+CLEAR_BOWLER_SQL = (
+    "UPDATE matches SET current_bowler_name = NULL, current_bowler_runs = 0, current_bowler_wickets = 0 WHERE id = ?"
+)
+COMPLETE_MATCH_SQL = "UPDATE matches SET status='Completed', winner=? WHERE id=?"
+SWITCH_INNINGS_SQL = """
+    UPDATE matches
+    SET batting_team = ?,
+        target = ?,
+        first_innings_team = ?,
+        first_innings_runs = ?,
+        status = 'Live'
+    WHERE id = ?
+"""
+
+
+class ScoringError(ValueError):
+    """Raised when a delivery cannot be recorded in the current match state."""
+
+
+def resolve_dismissal_meta(dismissal_type, is_wicket):
+    """Return (display label, scorecard code) for a dismissal."""
+    if dismissal_type in DISMISSAL_META:
+        return DISMISSAL_META[dismissal_type]
+    if dismissal_type:
+        return dismissal_type, None
+    if is_wicket:
+        return "Wicket", None
+    return None, None
+
+
+def _overs_text(balls):
+    return f"{balls // BALLS_PER_OVER}.{balls % BALLS_PER_OVER}"
+
+
+class BatterStats:
+    """One batter's line on the card."""
+
+    __slots__ = ("runs", "balls", "fours", "sixes", "out_status")
+
+    def __init__(self, runs=0, balls=0, fours=0, sixes=0, out_status="Not Out"):
+        self.runs = runs
+        self.balls = balls
+        self.fours = fours
+        self.sixes = sixes
+        self.out_status = out_status
+
+    @property
+    def is_out(self):
+        return str(self.out_status).startswith("Out")
+
+    def as_dict(self):
+        return {
+            "runs": self.runs,
+            "balls": self.balls,
+            "fours": self.fours,
+            "sixes": self.sixes,
+            "out_status": self.out_status,
+        }
+
+
+class Delivery:
+    """One ball as entered by the scorer."""
+
+    __slots__ = (
+        "runs", "is_wicket", "is_extra", "credit_batsman",
+        "dismissed_player", "dismissal_type", "batsman_runs", "leg_bye",
+    )
+
+    def __init__(self, runs=0, is_wicket=False, is_extra=False, credit_batsman=True,
+                 dismissed_player=None, dismissal_type=None, batsman_runs=None, leg_bye=False):
+        self.runs = runs
+        self.is_wicket = is_wicket
+        self.is_extra = is_extra
+        self.credit_batsman = credit_batsman
+        self.dismissed_player = dismissed_player
+        self.dismissal_type = dismissal_type
+        self.batsman_runs = batsman_runs
+        self.leg_bye = leg_bye  # uncredited runs off a legal ball came off the body, not as byes
+
+    @property
+    def credited_runs(self):
+        """Runs that go to the striker's account."""
+        if not self.credit_batsman:
+            return 0
+        if self.batsman_runs is not None:
+            return max(0, self.batsman_runs)
+        return 0 if self.is_extra else self.runs
+
+    def describe(self, striker):
+        """Commentary line for the ball, e.g. "Rohit Sharma → 1 W [Run Out]"."""
+        parts = [f"{striker or 'Team'} → {self.runs}"]
+        if self.is_wicket:
+            parts.append("W")
+        if self.is_extra:
+            parts.append("(extra)")
+        label, _ = resolve_dismissal_meta(self.dismissal_type, self.is_wicket)
+        if label:
+            parts.append(f"[{label}]")
+        return " ".join(parts)
+
+
+class MatchState:
+    """Everything the rules read and change for one match in play.
+
+    `runs`, `wickets` and `balls` are the totals of the side batting now.
+    `squads` maps each team to an insertion-ordered {player: BatterStats}.
+    """
+
+    __slots__ = (
+        "match_id", "team_a", "team_b", "batting_team", "status", "winner",
+        "runs", "wickets", "balls", "target", "first_innings_team",
+        "first_innings_runs", "bowler_runs", "bowler_wickets",
+        "striker", "non_striker", "bowler", "pending_bowler", "innings_complete",
+        "bowling_figures", "squads",
+    )
+
+    def __init__(self, match_id, team_a, team_b, batting_team, runs=0, wickets=0, balls=0,
+                 target=0, first_innings_team=None, first_innings_runs=0, status="Live",
+                 winner=None, bowler_runs=0, bowler_wickets=0, striker=None,
+                 non_striker=None, bowler=None, pending_bowler=False, innings_complete=False,
+                 bowling_figures=None, squads=None):
+        self.match_id = match_id
+        self.team_a = team_a
+        self.team_b = team_b
+        self.batting_team = batting_team
+        self.status = status
+        self.winner = winner
+        self.runs = runs
+        self.wickets = wickets
+        self.balls = balls
+        self.target = target
+        self.first_innings_team = first_innings_team
+        self.first_innings_runs = first_innings_runs
+        # current_bowler_runs / current_bowler_wickets as stored on the match row
+        self.bowler_runs = bowler_runs
+        self.bowler_wickets = bowler_wickets
+        self.striker = striker
+        self.non_striker = non_striker
+        self.bowler = bowler
+        self.pending_bowler = pending_bowler
+        self.innings_complete = innings_complete
+        self.bowling_figures = bowling_figures if bowling_figures is not None else {}
+        self.squads = squads if squads is not None else {}
+
+    @classmethod
+    def from_rows(cls, match_row, player_rows, **live):
+        """Build from a matches row, the two squads' player rows and the scorer's live fields.
+
+        `live` takes striker, non_striker, bowler, pending_bowler,
+        innings_complete and bowling_figures ({bowler: {"runs", "balls",
+        "wickets"}} for this innings); the figures are copied so a rolled-back
+        ball leaves the caller's dict untouched.
+        """
+        prefix = "team_a" if match_row["batting_team"] == match_row["team_a"] else "team_b"
+        squads = {match_row["team_a"]: {}, match_row["team_b"]: {}}
+        for row in player_rows:
+            squads.setdefault(row["team_name"], {})[row["player_name"]] = BatterStats(
+                row["runs"] or 0, row["balls"] or 0, row["fours"] or 0, row["sixes"] or 0,
+                row["out_status"] or "Not Out",
+            )
+        figures = live.pop("bowling_figures", None) or {}
+        return cls(
+            match_row["id"],
+            match_row["team_a"],
+            match_row["team_b"],
+            match_row["batting_team"],
+            runs=match_row[f"{prefix}_runs"] or 0,
+            wickets=match_row[f"{prefix}_wickets"] or 0,
+            balls=match_row[f"{prefix}_balls"] or 0,
+            target=match_row["target"] or 0,
+            first_innings_team=match_row["first_innings_team"],
+            first_innings_runs=match_row["first_innings_runs"] or 0,
+            status=match_row["status"],
+            winner=match_row["winner"],
+            bowler_runs=match_row["current_bowler_runs"] or 0,
+            bowler_wickets=match_row["current_bowler_wickets"] or 0,
+            bowling_figures={name: dict(entry) for name, entry in figures.items()},
+            squads=squads,
+            **live,
+        )
+
+    @property
+    def innings(self):
+        return 2 if self.target else 1
+
+    def prefix_for(self, team_name):
+        return "team_a" if team_name == self.team_a else "team_b"
+
+    @property
+    def prefix(self):
+        return self.prefix_for(self.batting_team)
+
+    @property
+    def fielding_team(self):
+        return self.team_b if self.batting_team == self.team_a else self.team_a
+
+    @property
+    def batters(self):
+        return self.squads.setdefault(self.batting_team, {})
+
+    def not_out(self):
+        """Batting-side players not yet dismissed, in squad order."""
+        return [name for name, line in self.batters.items() if not line.is_out]
+
+    def has_partnership(self):
+        """True while at least two batters are not out (stops counting at two)."""
+        left = 0
+        for line in self.batters.values():
+            if not line.is_out:
+                left += 1
+                if left == 2:
+                    return True
+        return False
+
+
+class Transition:
+    """What one scoring action changed, for the caller to persist and display.
+
+    `delivery` is the deliveries row to log (None for undo), `writes` the
+    (sql, params) statements to run after it, `scopes` any cache scopes to
+    bump beyond those `record_delivery` bumps, and `notifications` the
+    (message, icon, level) cards for the scorer. `undo` is the ball's
+    BallDelta for the undo history.
+    """
+
+    __slots__ = (
+        "match_id", "prefix", "delivery", "writes", "scopes", "notifications",
+        "action_text", "match_completed", "new_innings", "undo", "version",
+    )
+
+    def __init__(self, match_id, prefix, delivery=None, action_text=""):
+        self.match_id = match_id
+        self.prefix = prefix
+        self.delivery = delivery
+        self.writes = []
+        self.scopes = []
+        self.notifications = []
+        self.action_text = action_text
+        self.match_completed = False
+        self.new_innings = False
+        self.undo = None
+        self.version = None  # the match's version once persisted
+
+
+class BallDelta:
+    """The inverse of one scored ball: only what it changed, as increments or prior values.
+
+    Undo replays it backwards with writes alone (no reads); redo scores
+    `delivery` again from the restored live fields.
+    """
+
+    __slots__ = (
+        "match_id", "delivery", "delivery_id", "action_text", "batting_team", "prefix",
+        "runs", "wickets", "legal", "striker", "striker_add", "dismissed", "dismissed_status",
+        "innings", "bowler_before", "bowler_add", "entry_before", "live_before", "match_before",
+        "completed", "extras",
+    )
+
+    def __init__(self, state, delivery, action_text):
+        self.match_id = state.match_id
+        self.delivery = delivery
+        self.delivery_id = None
+        self.action_text = action_text
+        self.batting_team = state.batting_team
+        self.prefix = state.prefix
+        self.innings = state.innings
+        self.runs = self.wickets = self.legal = 0
+        self.extras = (0, 0, 0, 0)       # (wides, no_balls, byes, leg_byes) added to the side
+        self.striker = None
+        self.striker_add = None          # (runs, balls, fours, sixes) added to the striker
+        self.dismissed = None
+        self.dismissed_status = None     # out_status before the dismissal
+        self.bowler_before = (state.bowler, state.bowler_runs, state.bowler_wickets)
+        self.bowler_add = None           # (runs, balls, wickets) added to the bowler's figures
+        self.entry_before = None         # the bowler's figures before the ball, None if this was their first
+        self.live_before = (
+            state.striker, state.non_striker, state.bowler, state.pending_bowler, state.innings_complete,
+        )
+        self.match_before = None         # result/innings columns, only when they changed
+        self.completed = False           # the ball finished the match and folded in its result
+
+
+class UndoHistory:
+    """Bounded undo and redo stacks of BallDelta records."""
+
+    __slots__ = ("undo", "redo")
+
+    def __init__(self, depth=UNDO_DEPTH):
+        self.undo = deque(maxlen=depth)
+        self.redo = deque(maxlen=depth)
+
+    def record(self, delta):
+        """A newly scored ball: push it and drop the redo branch."""
+        self.undo.append(delta)
+        self.redo.clear()
+
+    def __len__(self):
+        return len(self.undo)
+
+
+class ScoringEngine:
+    """The scoring rules: ball counting, strike rotation, wickets and innings ends."""
+
+    __slots__ = ()
+
+    def apply(self, state, ball):
+        """Apply one delivery to `state` in place and return its Transition."""
+        if state.innings_complete:
+            raise ScoringError("Innings already completed")
+        if state.pending_bowler or not state.bowler:
+            raise ScoringError("Select a bowler before recording deliveries")
+
+        display_label, dismissal_code = resolve_dismissal_meta(ball.dismissal_type, ball.is_wicket)
+        striker = state.striker
+        dismissed_name = ball.dismissed_player or (striker if ball.is_wicket else None)
+        credited_runs = ball.credited_runs
+        is_legal = 0 if ball.is_extra else 1
+        over_int, balls_before = divmod(state.balls, BALLS_PER_OVER)
+
+        if ball.is_extra:
+            extras_type = "no_ball" if ball.dismissal_type in ("No Ball", "No Ball Run Out") else "wide"
+        else:
+            extras_type = None if ball.credit_batsman else ("leg_bye" if ball.leg_bye else "bye")
+        commentary = ball.describe(striker)
+
+        transition = Transition(
+            state.match_id,
+            state.prefix,
+            {
+                "match_id": state.match_id,
+                "innings": state.innings,
+                "over_number": over_int,
+                "ball_number": balls_before + 1,
+                "batting_team": state.batting_team,
+                "striker": striker,
+                "non_striker": state.non_striker,
+                "bowler": state.bowler,
+                "runs": ball.runs,
+                "batsman_runs": credited_runs,
+                "extra_runs": ball.runs - credited_runs,
+                "extras_type": extras_type,
+                "is_legal": is_legal,
+                "is_wicket": 1 if ball.is_wicket else 0,
+                "dismissed_player": dismissed_name if ball.is_wicket else None,
+                "dismissal_type": display_label if ball.is_wicket else None,
+                "dismissal_code": dismissal_code if ball.is_wicket else None,
+                "commentary": commentary,
+            },
+            commentary,
+        )
+        notify = transition.notifications.append
+        match_id = state.match_id
+        batting_team = state.batting_team
+        delta = transition.undo = BallDelta(state, ball, transition.action_text)
+        match_before = (
+            state.batting_team, state.target, state.first_innings_team,
+            state.first_innings_runs, state.status, state.winner,
+        )
+
+        # Scoreboard and batter counters, as record_delivery folds them in
+        state.runs += ball.runs
+        state.balls += is_legal
+        delta.runs, delta.legal = ball.runs, is_legal
+        delta.extras = extras_split(extras_type, ball.runs - credited_runs)
+        if ball.is_wicket:
+            state.wickets += 1
+            delta.wickets = 1
+        batters = state.batters
+        if striker and (credited_runs or is_legal):
+            delta.striker = striker
+            delta.striker_add = (credited_runs, is_legal, int(credited_runs == 4), int(credited_runs == 6))
+            line = batters.get(striker)
+            if line is not None:
+                line.runs += credited_runs
+                line.balls += is_legal
+                line.fours += credited_runs == 4
+                line.sixes += credited_runs == 6
+        if ball.is_wicket and dismissed_name in batters:
+            delta.dismissed = dismissed_name
+            delta.dismissed_status = batters[dismissed_name].out_status
+            batters[dismissed_name].out_status = out_status_text(dismissal_code)
+
+        # Bowling figures for the innings; byes and leg byes are not charged to the bowler
+        entry = state.bowling_figures.get(state.bowler)
+        if entry is None:
+            entry = state.bowling_figures[state.bowler] = {"runs": 0, "balls": 0, "wickets": 0}
+        else:
+            delta.entry_before = (entry["runs"], entry["balls"], entry["wickets"])
+        charged = ball.runs if ball.credit_batsman or ball.is_extra else 0
+        delta.bowler_add = (charged, is_legal, delta.wickets)
+        entry["runs"] += charged
+        entry["balls"] += is_legal
+        entry["wickets"] += delta.wickets
+        state.bowler_runs, state.bowler_wickets = entry["runs"], entry["wickets"]
+        transition.writes.append((BOWLER_FIGURES_SQL, (entry["runs"], entry["wickets"], match_id)))
+
+        # Strike rotation: odd runs off the bat, and at the end of every over
+        over_completed = is_legal and balls_before + 1 == BALLS_PER_OVER
+        if is_legal and ((ball.credit_batsman and ball.runs % 2 == 1) or over_completed):
+            state.striker, state.non_striker = state.non_striker, state.striker
+
+        if ball.is_wicket:
+            self._replace_batter(state, dismissed_name, display_label or "Wicket", notify)
+
+        if state.target and state.runs >= state.target:
+            notify((
+                f"<strong>{batting_team}</strong> chase down the target of {state.target}!",
+                "🏆",
+                "success",
+            ))
+            self._complete(state, transition, batting_team)
+
+        if over_completed and not transition.match_completed:
+            self._clear_bowler(state, transition)
+            state.pending_bowler = True
+            notify((
+                f"Over complete! {batting_team} {state.runs}/{state.wickets} after "
+                f"{_overs_text(state.balls)} overs. Assign a new bowler.",
+                "✅",
+                "info",
+            ))
+
+        if not transition.match_completed and not state.has_partnership():
+            remaining = state.not_out()
+            self._close_innings(state, transition, remaining[0] if remaining else None)
+
+        if transition.match_completed:
+            transition.scopes.append("schedule")
+        if transition.match_completed or transition.new_innings:
+            delta.match_before = match_before
+        return transition
+
+    def _clear_bowler(self, state, transition):
+        state.bowler = None
+        state.bowler_runs = state.bowler_wickets = 0
+        transition.writes.append((CLEAR_BOWLER_SQL, (state.match_id,)))
+
+    def _replace_batter(self, state, dismissed_name, label, notify):
+        """Announce a dismissal and send in the next not-out batter."""
+        if dismissed_name:
+            line = state.batters.get(dismissed_name)
+            if line is not None:
+                strike_rate = (line.runs / line.balls * 100) if line.balls else 0
+                notify((
+                    f"<strong>{label}!</strong> {dismissed_name} departs for {line.runs} ({line.balls}) "
+                    f"• SR {strike_rate:.1f}",
+                    "⚠️",
+                    "alert",
+                ))
+            else:
+                notify((f"<strong>{label}!</strong> {dismissed_name} is out.", "⚠️", "alert"))
+
+        dismissed_role = None
+        if dismissed_name == state.striker:
+            dismissed_role = "striker"
+            state.striker = None
+        elif dismissed_name == state.non_striker:
+            dismissed_role = "non_striker"
+            state.non_striker = None
+
+        bench = state.not_out()
+        if dismissed_role == "non_striker":
+            candidates = [p for p in bench if p != state.striker]
+            state.non_striker = candidates[0] if candidates else None
+        else:
+            candidates = [p for p in bench if p != state.non_striker]
+            state.striker = candidates[0] if candidates else None
+
+    def _complete(self, state, transition, winner):
+        state.pending_bowler = False
+        self._record_result(state, transition, winner)
+        self._clear_bowler(state, transition)
+
+    def _record_result(self, state, transition, winner):
+        state.status = "Completed"
+        state.winner = winner
+        transition.writes.append((COMPLETE_MATCH_SQL, (winner, state.match_id)))
+        fold = {"sign": 1, "match_id": state.match_id}
+        transition.writes.extend((query, fold) for query in RESULT_FOLDS)
+        transition.scopes.extend(RESULT_SCOPES)
+        transition.match_completed = True
+        transition.undo.completed = True
+
+    def _close_innings(self, state, transition, stranded_name):
+        """The batting side has no partnership left: switch innings or finish the chase."""
+        batting_team = state.batting_team
+        match_id = state.match_id
+        notify = transition.notifications.append
+
+        if state.target <= 0:
+            first_total = state.runs
+            chasing_team = state.fielding_team
+            target_runs = first_total + 1
+            transition.writes.append(
+                (SWITCH_INNINGS_SQL, (chasing_team, target_runs, batting_team, first_total, match_id))
+            )
+            self._clear_bowler(state, transition)
+            transition.new_innings = True
+            state.batting_team = chasing_team
+            state.target = target_runs
+            state.first_innings_team = batting_team
+            state.first_innings_runs = first_total
+            state.status = "Live"
+            state.runs = state.wickets = state.balls = 0
+            state.striker = state.non_striker = None
+            state.pending_bowler = True
+            state.innings_complete = False
+            state.bowling_figures = {}
+            notify((
+                f"End of innings! {batting_team} are all out for {first_total}. "
+                f"{chasing_team} need {target_runs} to win.",
+                "🎯",
+                "info",
+            ))
+            return
+
+        state.innings_complete = True
+        state.pending_bowler = False
+        state.striker = None
+        state.non_striker = stranded_name
+        self._clear_bowler(state, transition)
+        notify((
+            f"<strong>{batting_team}</strong> innings complete — no batting partner remaining.",
+            "🛑",
+            "info",
+        ))
+        if state.runs < state.target:
+            defending_team = state.first_innings_team or state.fielding_team
+            self._record_result(state, transition, defending_team)
+            notify((
+                f"<strong>{defending_team}</strong> win — {batting_team} are bowled out.",
+                "🏆",
+                "success",
+            ))
+
+    def undo(self, delta):
+        """Invert one ball without reading anything back.
+
+        Returns (transition, live): the writes that undo the ball in the
+        database, and the scorer's live fields from just before it.
+        """
+        match_id = delta.match_id
+        transition = Transition(match_id, delta.prefix, action_text=delta.action_text)
+        writes = transition.writes
+        prefix = delta.prefix
+        bowler, bowler_runs, bowler_wickets = delta.bowler_before
+
+        if delta.completed:
+            # Before the totals and player innings below lose this ball
+            unfold = {"sign": -1, "match_id": match_id}
+            writes.extend((query, unfold) for query in RESULT_FOLDS)
+            transition.scopes.extend(RESULT_SCOPES)
+        if delta.delivery_id:
+            writes.append(("DELETE FROM deliveries WHERE id = ?", (delta.delivery_id,)))
+        writes.append((
+            f"""
+            UPDATE matches
+            SET {prefix}_runs = {prefix}_runs - ?, {prefix}_wickets = {prefix}_wickets - ?,
+                {prefix}_balls = {prefix}_balls - ?, {prefix}_wides = {prefix}_wides - ?,
+                {prefix}_no_balls = {prefix}_no_balls - ?, {prefix}_byes = {prefix}_byes - ?,
+                {prefix}_leg_byes = {prefix}_leg_byes - ?, current_bowler_name = ?,
+                current_bowler_runs = ?, current_bowler_wickets = ?, version = version + 1
+            WHERE id = ?
+            """,
+            (delta.runs, delta.wickets, delta.legal) + delta.extras
+            + (bowler, bowler_runs, bowler_wickets, match_id),
+        ))
+        if delta.match_before is not None:
+            writes.append((
+                """
+                UPDATE matches
+                SET batting_team = ?, target = ?, first_innings_team = ?,
+                    first_innings_runs = ?, status = ?, winner = ?
+                WHERE id = ?
+                """,
+                delta.match_before + (match_id,),
+            ))
+            transition.scopes.append("schedule")
+        if delta.striker_add is not None:
+            writes.append((
+                """
+                UPDATE players
+                SET runs = runs - ?, balls = balls - ?, fours = fours - ?, sixes = sixes - ?
+                WHERE player_name = ? AND team_name = ?
+                """,
+                delta.striker_add + (delta.striker, delta.batting_team),
+            ))
+            writes.append((
+                """
+                UPDATE player_innings
+                SET runs = runs - ?, balls = balls - ?, fours = fours - ?, sixes = sixes - ?
+                WHERE player_name = ? AND team_name = ? AND match_id = ?
+                """,
+                delta.striker_add + (delta.striker, delta.batting_team, match_id),
+            ))
+        if delta.dismissed is not None:
+            writes.append((
+                "UPDATE players SET out_status = ? WHERE player_name = ? AND team_name = ?",
+                (delta.dismissed_status, delta.dismissed, delta.batting_team),
+            ))
+            writes.append((
+                "UPDATE player_innings SET out_status = ? WHERE player_name = ? AND team_name = ? AND match_id = ?",
+                (delta.dismissed_status, delta.dismissed, delta.batting_team, match_id),
+            ))
+        if delta.entry_before is None:
+            writes.append((
+                "DELETE FROM bowling_figures WHERE match_id = ? AND innings = ? AND bowler = ?",
+                (match_id, delta.innings, bowler),
+            ))
+        else:
+            writes.append((
+                """
+                UPDATE bowling_figures
+                SET runs = runs - ?, balls = balls - ?, wickets = wickets - ?
+                WHERE match_id = ? AND innings = ? AND bowler = ?
+                """,
+                delta.bowler_add + (match_id, delta.innings, bowler),
+            ))
+        transition.scopes.extend((match_scope(match_id), "live", squad_scope(delta.batting_team)))
+
+        striker, non_striker, live_bowler, pending_bowler, innings_complete = delta.live_before
+        live = {
+            "striker": striker,
+            "non_striker": non_striker,
+            "bowler": live_bowler,
+            "pending_bowler": pending_bowler,
+            "innings_complete": innings_complete,
+        }
+        return transition, live
+
+
+# ==========================================
+# DATABASE-BACKED SCORING
+# ==========================================
+def read_match_state(conn, match_id, **live):
+    """Load a MatchState from the matches row, both squads and the bowler's figures.
+
+    `live` as for MatchState.from_rows, except that the current bowler's
+    figures always come from the bowling_figures table.
+    """
+    row = fetch_one(conn, "SELECT * FROM matches WHERE id = ?", (match_id,))
+    squads = fetch_all(
+        conn,
+        "SELECT team_name, player_name, runs, balls, fours, sixes, out_status FROM players WHERE team_name IN (?, ?)",
+        (row["team_a"], row["team_b"]),
+    )
+    figures = {}
+    bowler = live.get("bowler")
+    if bowler:
+        entry = fetch_one(
+            conn,
+            "SELECT runs, balls, wickets FROM bowling_figures WHERE match_id = ? AND innings = ? AND bowler = ?",
+            (match_id, 2 if row["target"] else 1, bowler),
+        )
+        if entry is not None:
+            figures[bowler] = dict(entry)
+    live["bowling_figures"] = figures
+    return MatchState.from_rows(row, squads, **live)
+
+
+def score_delivery(engine, match_id, delivery, expected_version=None, **live):
+    """Score one ball end to end in a single IMMEDIATE transaction.
+
+    Returns (state, transition); `transition.undo` carries the logged
+    delivery_id and `transition.version` the match's new version. With
+    `expected_version`, raises MatchConflict instead if the match was written
+    since the caller's live fields were read.
+    """
+    with transaction() as conn:
+        claim_match(conn, match_id, expected_version)
+        state = read_match_state(conn, match_id, **live)
+        transition = engine.apply(state, delivery)
+        transition.undo.delivery_id = save_transition(conn, transition)
+        transition.version = match_version(conn, match_id)
+    return state, transition
+
+
+def undo_delivery(engine, delta, expected_version=None):
+    """Undo one ball in a single transaction of writes; returns (transition, live).
+
+    The inverse writes restore prior values, so they are only right while
+    nothing else has touched the match: pass the version the ball left it at.
+    """
+    transition, live = engine.undo(delta)
+    with transaction() as conn:
+        claim_match(conn, delta.match_id, expected_version)
+        save_transition(conn, transition)
+        transition.version = match_version(conn, delta.match_id)
+    return transition, live
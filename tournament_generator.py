@@ -0,0 +1,300 @@
+"""Seeded synthetic tournaments for load and scale testing.
+
+Fills a database with teams, squads and fixtures, and plays the completed
+and live fixtures ball by ball through `ScoringEngine`, so the delivery log
+follows the real scoring rules. Fixtures are simulated in batches, each
+with its own seed, optionally across worker processes, and written with
+executemany, one batch per transaction, along with a zero player innings
+row for each side's playing XI. The scoreboards, player counters, bowling
+figures, careers and standings are then derived from the log in one
+set-based `rebuild_aggregates` pass. The same seed and sizes give the same
+tournament whatever the number of workers:
+
+    python tournament_generator.py [--teams 2000] [--squad 15] [--matches 20000]
+        [--completed 0.9] [--live 5] [--seed 7] [--workers 4] [--db tournament.db]
+"""
+import os
+import random
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from operator import itemgetter
+
+from cricket_db import rebuild_aggregates, transaction
+from scoring_engine import BatterStats, Delivery, MatchState, ScoringEngine
+
+PLAYING_XI = 11
+MATCH_BATCH = 500
+LIVE_MAX_BALLS = 240
+
+# (weight, Delivery) pairs roughly shaped like a T20 innings
+OUTCOMES = [
+    (34, Delivery(0)),
+    (30, Delivery(1)),
+    (8, Delivery(2)),
+    (1, Delivery(3)),
+    (10, Delivery(4)),
+    (4, Delivery(6)),
+    (3, Delivery(1, is_extra=True, credit_batsman=False)),
+    (1, Delivery(2, is_extra=True, dismissal_type="No Ball", batsman_runs=1)),
+    (1, Delivery(1, credit_batsman=False)),
+    (3, Delivery(0, is_wicket=True, dismissal_type="Bowled")),
+    (4, Delivery(0, is_wicket=True, dismissal_type="Catch Out")),
+    (1, Delivery(0, is_wicket=True, dismissal_type="Run Out")),
+]
+
+INSERT_MATCH_SQL = """
+    INSERT INTO matches (
+        id, team_a, team_b, status, batting_team, target, winner,
+        first_innings_team, first_innings_runs, current_bowler_name, created_at
+    )
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, datetime('2025-01-01', '+' || ? || ' minutes'))
+"""
+INSERT_DELIVERY_SQL = """
+    INSERT INTO deliveries (
+        match_id, innings, over_number, ball_number, batting_team,
+        striker, non_striker, bowler, runs, batsman_runs, extra_runs,
+        extras_type, is_legal, is_wicket, dismissed_player,
+        dismissal_type, dismissal_code, commentary
+    )
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+# Transition.delivery dict -> INSERT_DELIVERY_SQL parameters
+DELIVERY_COLUMNS = (
+    "match_id", "innings", "over_number", "ball_number", "batting_team",
+    "striker", "non_striker", "bowler", "runs", "batsman_runs", "extra_runs",
+    "extras_type", "is_legal", "is_wicket", "dismissed_player",
+    "dismissal_type", "dismissal_code", "commentary",
+)
+delivery_row = itemgetter(*DELIVERY_COLUMNS)
+
+
+class GeneratorError(ValueError):
+    """The requested tournament cannot be generated into this database."""
+
+
+class GeneratorReport:
+    """Rows written by one generate() call and how long it took."""
+
+    __slots__ = ("teams", "players", "matches", "deliveries", "elapsed")
+
+    def __init__(self):
+        self.teams = self.players = self.matches = self.deliveries = 0
+        self.elapsed = 0.0
+
+    @property
+    def rows(self):
+        return self.teams + self.players + self.matches + self.deliveries
+
+    @property
+    def rows_per_s(self):
+        return self.rows / self.elapsed if self.elapsed else 0.0
+
+    def summary(self):
+        return (
+            f"{self.teams:,} teams, {self.players:,} players, {self.matches:,} matches and "
+            f"{self.deliveries:,} deliveries in {self.elapsed:.1f} s ({self.rows_per_s:,.0f} rows/s)"
+        )
+
+
+# ==========================================
+# SIMULATION
+# ==========================================
+@lru_cache(maxsize=4)
+def roster(name_prefix, seed, teams, squad):
+    """Team names and each team's squad, in squad order."""
+    team_names = tuple(f"{name_prefix} {seed}-{t:05d}" for t in range(1, teams + 1))
+    return team_names, {name: tuple(f"{name} P{n:02d}" for n in range(1, squad + 1)) for name in team_names}
+
+
+def ready(state, over_no, rng):
+    """What the scorer does between balls: send in batters and pick the next bowler."""
+    if state.striker is None or state.non_striker is None:
+        bench = [p for p in state.not_out() if p not in (state.striker, state.non_striker)]
+        if state.striker is None and bench:
+            state.striker = bench.pop(0)
+        if state.non_striker is None and bench:
+            state.non_striker = bench.pop(0)
+    if state.pending_bowler or not state.bowler:
+        attack = list(state.squads[state.fielding_team])[-5:]
+        state.bowler = attack[(over_no + rng.randrange(2)) % len(attack)]
+        state.pending_bowler = False
+
+
+def play(engine, state, rng, balls=None):
+    """Score a match ball by ball; returns the deliveries as dicts (at most `balls` of them)."""
+    weights = [weight for weight, _ in OUTCOMES]
+    outcomes = [delivery for _, delivery in OUTCOMES]
+    rows = []
+    over_no = 0
+    stream = iter(())
+    while state.status != "Completed" and not state.innings_complete:
+        if balls is not None and len(rows) >= balls:
+            break
+        ready(state, over_no, rng)
+        if state.striker is None:
+            break
+        delivery = next(stream, None)
+        if delivery is None:
+            stream = iter(rng.choices(outcomes, weights=weights, k=256))
+            delivery = next(stream)
+        transition = engine.apply(state, delivery)
+        rows.append(transition.delivery)
+        if transition.new_innings:
+            over_no = 0
+        elif state.pending_bowler:
+            over_no += 1
+    return rows
+
+
+def simulate_batch(plan, batch_no):
+    """Matches, deliveries and lineup rows for one batch of fixtures, as tuples.
+
+    `plan` holds the sizes and offsets shared by every batch; the batch's
+    random stream depends only on the seed and batch number.
+    """
+    team_names, squads = roster(plan["prefix"], plan["seed"], plan["teams"], plan["squad"])
+    rng = random.Random(f"{plan['seed']}:{batch_no}")
+    engine = ScoringEngine()
+    played = plan["completed"] + plan["live"]
+    xi = min(PLAYING_XI, plan["squad"])
+    match_rows, delivery_rows, lineups = [], [], []
+
+    first = batch_no * MATCH_BATCH
+    for number in range(first, min(first + MATCH_BATCH, plan["matches"])):
+        match_id = plan["first_id"] + number
+        team_a, team_b = rng.sample(team_names, 2)
+        batting_team = team_a if rng.random() < 0.5 else team_b
+        row = (match_id, team_a, team_b, "Scheduled", batting_team, 0, None, None, 0, None)
+        if number < played:
+            is_live = number >= plan["completed"]
+            state = MatchState(
+                match_id, team_a, team_b, batting_team,
+                squads={
+                    team: {name: BatterStats() for name in rng.sample(squads[team], xi)}
+                    for team in (team_a, team_b)
+                },
+            )
+            lineups.extend((match_id, team, name) for team, players in state.squads.items() for name in players)
+            deliveries = play(engine, state, rng, rng.randrange(1, LIVE_MAX_BALLS) if is_live else None)
+            delivery_rows.extend(map(delivery_row, deliveries))
+            row = (
+                match_id, team_a, team_b, "Live" if is_live else "Completed", state.batting_team,
+                state.target, None if is_live else state.winner, state.first_innings_team,
+                state.first_innings_runs, state.bowler if is_live else None,
+            )
+        match_rows.append(row + (plan["minutes"] + number,))
+    return match_rows, delivery_rows, lineups
+
+
+def simulated_batches(plan, batches, workers):
+    """Yield simulate_batch results in batch order, at most 2 * workers ahead of the writer."""
+    if workers <= 1:
+        for batch_no in range(batches):
+            yield simulate_batch(plan, batch_no)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        for batch_no in range(batches):
+            pending.append(pool.submit(simulate_batch, plan, batch_no))
+            if len(pending) >= 2 * workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+# ==========================================
+# GENERATION
+# ==========================================
+def generate(teams=2000, squad=15, matches=20000, completed=0.9, live=5, seed=7,
+             name_prefix="Synthetic", workers=1):
+    """Write a synthetic tournament into the current database; returns a GeneratorReport."""
+    if squad < 2:
+        raise GeneratorError("squads need at least two players")
+    if teams < 2:
+        raise GeneratorError("a tournament needs at least two teams")
+    if not 0 <= completed <= 1:
+        raise GeneratorError("the completed fraction must be between 0 and 1")
+    report = GeneratorReport()
+    start = time.perf_counter()
+
+    team_names, squads = roster(name_prefix, seed, teams, squad)
+    with transaction() as conn:
+        if conn.execute("SELECT 1 FROM teams WHERE name = ?", (team_names[0],)).fetchone():
+            raise GeneratorError(f"teams named {name_prefix} {seed}-* already exist; use another seed or prefix")
+        conn.executemany(
+            "INSERT INTO teams (name, short_name) VALUES (?, ?)",
+            ((name, f"S{t}") for t, name in enumerate(team_names, start=1)),
+        )
+        conn.executemany(
+            "INSERT INTO players (player_name, team_name) VALUES (?, ?)",
+            ((player, name) for name, players in squads.items() for player in players),
+        )
+        first_id = conn.execute("SELECT COALESCE(MAX(id), 0) + 1 FROM matches").fetchone()[0]
+        minutes = conn.execute(
+            "SELECT COALESCE(CAST((julianday(MAX(created_at)) - julianday('2025-01-01')) * 1440 AS INTEGER), 0) + 1 "
+            "FROM matches"
+        ).fetchone()[0]
+    report.teams, report.players = teams, teams * squad
+
+    completed_count = int(matches * completed)
+    plan = {
+        "prefix": name_prefix, "seed": seed, "teams": teams, "squad": squad, "matches": matches,
+        "completed": completed_count, "live": min(live, matches - completed_count),
+        "first_id": first_id, "minutes": minutes,
+    }
+    batches = -(-matches // MATCH_BATCH)
+    for match_rows, delivery_rows, lineups in simulated_batches(plan, batches, workers):
+        with transaction() as conn:
+            conn.executemany(INSERT_MATCH_SQL, match_rows)
+            conn.executemany(INSERT_DELIVERY_SQL, delivery_rows)
+            # Zero rows for the whole XI, as Go Live seeds them, so non-batters still count a match
+            conn.executemany(
+                "INSERT INTO player_innings (match_id, team_name, player_name) VALUES (?, ?, ?)",
+                lineups,
+            )
+        report.matches += len(match_rows)
+        report.deliveries += len(delivery_rows)
+
+    with transaction() as conn:
+        rebuild_aggregates(conn)
+    report.elapsed = time.perf_counter() - start
+    return report
+
+
+# ==========================================
+# COMMAND LINE
+# ==========================================
+def main(argv=None):
+    import argparse
+
+    import cricket_db
+
+    parser = argparse.ArgumentParser(description="Generate a synthetic tournament for load testing")
+    parser.add_argument("--db", default=cricket_db.DB_PATH, help="database file (default: %(default)s)")
+    parser.add_argument("--teams", type=int, default=2000)
+    parser.add_argument("--squad", type=int, default=15, help="players per team; eleven of them play each match")
+    parser.add_argument("--matches", type=int, default=20000)
+    parser.add_argument("--completed", type=float, default=0.9, help="fraction of matches played to a result")
+    parser.add_argument("--live", type=int, default=5, help="matches left in progress")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--prefix", default="Synthetic", help="team name prefix")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="simulation processes")
+    args = parser.parse_args(argv)
+
+    cricket_db.set_db_path(args.db)
+    cricket_db.init_db()
+    try:
+        report = generate(
+            args.teams, args.squad, args.matches, args.completed, args.live, args.seed, args.prefix, args.workers,
+        )
+    except GeneratorError as exc:
+        parser.exit(1, f"generation failed: {exc}\n")
+    finally:
+        cricket_db.close_connections()
+    print(report.summary())
+
+
+if __name__ == "__main__":
+    main()